@@ -12,6 +12,9 @@ interface Conversation {
   created_at: string;
 }
 
+// Messages fetched per conversation to find its first question for the preview
+const PREVIEW_PAGE_SIZE = 10;
+
 export const Chat: React.FC = () => {
   // Toast
   const { addToast } = useToast();
@@ -21,6 +24,8 @@ export const Chat: React.FC = () => {
   const [userNameSubmitted, setUserNameSubmitted] = useState(false);
   const [currentConversationId, setCurrentConversationId] = useState<string | null>(null);
   const [messages, setMessages] = useState<Message[]>([]);
+  const [earlierCursor, setEarlierCursor] = useState<string | null>(null);
+  const [isLoadingEarlier, setIsLoadingEarlier] = useState(false);
   const [inputValue, setInputValue] = useState('');
   const [isLoading, setIsLoading] = useState(false);
   const [error, setError] = useState<string | null>(null);
@@ -32,6 +37,8 @@ export const Chat: React.FC = () => {
   // Refs
   const messagesEndRef = useRef<HTMLDivElement>(null);
   const inputRef = useRef<HTMLInputElement>(null);
+  const keepScrollRef = useRef(false);
+  const activeConversationRef = useRef<string | null>(null);
 
   // Auto scroll to bottom
   const scrollToBottom = () => {
@@ -39,9 +46,18 @@ export const Chat: React.FC = () => {
   };
 
   useEffect(() => {
+    // Earlier messages are prepended above what the user is reading
+    if (keepScrollRef.current) {
+      keepScrollRef.current = false;
+      return;
+    }
     scrollToBottom();
   }, [messages]);
 
+  useEffect(() => {
+    activeConversationRef.current = currentConversationId;
+  }, [currentConversationId]);
+
   // Fetch user conversations
   const fetchConversations = async (name: string) => {
     try {
@@ -56,7 +72,9 @@ export const Chat: React.FC = () => {
       await Promise.all(
         convsData.map(async (conv) => {
           try {
-            const history = await api.getConversationHistory(conv.conversation_id);
+            const history = await api.getConversationHistory(conv.conversation_id, {
+              limit: PREVIEW_PAGE_SIZE,
+            });
             const firstUserMessage = history.messages?.find((m) => m.role === 'user');
             if (firstUserMessage) {
               previews[conv.conversation_id] = firstUserMessage.content;
@@ -98,6 +116,7 @@ export const Chat: React.FC = () => {
             if (response.conversation_id) {
               setCurrentConversationId(response.conversation_id);
               setMessages([]);
+              setEarlierCursor(null);
               setInputValue('');
             }
           } catch (err) {
@@ -117,6 +136,7 @@ export const Chat: React.FC = () => {
     try {
       setError(null);
       setMessages([]);
+      setEarlierCursor(null);
       setInputValue('');
 
       const response = await api.startConversation({
@@ -138,8 +158,10 @@ export const Chat: React.FC = () => {
       setError(null);
       setIsLoading(true);
 
-      const history = await api.getConversationHistory(conversationId);
+      // Newest page first; older messages are loaded on demand
+      const history = await api.getConversationHistory(conversationId, { latest: true });
       setMessages(history.messages || []);
+      setEarlierCursor(history.next_cursor ?? null);
       setCurrentConversationId(conversationId);
       setShowHistory(false);
       setInputValue('');
@@ -152,6 +174,32 @@ export const Chat: React.FC = () => {
     }
   };
 
+  // Load the page of messages before the oldest one shown
+  const handleLoadEarlier = async () => {
+    if (!currentConversationId || !earlierCursor) return;
+    try {
+      setError(null);
+      setIsLoadingEarlier(true);
+
+      const conversationId = currentConversationId;
+      const history = await api.getConversationHistory(conversationId, {
+        latest: true,
+        cursor: earlierCursor,
+      });
+      // Another conversation was opened while this page was loading
+      if (activeConversationRef.current !== conversationId) return;
+      keepScrollRef.current = true;
+      setMessages((prev) => [...(history.messages || []), ...prev]);
+      setEarlierCursor(history.next_cursor ?? null);
+    } catch (err) {
+      setError(
+        err instanceof Error ? err.message : 'Failed to load earlier messages'
+      );
+    } finally {
+      setIsLoadingEarlier(false);
+    }
+  };
+
   // Load latest conversation
   useEffect(() => {
     if (conversations.length > 0 && !currentConversationId) {
@@ -175,6 +223,7 @@ export const Chat: React.FC = () => {
           await fetchConversations(userName);
           if (currentConversationId === conversationId) {
             setMessages([]);
+            setEarlierCursor(null);
             setCurrentConversationId(null);
           }
           addToast({
@@ -377,6 +426,7 @@ export const Chat: React.FC = () => {
             onClick={() => {
               setUserNameSubmitted(false);
               setMessages([]);
+              setEarlierCursor(null);
               setCurrentConversationId(null);
             }}
             className="w-full text-sm text-gray-400 hover:text-gray-300 py-2 transition"
@@ -422,6 +472,17 @@ export const Chat: React.FC = () => {
             </div>
           ) : (
             <>
+              {earlierCursor && (
+                <div className="flex justify-center">
+                  <button
+                    onClick={handleLoadEarlier}
+                    disabled={isLoadingEarlier}
+                    className="text-xs text-gray-400 hover:text-white bg-[#1a2540]/80 border border-[#2a3f5f] hover:border-[#3a5f7f] px-4 py-2 rounded-full transition disabled:opacity-40 disabled:cursor-not-allowed"
+                  >
+                    {isLoadingEarlier ? 'Loading...' : 'Load earlier messages'}
+                  </button>
+                </div>
+              )}
               {messages.map((message, index) => (
                 <div
                   key={index}
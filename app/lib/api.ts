@@ -15,6 +15,7 @@ export interface Message {
 export interface ChatRequest {
   message: string;
   conversation_id?: string;
+  user_name?: string;
   conversation_history?: Message[];
 }
 
@@ -39,6 +40,13 @@ export interface ConversationResponse {
 export interface ConversationHistoryResponse {
   conversation_id: string;
   messages: Message[];
+  next_cursor?: string | null;
+}
+
+export interface HistoryPageOptions {
+  limit?: number;
+  cursor?: string;
+  latest?: boolean;
 }
 
 export interface ConversationListResponse {
@@ -85,6 +93,74 @@ export class PortfolioAPI {
     }
   }
 
+  /**
+   * Send a message and stream the AI response token by token (Server-Sent-Events)
+   */
+  async streamMessage(
+    request: ChatRequest,
+    onDelta: (delta: string) => void,
+  ): Promise<ChatResponse> {
+    try {
+      const response = await fetch(`${this.apiUrl}/conversations/message-with-history/stream`, {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+          Accept: 'text/event-stream',
+        },
+        body: JSON.stringify(request),
+      });
+
+      if (!response.ok || !response.body) {
+        const error = await response.json().catch(() => ({}));
+        throw new Error(error.detail || 'Failed to send message');
+      }
+
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        // SSE frames are separated by a blank line
+        let boundary = buffer.indexOf('\n\n');
+        while (boundary !== -1) {
+          const frame = buffer.slice(0, boundary);
+          buffer = buffer.slice(boundary + 2);
+          boundary = buffer.indexOf('\n\n');
+
+          let event = 'message';
+          let data = '';
+          for (const line of frame.split('\n')) {
+            if (line.startsWith('event:')) event = line.slice(6).trim();
+            else if (line.startsWith('data:')) data += line.slice(5).trim();
+          }
+          if (!data) continue;
+
+          const payload = JSON.parse(data);
+          if (event === 'error') {
+            throw new Error(payload.detail || 'Failed to stream message');
+          }
+          if (event === 'done') {
+            return {
+              message: payload.message,
+              role: 'assistant',
+              conversation_id: payload.conversation_id,
+            };
+          }
+          onDelta(payload.delta);
+        }
+      }
+
+      throw new Error('Stream ended unexpectedly');
+    } catch (error) {
+      console.error('Error streaming message:', error);
+      throw error;
+    }
+  }
+
   /**
    * Start a new conversation
    */
@@ -110,14 +186,22 @@ export class PortfolioAPI {
   }
 
   /**
-   * Get conversation history by ID
+   * Get a page of conversation history by ID
+   * Use { latest: true } for the initial load, then pass next_cursor back to load older messages
    */
   async getConversationHistory(
     conversationId: string,
+    options: HistoryPageOptions = {},
   ): Promise<ConversationHistoryResponse> {
     try {
+      const params = new URLSearchParams();
+      if (options.limit) params.set('limit', String(options.limit));
+      if (options.cursor) params.set('cursor', options.cursor);
+      if (options.latest) params.set('latest', 'true');
+      const query = params.toString();
+
       const response = await fetch(
-        `${this.apiUrl}/conversations/conversation/${conversationId}`,
+        `${this.apiUrl}/conversations/conversation/${conversationId}${query ? `?${query}` : ''}`,
       );
 
       if (!response.ok) {
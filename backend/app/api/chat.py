@@ -1,16 +1,52 @@
 """Chat API routes."""
 from fastapi import APIRouter, HTTPException
-from typing import List
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, List
 import logging
 from ..models.chat import ChatRequest, ChatResponse, Message, ResumeRequest
-from ..services.openrouter_service import openrouter_service
+from ..services.admission import OverloadedError
+from ..services.openrouter_service import openrouter_service, OpenRouterError
+from ..services.prompt_cache import prompt_cache
+from ..services.context_window import context_window
+from ..services.rate_limiter import rate_limiter
+from ..services.response_cache import response_cache
+from ..services.semantic_cache import semantic_cache
+from ..services.tracing import tracer
+from ..services.write_behind import message_writer
 from ..config import settings
+from .streaming import SSE_HEADERS, sse_event
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 
+def _build_messages(request: ChatRequest) -> List[dict]:
+    """
+    Build the OpenRouter message list for a stateless chat request.
+    
+    Args:
+        request: ChatRequest containing the user message and conversation history
+        
+    Returns:
+        Messages with the system prompt first and the new user message last,
+        with older history trimmed to the model's token budget
+    """
+    # Previous messages sent by the client
+    history = [
+        {"role": msg.role, "content": msg.content}
+        for msg in request.conversation_history or []
+    ]
+    
+    # System prompt + as much recent history as fits the model's token budget + new message
+    return context_window.build_messages(
+        prompt_cache.system_message(settings.resume_context, request.message),
+        history,
+        request.message,
+        openrouter_service.model
+    )
+
+
 @router.post("/message", response_model=ChatResponse)
 async def send_message(request: ChatRequest) -> ChatResponse:
     """
@@ -30,38 +66,36 @@ async def send_message(request: ChatRequest) -> ChatResponse:
         if not request.message.strip():
             raise HTTPException(status_code=400, detail="Message cannot be empty")
         
-        # Build messages list for OpenRouter
-        messages: List[dict] = []
-        
-        # Add conversation history
-        if request.conversation_history:
-            for msg in request.conversation_history:
-                messages.append({
-                    "role": msg.role,
-                    "content": msg.content
-                })
+        full_messages = _build_messages(request)
         
-        # Add current message
-        messages.append({
-            "role": "user",
-            "content": request.message
-        })
-        
-        # Get system prompt with resume context
-        system_prompt = openrouter_service.build_system_prompt(settings.resume_context)
+        # Serve repeated questions from the response cache
+        resume_version = prompt_cache.version(settings.resume_context)
+        cache_key = response_cache.make_key(
+            model=openrouter_service.model,
+            resume_version=resume_version,
+            messages=full_messages[1:],
+            temperature=0.7,
+            max_tokens=512
+        )
+        cached_text = response_cache.get(cache_key)
+        if cached_text is not None:
+            return ChatResponse(message=cached_text)
         
-        # Prepare messages with system prompt
-        full_messages = [
-            {"role": "system", "content": system_prompt},
-            *messages
-        ]
+        # Paraphrased single-turn questions are served from the semantic cache
+        semantic = None
+        if len(full_messages) == 2:
+            semantic = await semantic_cache.lookup(request.message, resume_version)
+            if semantic.answer is not None:
+                response_cache.set(cache_key, semantic.answer)
+                return ChatResponse(message=semantic.answer)
         
         # Get response from OpenRouter
-        response_text = await openrouter_service.chat_completion(
+        completion = await openrouter_service.chat_completion(
             messages=full_messages,
             temperature=0.7,
             max_tokens=512
         )
+        response_text = completion.content
         
         if response_text is None:
             raise HTTPException(
@@ -69,15 +103,72 @@ async def send_message(request: ChatRequest) -> ChatResponse:
                 detail="Failed to get response from AI service"
             )
         
+        response_cache.set(cache_key, response_text)
+        if semantic is not None:
+            semantic_cache.store(semantic, resume_version, response_text)
+        
         return ChatResponse(message=response_text)
         
     except HTTPException:
         raise
+    except OverloadedError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
     except Exception as e:
         logger.error(f"Error in send_message: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
+@router.post("/message/stream")
+async def stream_message(request: ChatRequest) -> StreamingResponse:
+    """
+    Send a message to the AI assistant and stream the reply as Server-Sent-Events.
+    
+    Emits one ``data: {"delta": ...}`` event per token chunk, then a ``done``
+    event carrying the full message, or an ``error`` event if the upstream fails.
+    
+    Args:
+        request: ChatRequest containing the user message and conversation history
+        
+    Returns:
+        StreamingResponse with media type text/event-stream
+    """
+    if not request.message.strip():
+        raise HTTPException(status_code=400, detail="Message cannot be empty")
+    
+    # Reject up front while saturated; once streaming starts the status is already 200
+    try:
+        openrouter_service.limiter.check()
+    except OverloadedError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    
+    full_messages = _build_messages(request)
+    
+    async def event_stream() -> AsyncIterator[str]:
+        parts: List[str] = []
+        try:
+            async for delta in openrouter_service.chat_completion_stream(
+                messages=full_messages,
+                temperature=0.7,
+                max_tokens=512
+            ):
+                parts.append(delta)
+                yield sse_event({"delta": delta})
+        except OpenRouterError as e:
+            yield sse_event({"detail": str(e)}, event="error")
+            return
+        except Exception as e:
+            logger.error(f"Error in stream_message: {str(e)}")
+            yield sse_event({"detail": f"Internal server error: {str(e)}"}, event="error")
+            return
+        
+        yield sse_event(
+            {"message": "".join(parts), "conversation_id": request.conversation_id},
+            event="done"
+        )
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
 @router.post("/start-conversation")
 async def start_conversation():
     """
@@ -126,8 +217,9 @@ async def update_resume(request: ResumeRequest):
         if not request.resume_content.strip():
             raise HTTPException(status_code=400, detail="Resume content cannot be empty")
         
-        # Update the settings
+        # Update the settings and rebuild the system prompt on next use
         settings.resume_context = request.resume_content
+        prompt_cache.invalidate()
         
         logger.info("Resume context updated successfully")
         
@@ -148,7 +240,16 @@ async def chat_health():
     return {
         "status": "healthy",
         "service": "chat_api",
-        "openrouter_configured": bool(settings.openrouter_api_key)
+        "openrouter_configured": bool(settings.openrouter_api_key),
+        "response_cache": response_cache.stats(),
+        "semantic_cache": semantic_cache.stats(),
+        "single_flight": openrouter_service.single_flight.stats(),
+        "circuit_breaker": openrouter_service.circuit_breaker.stats(),
+        "routing": openrouter_service.routing_stats(),
+        "admission": openrouter_service.limiter.stats(),
+        "rate_limit": rate_limiter.stats(),
+        "write_behind": message_writer.stats(),
+        "tracing": tracer.stats()
     }
 
 
@@ -168,7 +269,7 @@ async def test_openrouter():
             }
         
         # Make a simple test request
-        response_text = await openrouter_service.chat_completion(
+        completion = await openrouter_service.chat_completion(
             messages=[
                 {
                     "role": "system",
@@ -182,6 +283,7 @@ async def test_openrouter():
             temperature=0.1,
             max_tokens=50
         )
+        response_text = completion.content
         
         if response_text.startswith("Error:"):
             return {
@@ -1,23 +1,49 @@
 """Database and conversation management API routes."""
-from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Depends, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime, timedelta, timezone
 import logging
-from typing import List
-from ..database import get_db
+import uuid
+from typing import Any, AsyncIterator, Dict, List, Optional
+from ..database import get_async_db, AsyncSessionLocal
 from ..models.chat import (
     ChatRequest, ChatResponse, ConversationStartRequest, 
     ConversationResponse, ConversationHistoryResponse,
-    ConversationListResponse
+    ConversationListResponse, UsageReportResponse
 )
-from ..services.database_service import ConversationService, ResumeService
-from ..services.openrouter_service import openrouter_service
+from ..services.async_database_service import AsyncConversationService
+from ..services.database_service import MAX_HISTORY_PAGE_SIZE
+from ..services.admission import OverloadedError
+from ..services.metrics import chat_stage_duration_seconds
+from ..services.openrouter_service import ChatCompletion, openrouter_service, OpenRouterError
+from ..services.prompt_cache import prompt_cache
+from ..services.context_window import context_window
+from ..services.response_cache import response_cache
+from ..services.semantic_cache import semantic_cache
+from ..services.summary_service import summary_service
+from ..services.write_behind import message_writer
 from ..config import settings
+from .streaming import SSE_HEADERS, sse_event
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 
+def usage_columns(completion: ChatCompletion) -> Dict[str, Any]:
+    """Get the assistant message's usage column values for a completion."""
+    return {
+        "tokens_used": completion.total_tokens,
+        "model_used": completion.model,
+        "prompt_tokens": completion.prompt_tokens,
+        "completion_tokens": completion.completion_tokens,
+        "latency_ms": completion.latency_ms,
+        "finish_reason": completion.finish_reason,
+    }
+
+
 @router.options("/start")
 @router.options("")
 async def options_handler():
@@ -28,7 +54,7 @@ async def options_handler():
 @router.post("/start", response_model=ConversationResponse)
 async def start_conversation(
     request: ConversationStartRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> ConversationResponse:
     """
     Start a new conversation.
@@ -41,7 +67,7 @@ async def start_conversation(
         ConversationResponse with new conversation details
     """
     try:
-        conversation = ConversationService.create_conversation(
+        conversation = await AsyncConversationService.create_conversation(
             db=db,
             user_name=request.user_name or "User",
             user_email=request.user_email
@@ -62,13 +88,15 @@ async def start_conversation(
 @router.post("/message-with-history", response_model=ChatResponse)
 async def send_message_with_history(
     request: ChatRequest,
-    db: Session = Depends(get_db)
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_db)
 ) -> ChatResponse:
     """
     Send a message with conversation history saved to database.
     
     Args:
         request: ChatRequest with message and conversation_id
+        background_tasks: Runs conversation summarization after the response
         db: Database session
         
     Returns:
@@ -79,66 +107,118 @@ async def send_message_with_history(
         if not request.message.strip():
             raise HTTPException(status_code=400, detail="Message cannot be empty")
         
+        received_at = datetime.utcnow()
         conversation_id = request.conversation_id
+        is_new_conversation = not conversation_id
         
-        # If no conversation_id, create new one
-        if not conversation_id:
-            conversation = ConversationService.create_conversation(
-                db=db,
-                user_name="User"
-            )
-            conversation_id = conversation.id
-        
-        # Save user message
-        ConversationService.add_message(
-            db=db,
-            conversation_id=conversation_id,
-            role="user",
-            content=request.message
-        )
+        with chat_stage_duration_seconds.time(stage="prompt_build"):
+            system_message = prompt_cache.system_message(settings.resume_context, request.message)
         
         # Build messages list for OpenRouter
         messages = []
         
-        # Get conversation history from database
-        db_messages = ConversationService.get_conversation_history(db, conversation_id)
-        for msg in db_messages:
-            messages.append({
-                "role": msg.role,
-                "content": msg.content
-            })
-        
-        # Get system prompt
-        system_prompt = openrouter_service.build_system_prompt(settings.resume_context)
-        
-        # Prepare messages with system prompt
-        full_messages = [
-            {"role": "system", "content": system_prompt},
-            *messages
-        ]
-        
-        # Get response from OpenRouter
-        response_text = await openrouter_service.chat_completion(
-            messages=full_messages,
-            temperature=0.7,
-            max_tokens=512
-        )
-        
-        if response_text is None or response_text.startswith("Error:"):
-            error_msg = response_text or "Failed to get response from AI service"
-            logger.error(f"AI service error: {error_msg}")
-            raise HTTPException(
-                status_code=500,
-                detail=error_msg
+        if is_new_conversation:
+            # New conversation: it is created together with the first turn
+            conversation_id = str(uuid.uuid4())
+        else:
+            # Load the rolling summary plus the recent history that fits the token budget
+            with chat_stage_duration_seconds.time(stage="history_load"):
+                await message_writer.flush_for(conversation_id)
+                token_budget = context_window.history_budget(
+                    system_message, request.message, openrouter_service.model
+                )
+                summary, db_messages = await AsyncConversationService.get_context(
+                    db, conversation_id, token_budget
+                )
+                if summary:
+                    messages.append(summary_service.summary_message(summary))
+                for msg in db_messages:
+                    messages.append({
+                        "role": msg.role,
+                        "content": msg.content
+                    })
+                
+                # End the read transaction so no connection is held during the upstream call
+                await db.commit()
+        
+        # Add current message (persisted below together with the reply)
+        messages.append({
+            "role": "user",
+            "content": request.message
+        })
+        
+        # Prepare messages with the prebuilt system prompt
+        full_messages = [system_message, *messages]
+        
+        with chat_stage_duration_seconds.time(stage="cache_lookup"):
+            # Serve repeated questions (same resume, question and history) from the cache
+            resume_version = prompt_cache.version(settings.resume_context)
+            cache_key = response_cache.make_key(
+                model=openrouter_service.model,
+                resume_version=resume_version,
+                messages=full_messages[1:],
+                temperature=0.7,
+                max_tokens=512
             )
+            response_text = response_cache.get(cache_key)
+            
+            # Opening questions can also be answered from the semantic cache
+            semantic = None
+            if response_text is None and len(full_messages) == 2:
+                semantic = await semantic_cache.lookup(request.message, resume_version)
+                response_text = semantic.answer
+        
+        # Cached replies are saved without usage (no upstream call was made)
+        completion = ChatCompletion(response_text)
+        if response_text is None:
+            # Get response from OpenRouter
+            with chat_stage_duration_seconds.time(stage="upstream"):
+                completion = await openrouter_service.chat_completion(
+                    messages=full_messages,
+                    temperature=0.7,
+                    max_tokens=512
+                )
+            response_text = completion.content
+            
+            if not completion.ok:
+                error_msg = response_text or "Failed to get response from AI service"
+                logger.error(f"AI service error: {error_msg}")
+                raise HTTPException(
+                    status_code=500,
+                    detail=error_msg
+                )
+            
+            response_cache.set(cache_key, response_text)
+            if semantic is not None:
+                semantic_cache.store(semantic, resume_version, response_text)
+        
+        # Save user message and assistant reply in one transaction (queued in write-behind mode)
+        with chat_stage_duration_seconds.time(stage="persist"):
+            usage = usage_columns(completion)
+            if message_writer.enabled:
+                await message_writer.enqueue_turn(
+                    conversation_id=conversation_id,
+                    user_content=request.message,
+                    assistant_content=response_text,
+                    user_created_at=received_at,
+                    create_conversation=is_new_conversation,
+                    user_name=request.user_name or "User",
+                    **usage
+                )
+            else:
+                await AsyncConversationService.add_turn(
+                    db=db,
+                    conversation_id=conversation_id,
+                    user_content=request.message,
+                    assistant_content=response_text,
+                    user_created_at=received_at,
+                    create_conversation=is_new_conversation,
+                    user_name=request.user_name or "User",
+                    **usage
+                )
         
-        # Save assistant message
-        ConversationService.add_message(
-            db=db,
-            conversation_id=conversation_id,
-            role="assistant",
-            content=response_text
-        )
+        # Compress older turns once the response has been sent
+        background_tasks.add_task(summary_service.maybe_summarize, conversation_id)
         
         logger.info(f"Message processed in conversation: {conversation_id}")
         
@@ -149,16 +229,204 @@ async def send_message_with_history(
         
     except HTTPException:
         raise
+    except OverloadedError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
     except Exception as e:
         logger.error(f"Error in send_message_with_history: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/message-with-history/stream")
+async def stream_message_with_history(
+    request: ChatRequest,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_db)
+) -> StreamingResponse:
+    """
+    Send a message with saved history and stream the reply as Server-Sent-Events.
+    
+    The user message and assistant reply are saved together once the stream
+    completes, and the reply's message ID is returned in the ``done`` event.
+    
+    Args:
+        request: ChatRequest with message and conversation_id
+        background_tasks: Runs conversation summarization after the stream ends
+        db: Database session
+        
+    Returns:
+        StreamingResponse with media type text/event-stream
+    """
+    try:
+        # Validate input
+        if not request.message.strip():
+            raise HTTPException(status_code=400, detail="Message cannot be empty")
+        
+        # Reject up front while saturated; once streaming starts the status is already 200
+        openrouter_service.limiter.check()
+        
+        received_at = datetime.utcnow()
+        conversation_id = request.conversation_id
+        is_new_conversation = not conversation_id
+        
+        system_message = prompt_cache.system_message(settings.resume_context, request.message)
+        
+        # Build messages list for OpenRouter
+        messages = []
+        
+        if is_new_conversation:
+            conversation_id = str(uuid.uuid4())
+        else:
+            await message_writer.flush_for(conversation_id)
+            token_budget = context_window.history_budget(
+                system_message, request.message, openrouter_service.model
+            )
+            summary, db_messages = await AsyncConversationService.get_context(
+                db, conversation_id, token_budget
+            )
+            if summary:
+                messages.append(summary_service.summary_message(summary))
+            messages.extend({"role": msg.role, "content": msg.content} for msg in db_messages)
+            await db.commit()
+        
+        messages.append({"role": "user", "content": request.message})
+        
+        full_messages = [system_message, *messages]
+    except HTTPException:
+        raise
+    except OverloadedError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    except Exception as e:
+        logger.error(f"Error in stream_message_with_history: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    async def event_stream() -> AsyncIterator[str]:
+        parts: List[str] = []
+        completion: Dict[str, Any] = {}
+        try:
+            async for delta in openrouter_service.chat_completion_stream(
+                messages=full_messages,
+                temperature=0.7,
+                max_tokens=512,
+                completion=completion
+            ):
+                parts.append(delta)
+                yield sse_event({"delta": delta, "conversation_id": conversation_id})
+        except OpenRouterError as e:
+            logger.error(f"AI service error: {str(e)}")
+            yield sse_event({"detail": str(e), "conversation_id": conversation_id}, event="error")
+            return
+        
+        response_text = "".join(parts)
+        usage = usage_columns(ChatCompletion(response_text, **completion))
+        
+        # The request-scoped session may already be closed once streaming starts,
+        # so persist the turn with a session owned by the stream.
+        try:
+            if message_writer.enabled:
+                _, message = await message_writer.enqueue_turn(
+                    conversation_id=conversation_id,
+                    user_content=request.message,
+                    assistant_content=response_text,
+                    user_created_at=received_at,
+                    create_conversation=is_new_conversation,
+                    user_name=request.user_name or "User",
+                    **usage
+                )
+            else:
+                async with AsyncSessionLocal() as stream_db:
+                    _, message = await AsyncConversationService.add_turn(
+                        db=stream_db,
+                        conversation_id=conversation_id,
+                        user_content=request.message,
+                        assistant_content=response_text,
+                        user_created_at=received_at,
+                        create_conversation=is_new_conversation,
+                        user_name=request.user_name or "User",
+                        **usage
+                    )
+            message_id = message.id
+        except Exception as e:
+            logger.error(f"Error saving streamed reply: {str(e)}")
+            yield sse_event({"detail": str(e), "conversation_id": conversation_id}, event="error")
+            return
+        
+        logger.info(f"Streamed message processed in conversation: {conversation_id}")
+        
+        yield sse_event(
+            {
+                "message": response_text,
+                "conversation_id": conversation_id,
+                "message_id": message_id,
+            },
+            event="done"
+        )
+    
+    background_tasks.add_task(summary_service.maybe_summarize, conversation_id)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+        background=background_tasks
+    )
+
+
+# Declared before /{user_name}, which would otherwise match it
+@router.get("/usage/report", response_model=UsageReportResponse)
+async def get_usage_report(
+    days: int = Query(30, ge=1, le=366, description="Days back from now (ignored with since)"),
+    since: Optional[datetime] = Query(None, description="Start of the range (UTC)"),
+    until: Optional[datetime] = Query(None, description="End of the range (UTC, default now)"),
+    group_by: str = Query("day_model", pattern="^(day|model|day_model)$", description="day, model or day_model"),
+    db: AsyncSession = Depends(get_async_db)
+) -> UsageReportResponse:
+    """
+    Get token usage and upstream latency of assistant replies per day and/or model.
+    
+    Args:
+        days: Days back from now, when since is not given
+        since: Start of the range (UTC)
+        until: End of the range (UTC, defaults to now)
+        group_by: Grouping of the rows
+        db: Database session
+        
+    Returns:
+        UsageReportResponse with one row per group
+    """
+    try:
+        # Stored timestamps are naive UTC
+        since, until = (
+            value.astimezone(timezone.utc).replace(tzinfo=None) if value and value.tzinfo else value
+            for value in (since, until)
+        )
+        until = until or datetime.utcnow()
+        since = since or until - timedelta(days=days)
+        if since >= until:
+            raise HTTPException(status_code=400, detail="since must be before until")
+        
+        # Count replies still waiting in the write-behind queue
+        await message_writer.flush()
+        rows = await AsyncConversationService.get_usage_report(
+            db,
+            since=since,
+            until=until,
+            by_day=group_by != "model",
+            by_model=group_by != "day"
+        )
+        
+        return UsageReportResponse(since=since, until=until, group_by=group_by, rows=rows)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error building usage report: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/{user_name}", response_model=ConversationListResponse)
 async def get_user_conversations(
     user_name: str,
     limit: int = 10,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> ConversationListResponse:
     """
     Get all conversations for a user.
@@ -172,7 +440,8 @@ async def get_user_conversations(
         List of user's conversations
     """
     try:
-        conversations = ConversationService.get_user_conversations(
+        await message_writer.flush()
+        conversations = await AsyncConversationService.get_user_conversations(
             db=db,
             user_name=user_name,
             limit=limit
@@ -197,20 +466,31 @@ async def get_user_conversations(
 @router.get("/conversation/{conversation_id}", response_model=ConversationHistoryResponse)
 async def get_conversation_history(
     conversation_id: str,
-    db: Session = Depends(get_db)
+    limit: int = Query(50, ge=1, le=MAX_HISTORY_PAGE_SIZE, description="Messages per page"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    latest: bool = Query(False, description="Return the newest messages first and page backwards"),
+    db: AsyncSession = Depends(get_async_db)
 ) -> ConversationHistoryResponse:
     """
-    Get full history of a conversation.
+    Get a page of a conversation's history.
+    
+    Messages are always returned in chronological order. By default pages go
+    forward from the first message; with ``latest=true`` the first page holds
+    the most recent ``limit`` messages and ``next_cursor`` loads older ones.
     
     Args:
         conversation_id: ID of the conversation
+        limit: Maximum messages to return
+        cursor: Cursor from the previous page (optional)
+        latest: Page backwards from the newest message
         db: Database session
         
     Returns:
-        Conversation history with all messages
+        Conversation history page with next_cursor
     """
     try:
-        conversation = ConversationService.get_conversation(db, conversation_id)
+        await message_writer.flush_for(conversation_id)
+        conversation = await AsyncConversationService.get_conversation(db, conversation_id)
         
         if not conversation:
             raise HTTPException(
@@ -218,7 +498,16 @@ async def get_conversation_history(
                 detail=f"Conversation {conversation_id} not found"
             )
         
-        messages = ConversationService.get_conversation_history(db, conversation_id)
+        try:
+            messages, next_cursor = await AsyncConversationService.get_history_page(
+                db,
+                conversation_id,
+                limit=limit,
+                cursor=cursor,
+                latest=latest
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
         
         return ConversationHistoryResponse(
             conversation_id=conversation.id,
@@ -232,7 +521,8 @@ async def get_conversation_history(
                 for msg in messages
             ],
             created_at=conversation.created_at,
-            updated_at=conversation.updated_at
+            updated_at=conversation.updated_at,
+            next_cursor=next_cursor
         )
     except HTTPException:
         raise
@@ -244,7 +534,7 @@ async def get_conversation_history(
 @router.delete("/conversation/{conversation_id}")
 async def delete_conversation(
     conversation_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Delete a conversation (soft delete).
@@ -257,7 +547,8 @@ async def delete_conversation(
         Success status
     """
     try:
-        success = ConversationService.delete_conversation(db, conversation_id)
+        await message_writer.flush_for(conversation_id)
+        success = await AsyncConversationService.delete_conversation(db, conversation_id)
         
         if not success:
             raise HTTPException(
@@ -279,7 +570,7 @@ async def delete_conversation(
 @router.post("/conversation/{conversation_id}/archive")
 async def archive_conversation(
     conversation_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Archive a conversation.
@@ -292,7 +583,8 @@ async def archive_conversation(
         Success status
     """
     try:
-        success = ConversationService.archive_conversation(db, conversation_id)
+        await message_writer.flush_for(conversation_id)
+        success = await AsyncConversationService.archive_conversation(db, conversation_id)
         
         if not success:
             raise HTTPException(
@@ -312,7 +604,7 @@ async def archive_conversation(
 
 
 @router.get("/db-health")
-async def database_health(db: Session = Depends(get_db)):
+async def database_health(db: AsyncSession = Depends(get_async_db)):
     """
     Check database health.
     
@@ -326,7 +618,7 @@ async def database_health(db: Session = Depends(get_db)):
         from ..models.db.models import Conversation
         
         # Try a simple query to check connection
-        db.query(Conversation).first()
+        await db.execute(select(Conversation).limit(1))
         
         return {
             "status": "healthy",
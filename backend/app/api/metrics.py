@@ -0,0 +1,131 @@
+"""Prometheus metrics endpoint and request metrics middleware."""
+from fastapi import APIRouter
+from fastapi.responses import Response
+from typing import Optional
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+import time
+from ..services.metrics import (
+    CONTENT_TYPE,
+    MetricsRegistry,
+    http_request_duration_seconds,
+    http_requests_in_flight,
+    http_requests_total,
+    metrics,
+)
+from ..services.openrouter_service import openrouter_service
+from ..services.write_behind import message_writer
+
+router = APIRouter()
+
+# Requests that matched no route share one label instead of one per path
+UNMATCHED_ROUTE = "unmatched"
+
+
+def route_template(scope: Scope) -> str:
+    """
+    Get the full path template of the route that handled a request.
+    
+    The router stores the matched route in the (shared) scope, but an included
+    router's route only knows its path below the prefix, so the prefix is
+    recovered by rendering that path with the request's path parameters.
+    
+    Args:
+        scope: ASGI scope after routing
+    
+    Returns:
+        Template such as ``/api/v1/conversations/conversation/{conversation_id}``
+    """
+    route = scope.get("route")
+    path_format = getattr(route, "path_format", None)
+    if path_format is None:
+        return UNMATCHED_ROUTE
+    
+    try:
+        convertors = route.param_convertors
+        rendered = path_format.format(**{
+            name: convertors[name].to_string(value)
+            for name, value in scope.get("path_params", {}).items()
+            if name in convertors
+        })
+    except (AttributeError, KeyError, ValueError, AssertionError):
+        return path_format
+    
+    path = scope["path"]
+    if rendered and path.endswith(rendered):
+        return path[:len(path) - len(rendered)] + path_format
+    return path_format
+
+
+class MetricsMiddleware:
+    """
+    Count HTTP requests and time them until the response has been sent.
+    
+    Requests are labelled by route template (``/api/v1/conversations/{user_name}``)
+    rather than by path. Streaming responses are timed until their last chunk.
+    """
+    
+    def __init__(self, app: ASGIApp, registry: MetricsRegistry = metrics):
+        self.app = app
+        self.registry = registry
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.registry.enabled:
+            await self.app(scope, receive, send)
+            return
+        
+        status = 500
+        finished: Optional[float] = None
+        
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status, finished
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                finished = time.perf_counter()
+        
+        started = time.perf_counter()
+        http_requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_requests_in_flight.dec()
+            # Background tasks run after the last chunk and don't count towards latency
+            elapsed = (finished or time.perf_counter()) - started
+            template = route_template(scope)
+            method = scope["method"]
+            http_requests_total.inc(method=method, route=template, status=str(status))
+            http_request_duration_seconds.observe(elapsed, method=method, route=template)
+
+
+@router.get("/metrics", include_in_schema=False)
+async def prometheus_metrics() -> Response:
+    """Expose all metrics in the Prometheus text format."""
+    return Response(metrics.render(), media_type=CONTENT_TYPE)
+
+
+# Admission control and write-behind state, read from the services when scraped
+metrics.callback(
+    "openrouter_admission",
+    "Upstream concurrency slots in use and calls waiting for one",
+    lambda: {
+        ("in_flight",): openrouter_service.limiter.in_flight,
+        ("queued",): openrouter_service.limiter.waiting,
+    },
+    labelnames=("state",),
+)
+metrics.callback(
+    "openrouter_admission_rejected_total",
+    "Upstream calls rejected by admission control",
+    lambda: {
+        ("queue_full",): openrouter_service.limiter.rejected_queue_full,
+        ("timeout",): openrouter_service.limiter.rejected_timeout,
+    },
+    labelnames=("reason",),
+    kind="counter",
+)
+metrics.callback(
+    "write_behind_queued_turns",
+    "Chat turns waiting to be written",
+    lambda: {(): message_writer.stats()["queued"]},
+)
@@ -0,0 +1,102 @@
+"""ASGI middleware applying per-client rate limits."""
+from typing import Optional, Tuple
+from urllib.parse import parse_qs
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+import json
+from ..config import settings
+from ..services.rate_limiter import RateLimiter, rate_limiter
+
+# Larger bodies are passed through without looking for a user_name
+MAX_INSPECTED_BODY = 64 * 1024
+
+
+class RateLimitMiddleware:
+    """
+    Rate limit requests to RATE_LIMIT_PATHS per client IP and user_name.
+    
+    The user_name is taken from the query string or a JSON body; the body is
+    buffered and replayed to the endpoint. Limited requests get a 429 with a
+    Retry-After header.
+    """
+    
+    def __init__(self, app: ASGIApp, limiter: RateLimiter = rate_limiter):
+        self.app = app
+        self.limiter = limiter
+        self.paths = tuple(settings.rate_limit_paths)
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] == "OPTIONS"
+            or not self.limiter.enabled
+            or not scope["path"].startswith(self.paths)
+        ):
+            await self.app(scope, receive, send)
+            return
+        
+        user_name, receive = await self._user_name(scope, receive)
+        retry_after = await self.limiter.check(self._client_ip(scope), user_name)
+        if retry_after is not None:
+            response = JSONResponse(
+                {"detail": "Too many requests, please slow down"},
+                status_code=429,
+                headers={"Retry-After": str(retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+        
+        await self.app(scope, receive, send)
+    
+    def _client_ip(self, scope: Scope) -> str:
+        """Get the client IP, from X-Forwarded-For when behind a trusted proxy."""
+        if settings.rate_limit_trust_forwarded:
+            for name, value in scope["headers"]:
+                if name == b"x-forwarded-for":
+                    return value.decode("latin-1").split(",")[0].strip()
+        client = scope.get("client")
+        return client[0] if client else "unknown"
+    
+    async def _user_name(self, scope: Scope, receive: Receive) -> Tuple[Optional[str], Receive]:
+        """
+        Find the user_name of a request.
+        
+        Returns:
+            Tuple of (user_name or None, receive callable that replays any consumed body)
+        """
+        query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        if query.get("user_name"):
+            return query["user_name"][0], receive
+        
+        headers = dict(scope["headers"])
+        if scope["method"] != "POST" or not headers.get(b"content-type", b"").startswith(b"application/json"):
+            return None, receive
+        try:
+            length = int(headers.get(b"content-length", b"0"))
+        except ValueError:
+            return None, receive
+        if not 0 < length <= MAX_INSPECTED_BODY:
+            return None, receive
+        
+        chunks = []
+        more_body = True
+        while more_body:
+            message = await receive()
+            chunks.append(message.get("body", b""))
+            more_body = message.get("more_body", False)
+        body = b"".join(chunks)
+        
+        replayed = False
+        
+        async def replay():
+            nonlocal replayed
+            if not replayed:
+                replayed = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+        
+        try:
+            user_name = json.loads(body).get("user_name")
+        except (ValueError, AttributeError):
+            user_name = None
+        return (user_name if isinstance(user_name, str) else None), replay
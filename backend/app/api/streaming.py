@@ -0,0 +1,25 @@
+"""Helpers for Server-Sent-Events (SSE) responses."""
+from typing import Any, Dict, Optional
+import json
+
+# Disable proxy buffering so tokens reach the browser as soon as they are sent
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    "X-Accel-Buffering": "no",
+}
+
+
+def sse_event(data: Dict[str, Any], event: Optional[str] = None) -> str:
+    """
+    Format a single Server-Sent-Event frame.
+    
+    Args:
+        data: JSON-serializable payload
+        event: Optional event name (defaults to "message" on the client)
+    
+    Returns:
+        SSE frame terminated by a blank line
+    """
+    frame = f"event: {event}\n" if event else ""
+    return f"{frame}data: {json.dumps(data, default=str)}\n\n"
@@ -0,0 +1,75 @@
+"""ASGI middleware starting a trace per sampled request."""
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from ..services.tracing import SPAN_KIND_SERVER, Tracer, tracer
+from .metrics import route_template
+
+
+class TracingMiddleware:
+    """
+    Wrap each sampled HTTP request in a server span.
+    
+    A valid incoming ``traceparent`` header is continued (and its sampled flag
+    followed). DB queries and OpenRouter calls made while handling the request
+    become child spans. The span ends with the last response chunk, and a
+    traced response carries its trace in a ``traceparent`` header.
+    """
+    
+    def __init__(self, app: ASGIApp, tracer: Tracer = tracer):
+        self.app = app
+        self.tracer = tracer
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+        
+        traceparent = None
+        for name, value in scope["headers"]:
+            if name == b"traceparent":
+                traceparent = value.decode("latin-1")
+                break
+        
+        method = scope["method"]
+        span = self.tracer.start_trace(
+            method,
+            traceparent=traceparent,
+            kind=SPAN_KIND_SERVER,
+            attributes={"http.request.method": method, "url.path": scope["path"]},
+        )
+        if span is None:
+            await self.app(scope, receive, send)
+            return
+        
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                span.set_attribute("http.response.status_code", status)
+                if status >= 500:
+                    span.set_error(f"HTTP {status}")
+                message = {
+                    **message,
+                    "headers": [*message.get("headers", []), (b"traceparent", span.traceparent.encode("latin-1"))],
+                }
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                # Background tasks that follow stay in the trace but outside the request span
+                self._finish(span, scope)
+        
+        token = self.tracer.activate(span)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except BaseException as e:
+            span.set_error(f"{type(e).__name__}: {str(e)}")
+            raise
+        finally:
+            self.tracer.deactivate(token)
+            self._finish(span, scope)
+    
+    @staticmethod
+    def _finish(span, scope: Scope) -> None:
+        """Name the span after the matched route and end it."""
+        if span.end_ns is None:
+            template = route_template(scope)
+            span.name = f"{scope['method']} {template}"
+            span.set_attribute("http.route", template)
+            span.end()
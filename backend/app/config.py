@@ -1,7 +1,7 @@
 """Configuration settings for the backend application."""
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import Field, ConfigDict
-from typing import List, Optional
+from typing import Dict, List, Optional
 import json
 
 
@@ -26,6 +26,87 @@ class Settings(BaseSettings):
     # API Keys
     openrouter_api_key: str = ""
     openrouter_model: str = "openai/gpt-3.5-turbo"
+    openrouter_api_url: Optional[str] = None  # Chat completions URL override (proxy or local stand-in)
+    openrouter_fallback_models: List[str] = []  # Tried after the primary model, e.g. ["anthropic/claude-3-haiku"]
+    openrouter_model_timeouts: Dict[str, float] = {}  # Per-model read timeouts, e.g. {"openai/gpt-4o": 20}
+    openrouter_hedge_requests: bool = False  # Also ask the next model once the first is slower than its p95
+    openrouter_hedge_delay: float = 2.0  # Hedge delay in seconds until a model has latency samples
+    model_router_window: int = 100  # Recent requests per model used for p50/p95 and error rate
+    
+    # OpenRouter HTTP client (shared for the lifetime of the app)
+    openrouter_timeout: float = 30.0  # Read/write timeout in seconds
+    openrouter_connect_timeout: float = 5.0
+    openrouter_max_connections: int = 100
+    openrouter_max_keepalive_connections: int = 20
+    openrouter_keepalive_expiry: float = 30.0
+    openrouter_http2: bool = False  # Requires the optional 'h2' package
+    openrouter_coalesce_requests: bool = True  # Identical concurrent requests share one upstream call
+    openrouter_admission_control: bool = True
+    openrouter_max_concurrency: int = 32  # Upstream calls in flight at once
+    openrouter_max_queue: int = 64  # Calls waiting for a slot; more are rejected with 503
+    openrouter_queue_timeout: float = 10.0  # Seconds a call may wait for a slot
+    
+    # OpenRouter retries (connection errors, 429 and 5xx) and circuit breaker
+    openrouter_max_retries: int = 2
+    openrouter_retry_backoff: float = 0.5  # Base delay in seconds, doubled per attempt with jitter
+    openrouter_retry_max_delay: float = 8.0  # Longer Retry-After waits are not retried
+    circuit_breaker_enabled: bool = True
+    circuit_breaker_failure_rate: float = 0.5  # Open when this share of recent calls fail
+    circuit_breaker_window: int = 20  # Recent calls considered
+    circuit_breaker_min_calls: int = 5
+    circuit_breaker_open_seconds: float = 30.0  # Fail fast for this long before probing again
+    
+    # Rate limits (token buckets) for the LLM endpoints, per client IP and per user_name
+    rate_limit_enabled: bool = True
+    rate_limit_paths: List[str] = ["/api/v1/chat/message", "/api/v1/conversations/message-with-history"]
+    rate_limit_ip_rate: float = 0.2  # Tokens per second (12 requests/minute)
+    rate_limit_ip_burst: int = 20
+    rate_limit_user_rate: float = 0.1  # 6 requests/minute
+    rate_limit_user_burst: int = 10
+    rate_limit_trust_forwarded: bool = False  # Use X-Forwarded-For (only behind a trusted proxy)
+    rate_limit_redis_url: Optional[str] = None  # Share buckets across workers (requires 'redis')
+    
+    # Prometheus metrics at GET /metrics (request latency, chat stages, upstream usage, DB pool)
+    metrics_enabled: bool = True
+    
+    # Tracing: OTLP/JSON spans for sampled requests, their DB queries and OpenRouter calls
+    tracing_enabled: bool = False
+    tracing_sample_rate: float = 0.05  # Share of requests traced; a caller's sampled traceparent is always followed
+    tracing_service_name: str = "portfolio-api"
+    tracing_export_file: Optional[str] = None  # Append one OTLP/JSON export request per line
+    tracing_otlp_endpoint: Optional[str] = None  # OTLP/HTTP JSON collector, e.g. http://localhost:4318/v1/traces
+    tracing_export_interval: float = 5.0  # Seconds between exports
+    tracing_max_queue: int = 4096  # Finished spans waiting for export; more are dropped
+    
+    # Prompt context window (estimated input tokens: system prompt + history + new message)
+    context_token_budget: int = 3000
+    context_model_budgets: Dict[str, int] = {}  # Per-model overrides, e.g. {"openai/gpt-4o": 12000}
+    context_history_page_size: int = 20  # Messages fetched per DB round-trip when loading the tail
+    
+    # Rolling conversation summaries (run in the background after a reply)
+    summary_enabled: bool = True
+    summary_model: str = "openai/gpt-3.5-turbo"  # Cheap model used to compress old turns
+    summary_keep_recent: int = 8  # Newest messages always sent verbatim
+    summary_trigger_messages: int = 12  # Unsummarized messages beyond keep_recent that trigger a summary
+    summary_max_tokens: int = 300
+    
+    # Response cache for repeated questions (keyed by model, resume version, question, history)
+    response_cache_enabled: bool = True
+    response_cache_max_entries: int = 1024
+    response_cache_max_bytes: int = 8 * 1024 * 1024
+    response_cache_ttl_seconds: float = 3600.0
+    
+    # Resume retrieval: send only the resume sections relevant to each question
+    resume_retrieval_enabled: bool = True
+    resume_retrieval_min_tokens: int = 600  # Resumes shorter than this are always sent whole
+    resume_retrieval_top_k: int = 6  # Resume chunks included per question
+    
+    # Semantic cache: reuse answers to paraphrased single-turn questions (needs numpy)
+    semantic_cache_enabled: bool = False
+    semantic_cache_model: str = "sentence-transformers/all-MiniLM-L6-v2"  # Used if sentence-transformers is installed
+    semantic_cache_threshold: float = 0.9  # Minimum cosine similarity for a hit
+    semantic_cache_max_entries: int = 2048
+    semantic_cache_ann_min_entries: int = 5000  # Use an hnswlib index (if installed) from this capacity
     
     # Server Configuration
     server_host: str = "0.0.0.0"
@@ -36,6 +117,12 @@ class Settings(BaseSettings):
     database_url: str = "sqlite:///./portfolio.db"  # Default to SQLite
     DATABASE_URL: str = "sqlite:///./portfolio.db"  # Uppercase alias for compatibility
     
+    # Write-behind message persistence: replies return before their turn is committed
+    message_write_behind: bool = False
+    write_behind_max_queue: int = 1000  # Queued turns; enqueueing waits once full
+    write_behind_batch_size: int = 100  # Turns written per transaction
+    write_behind_flush_interval: float = 0.05  # Seconds the worker waits to gather a batch
+    
     # CORS - Store as optional string to avoid JSON parsing issues
     # Manually get from env, don't let pydantic-settings parse it
     cors_origins_str: Optional[str] = Field(
@@ -1,6 +1,9 @@
 """Database configuration and session management."""
 import os
+from typing import AsyncIterator
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import StaticPool
 import logging
@@ -16,6 +19,61 @@ if not DATABASE_URL or DATABASE_URL.strip() == "":
     logger.warning("DATABASE_URL is empty, using SQLite default")
     DATABASE_URL = "sqlite:///./portfolio.db"
 
+
+def to_sync_url(url: str) -> str:
+    """
+    Get the synchronous driver URL for a database URL.
+    
+    Args:
+        url: Database URL, optionally using an async driver
+        
+    Returns:
+        URL using the default sync driver (sqlite3 / psycopg2 / mysqlclient)
+    """
+    if url.startswith("postgres://"):
+        url = "postgresql://" + url[len("postgres://"):]
+    parsed = make_url(url)
+    if parsed.drivername in ("sqlite+aiosqlite", "postgresql+asyncpg", "mysql+asyncmy"):
+        parsed = parsed.set(drivername=parsed.get_backend_name())
+    elif parsed.drivername == "mysql+aiomysql":
+        # aiomysql is built on PyMySQL, so that driver is installed too
+        parsed = parsed.set(drivername="mysql+pymysql")
+    return parsed.render_as_string(hide_password=False)
+
+
+def to_async_url(url: str) -> str:
+    """
+    Get the async driver URL for a database URL.
+    
+    SQLite maps to aiosqlite, PostgreSQL to asyncpg and MySQL to aiomysql.
+    The libpq-only ``sslmode`` query parameter is translated to asyncpg's
+    ``ssl``.
+    
+    Args:
+        url: Database URL as configured in DATABASE_URL
+        
+    Returns:
+        URL using an async driver
+    """
+    parsed = make_url(to_sync_url(url))
+    backend = parsed.get_backend_name()
+    if backend == "sqlite":
+        parsed = parsed.set(drivername="sqlite+aiosqlite")
+    elif backend == "postgresql":
+        query = dict(parsed.query)
+        if "sslmode" in query:
+            query["ssl"] = query.pop("sslmode")
+        parsed = parsed.set(drivername="postgresql+asyncpg", query=query)
+    elif backend == "mysql":
+        parsed = parsed.set(drivername="mysql+aiomysql")
+    return parsed.render_as_string(hide_password=False)
+
+
+try:
+    DATABASE_URL = to_sync_url(DATABASE_URL)
+except Exception as e:
+    logger.warning(f"Could not parse DATABASE_URL: {e}")
+
 # SQLite engine configuration
 try:
     if DATABASE_URL.startswith("sqlite"):
@@ -42,6 +100,27 @@ except Exception as e:
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine for request handlers, so queries don't block the event loop
+try:
+    ASYNC_DATABASE_URL = to_async_url(DATABASE_URL)
+    if ASYNC_DATABASE_URL.startswith("sqlite"):
+        async_engine = create_async_engine(ASYNC_DATABASE_URL)
+    else:
+        async_engine = create_async_engine(ASYNC_DATABASE_URL, echo=False, pool_pre_ping=True)
+    logger.info(f"Using async database driver: {async_engine.dialect.driver}")
+except Exception as e:
+    logger.error(f"Failed to create async database engine: {e}")
+    logger.warning("Install 'aiosqlite' (SQLite), 'asyncpg' (PostgreSQL) or 'aiomysql' (MySQL) for async database access")
+    ASYNC_DATABASE_URL = None
+    async_engine = None
+
+# Create async session factory (objects stay usable after commit)
+AsyncSessionLocal = (
+    async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+    if async_engine is not None
+    else None
+)
+
 
 def get_db() -> Session:
     """
@@ -55,17 +134,80 @@ def get_db() -> Session:
         db.close()
 
 
+def check_async_engine() -> None:
+    """
+    Make sure request handlers can get async sessions.
+    
+    Raises:
+        RuntimeError: If no async engine could be created for DATABASE_URL
+    """
+    if async_engine is None:
+        raise RuntimeError(
+            f"No async database driver for {make_url(DATABASE_URL).get_backend_name()}; install "
+            f"aiosqlite (SQLite), asyncpg (PostgreSQL) or aiomysql (MySQL)"
+        )
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """
+    Dependency to get an async database session.
+    Usage: async def route(db: AsyncSession = Depends(get_async_db)):
+    """
+    if AsyncSessionLocal is None:
+        raise RuntimeError("Async database driver is not installed")
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def dispose_async_engine():
+    """Close pooled async connections (called on app shutdown)."""
+    if async_engine is not None:
+        await async_engine.dispose()
+
+
 def init_db():
     """Initialize database by creating all tables."""
     try:
         from .models.db.models import Base  # Import after models are defined
         Base.metadata.create_all(bind=engine)
+        add_missing_columns(engine)
         logger.info("Database initialized successfully")
     except Exception as e:
         logger.error(f"Error initializing database: {e}")
         logger.warning("Database initialization failed, but continuing...")
 
 
+def add_missing_columns(bind=None):
+    """
+    Add nullable model columns that are missing from existing tables.
+    
+    create_all only creates missing tables, so columns added to a model later
+    are appended here with ALTER TABLE ... ADD COLUMN.
+    
+    Args:
+        bind: Engine to upgrade (defaults to the app engine)
+    """
+    from sqlalchemy import inspect, text
+    from sqlalchemy.schema import CreateColumn
+    from .models.db.models import Base
+    
+    bind = bind or engine
+    inspector = inspect(bind)
+    existing_tables = set(inspector.get_table_names())
+    
+    with bind.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing_columns = {col["name"] for col in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing_columns or not column.nullable:
+                    continue
+                ddl = CreateColumn(column).compile(dialect=bind.dialect)
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {ddl}"))
+                logger.info(f"Added column {table.name}.{column.name}")
+
+
 def drop_db():
     """Drop all tables (use with caution!)."""
     try:
@@ -1,10 +1,19 @@
 """Main FastAPI application."""
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from contextlib import asynccontextmanager
 import logging
 from .config import settings
-from .api import chat, database
-from .database import init_db
+from .api import chat, database, metrics
+from .api.metrics import MetricsMiddleware
+from .api.rate_limit import RateLimitMiddleware
+from .api.tracing import TracingMiddleware
+from .database import async_engine, check_async_engine, engine, init_db, dispose_async_engine
+from .services.openrouter_service import openrouter_service
+from .services.rate_limiter import rate_limiter
+from .services.semantic_cache import semantic_cache
+from .services.tracing import tracer
+from .services.write_behind import message_writer
 
 # Configure logging
 logging.basicConfig(
@@ -14,6 +23,26 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open shared resources on startup and release them on shutdown."""
+    # Conversation routes need async sessions, so fail now rather than per request
+    check_async_engine()
+    await openrouter_service.startup()
+    await semantic_cache.startup()
+    await message_writer.start()
+    await tracer.start()
+    try:
+        yield
+    finally:
+        await openrouter_service.shutdown()
+        await rate_limiter.backend.close()
+        # Write queued turns before the engine goes away
+        await message_writer.stop()
+        await dispose_async_engine()
+        await tracer.stop()
+
+
 def create_app() -> FastAPI:
     """Create and configure the FastAPI application."""
     
@@ -28,8 +57,12 @@ def create_app() -> FastAPI:
         title="Portfolio API",
         description="AI-powered portfolio with chat functionality",
         version="1.0.0",
+        lifespan=lifespan,
     )
     
+    # Rate limit LLM endpoints (added before CORS so 429s still carry CORS headers)
+    app.add_middleware(RateLimitMiddleware)
+    
     # Configure CORS with sensible defaults
     app.add_middleware(
         CORSMiddleware,
@@ -39,9 +72,22 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
     
+    # Outermost, so rate-limited and CORS responses are counted and timed too
+    if settings.metrics_enabled:
+        app.add_middleware(MetricsMiddleware)
+    
+    # Trace sampled requests with their DB queries (SessionLocal and async sessions)
+    if tracer.enabled:
+        app.add_middleware(TracingMiddleware)
+        tracer.instrument_engine(engine)
+        if async_engine is not None:
+            tracer.instrument_engine(async_engine.sync_engine)
+    
     # Include routers
     app.include_router(chat.router, prefix="/api/v1/chat", tags=["chat"])
     app.include_router(database.router, prefix="/api/v1/conversations", tags=["conversations"])
+    if settings.metrics_enabled:
+        app.include_router(metrics.router, tags=["metrics"])
     
     # Health check endpoint
     @app.get("/health")
@@ -15,6 +15,7 @@ class ChatRequest(BaseModel):
     """Request model for chat endpoint."""
     message: str = Field(..., description="User's message/question")
     conversation_id: Optional[str] = Field(None, description="Conversation ID (optional)")
+    user_name: Optional[str] = Field(None, description="Name of the user (rate limits, owner of a new conversation)")
     conversation_history: Optional[List[Message]] = Field(
         default_factory=list,
         description="Previous messages in the conversation"
@@ -49,6 +50,10 @@ class ConversationHistoryResponse(BaseModel):
     user_name: str = Field(..., description="User name")
     created_at: datetime = Field(..., description="Conversation creation time")
     updated_at: datetime = Field(..., description="Last update time")
+    next_cursor: Optional[str] = Field(
+        None,
+        description="Cursor for the next page, or null when there are no more messages"
+    )
 
 
 class ResumeRequest(BaseModel):
@@ -81,3 +86,24 @@ class ConversationListResponse(BaseModel):
     total: int = Field(..., description="Total number of conversations")
     conversations: List[ConversationResponse] = Field(..., description="List of conversations")
 
+
+
+class UsageReportRow(BaseModel):
+    """Token usage and upstream latency of one day and/or model."""
+    day: Optional[str] = Field(None, description="UTC day (YYYY-MM-DD), when grouping by day")
+    model: Optional[str] = Field(None, description="Model used; empty for cached replies and older rows")
+    replies: int = Field(..., description="Assistant replies")
+    upstream_calls: int = Field(..., description="Replies that came from an OpenRouter call")
+    prompt_tokens: int = Field(..., description="Prompt tokens")
+    completion_tokens: int = Field(..., description="Completion tokens")
+    total_tokens: int = Field(..., description="Prompt plus completion tokens")
+    avg_latency_ms: Optional[float] = Field(None, description="Average upstream latency")
+    max_latency_ms: Optional[int] = Field(None, description="Slowest upstream call")
+
+
+class UsageReportResponse(BaseModel):
+    """Aggregated usage over a date range."""
+    since: datetime = Field(..., description="Start of the range (UTC, inclusive)")
+    until: datetime = Field(..., description="End of the range (UTC, exclusive)")
+    group_by: str = Field(..., description="day, model or day_model")
+    rows: List[UsageReportRow] = Field(..., description="One row per group")
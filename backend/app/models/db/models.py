@@ -1,5 +1,5 @@
 """SQLAlchemy ORM models for database."""
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, create_engine
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index, create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -12,6 +12,10 @@ class Conversation(Base):
     """Conversation model storing user conversations."""
     
     __tablename__ = "conversations"
+    __table_args__ = (
+        # get_user_conversations: filter user_name + is_active, newest updated_at first
+        Index("ix_conversations_user_active_updated", "user_name", "is_active", "updated_at"),
+    )
     
     # Primary key
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
@@ -31,6 +35,11 @@ class Conversation(Base):
     # Status
     is_active = Column(String(20), default="active", nullable=False)  # active, archived, deleted
     
+    # Rolling summary of older messages (covers everything up to the summary_until_* position)
+    summary = Column(Text, nullable=True)
+    summary_until_at = Column(DateTime, nullable=True)  # created_at of the last summarized message
+    summary_until_id = Column(String(36), nullable=True)  # id of the last summarized message
+    
     # Relationship
     messages = relationship("Message", back_populates="conversation", cascade="all, delete-orphan")
     
@@ -42,6 +51,16 @@ class Message(Base):
     """Message model storing individual messages in conversations."""
     
     __tablename__ = "messages"
+    __table_args__ = (
+        # get_conversation_history: filter conversation_id + is_deleted, ordered by
+        # created_at (id breaks ties for keyset pagination)
+        Index(
+            "ix_messages_conversation_history",
+            "conversation_id", "is_deleted", "created_at", "id",
+        ),
+        # get_usage_report: assistant replies in a date range
+        Index("ix_messages_role_created_at", "role", "created_at"),
+    )
     
     # Primary key
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
@@ -54,8 +73,12 @@ class Message(Base):
     content = Column(Text, nullable=False)
     
     # Metadata
-    tokens_used = Column(Integer, nullable=True)  # Track API usage
+    tokens_used = Column(Integer, nullable=True)  # Track API usage (prompt + completion)
     model_used = Column(String(255), nullable=True)  # Which model generated the response
+    prompt_tokens = Column(Integer, nullable=True)
+    completion_tokens = Column(Integer, nullable=True)
+    latency_ms = Column(Integer, nullable=True)  # Upstream call time for the reply
+    finish_reason = Column(String(50), nullable=True)  # stop, length, ...
     
     # Timestamps
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
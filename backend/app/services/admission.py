@@ -0,0 +1,141 @@
+"""Admission control for upstream LLM calls."""
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict
+import asyncio
+import logging
+import math
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class OverloadedError(Exception):
+    """Raised when a call is rejected because the upstream is saturated."""
+    
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class ConcurrencyLimiter:
+    """
+    Bound concurrent calls, with a bounded, time-limited wait queue.
+    
+    Up to ``max_concurrency`` calls run at once and up to ``max_queue`` more
+    wait for a slot. A call is rejected straight away when the queue is full,
+    or after ``queue_timeout`` seconds in the queue, so a spike turns into
+    fast 503s instead of a pile of requests waiting on the upstream.
+    """
+    
+    def __init__(
+        self,
+        max_concurrency: int = 32,
+        max_queue: int = 64,
+        queue_timeout: float = 10.0,
+        enabled: bool = True
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.enabled = enabled
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.in_flight = 0
+        self.waiting = 0
+        self.peak_waiting = 0
+        self.admitted = 0
+        self.rejected_queue_full = 0
+        self.rejected_timeout = 0
+        self._wait_seconds_total = 0.0
+        self._wait_seconds_max = 0.0
+        # Moving average of how long a call holds its slot, for Retry-After
+        self._hold_seconds_avg = 1.0
+    
+    def retry_after(self) -> int:
+        """Estimate the seconds until a slot frees up (at least 1)."""
+        backlog = 1 + self.waiting / self.max_concurrency
+        return max(1, math.ceil(self._hold_seconds_avg * backlog))
+    
+    def check(self) -> None:
+        """
+        Reject early if a new call could not even join the queue.
+        
+        Raises:
+            OverloadedError: If all slots are busy and the queue is full
+        """
+        if not self.enabled:
+            return
+        # Callers still acquiring a free slot count as waiting, so bound the total
+        if self.in_flight + self.waiting >= self.max_concurrency + self.max_queue:
+            self.rejected_queue_full += 1
+            logger.warning(f"Upstream saturated ({self.in_flight} in flight, {self.waiting} queued), rejecting")
+            raise OverloadedError("AI service is busy, please try again shortly", self.retry_after())
+    
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """
+        Hold one concurrency slot for the duration of the block.
+        
+        Raises:
+            OverloadedError: If the queue is full or the wait times out
+        """
+        if not self.enabled:
+            yield
+            return
+        
+        self.check()
+        started = time.perf_counter()
+        self.waiting += 1
+        self.peak_waiting = max(self.peak_waiting, self.waiting)
+        acquire = asyncio.ensure_future(self._semaphore.acquire())
+        try:
+            # Shielded: before Python 3.12, wait_for could lose a permit acquired
+            # just as the timeout fired, shrinking the limiter for good
+            await asyncio.wait_for(asyncio.shield(acquire), timeout=self.queue_timeout)
+        except BaseException as e:
+            self._abandon(acquire)
+            if not isinstance(e, asyncio.TimeoutError):
+                raise
+            self.rejected_timeout += 1
+            logger.warning(f"Gave up waiting for an upstream slot after {self.queue_timeout:g}s")
+            raise OverloadedError("AI service is busy, please try again shortly", self.retry_after())
+        finally:
+            self.waiting -= 1
+        
+        waited = time.perf_counter() - started
+        self.admitted += 1
+        self._wait_seconds_total += waited
+        self._wait_seconds_max = max(self._wait_seconds_max, waited)
+        
+        self.in_flight += 1
+        held_from = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
+            self._hold_seconds_avg += 0.1 * (time.perf_counter() - held_from - self._hold_seconds_avg)
+    
+    def _abandon(self, acquire: "asyncio.Future[bool]") -> None:
+        """Cancel an acquire nobody waits for, giving back the permit if it got one anyway."""
+        def release_if_acquired(task: "asyncio.Future[bool]") -> None:
+            if not task.cancelled() and task.exception() is None:
+                self._semaphore.release()
+        
+        acquire.add_done_callback(release_if_acquired)
+        acquire.cancel()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get slot usage, queue depth and wait times."""
+        return {
+            "enabled": self.enabled,
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "queue_depth": self.waiting,
+            "peak_queue_depth": self.peak_waiting,
+            "max_queue": self.max_queue,
+            "admitted": self.admitted,
+            "rejected_queue_full": self.rejected_queue_full,
+            "rejected_timeout": self.rejected_timeout,
+            "wait_ms_avg": round(self._wait_seconds_total / self.admitted * 1000, 3) if self.admitted else 0.0,
+            "wait_ms_max": round(self._wait_seconds_max * 1000, 3),
+        }
@@ -0,0 +1,201 @@
+"""Async service for managing conversations in the database.
+
+Each method runs the matching synchronous service method through
+``AsyncSession.run_sync``, so the query logic lives in one place while the
+actual I/O goes through the async driver (aiosqlite / asyncpg) and never
+blocks the event loop.
+"""
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Dict, List, Optional, Tuple
+from datetime import datetime
+from ..models.db.models import Conversation, Message, ResumeData
+from .database_service import ConversationService, ResumeService
+
+
+class AsyncConversationService:
+    """Async counterpart of ConversationService."""
+    
+    @staticmethod
+    async def create_conversation(
+        db: AsyncSession,
+        user_name: str,
+        user_email: Optional[str] = None
+    ) -> Conversation:
+        """Create a new conversation."""
+        return await db.run_sync(ConversationService.create_conversation, user_name, user_email)
+    
+    @staticmethod
+    async def get_conversation(db: AsyncSession, conversation_id: str) -> Optional[Conversation]:
+        """Get a conversation by ID."""
+        return await db.run_sync(ConversationService.get_conversation, conversation_id)
+    
+    @staticmethod
+    async def get_user_conversations(
+        db: AsyncSession,
+        user_name: str,
+        limit: int = 10
+    ) -> List[Conversation]:
+        """Get all conversations for a user."""
+        return await db.run_sync(ConversationService.get_user_conversations, user_name, limit)
+    
+    @staticmethod
+    async def add_message(
+        db: AsyncSession,
+        conversation_id: str,
+        role: str,
+        content: str,
+        tokens_used: Optional[int] = None,
+        model_used: Optional[str] = None
+    ) -> Message:
+        """Add a message to a conversation."""
+        return await db.run_sync(
+            ConversationService.add_message,
+            conversation_id,
+            role,
+            content,
+            tokens_used,
+            model_used,
+        )
+    
+    @staticmethod
+    async def add_turn(
+        db: AsyncSession,
+        conversation_id: str,
+        user_content: str,
+        assistant_content: str,
+        user_created_at: Optional[datetime] = None,
+        tokens_used: Optional[int] = None,
+        model_used: Optional[str] = None,
+        create_conversation: bool = False,
+        user_name: str = "User",
+        prompt_tokens: Optional[int] = None,
+        completion_tokens: Optional[int] = None,
+        latency_ms: Optional[int] = None,
+        finish_reason: Optional[str] = None,
+    ) -> Tuple[Message, Message]:
+        """Persist a user message and assistant reply in one transaction."""
+        return await db.run_sync(
+            ConversationService.add_turn,
+            conversation_id,
+            user_content,
+            assistant_content,
+            user_created_at,
+            tokens_used,
+            model_used,
+            create_conversation,
+            user_name,
+            prompt_tokens,
+            completion_tokens,
+            latency_ms,
+            finish_reason,
+        )
+    
+    @staticmethod
+    async def save_batch(
+        db: AsyncSession,
+        conversations: List[Dict[str, Any]],
+        messages: List[Dict[str, Any]],
+        touched: Dict[str, datetime],
+    ) -> None:
+        """Persist queued turns with multi-row INSERTs and a single commit."""
+        await db.run_sync(ConversationService.save_batch, conversations, messages, touched)
+    
+    @staticmethod
+    async def get_conversation_history(db: AsyncSession, conversation_id: str) -> List[Message]:
+        """Get all messages in a conversation."""
+        return await db.run_sync(ConversationService.get_conversation_history, conversation_id)
+    
+    @staticmethod
+    async def get_history_page(
+        db: AsyncSession,
+        conversation_id: str,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        latest: bool = False,
+        since: Optional[Tuple[datetime, str]] = None
+    ) -> Tuple[List[Message], Optional[str]]:
+        """Get one keyset-paginated page of a conversation's messages."""
+        return await db.run_sync(
+            ConversationService.get_history_page,
+            conversation_id,
+            limit,
+            cursor,
+            latest,
+            since,
+        )
+    
+    @staticmethod
+    async def get_recent_history(
+        db: AsyncSession,
+        conversation_id: str,
+        token_budget: int,
+        page_size: Optional[int] = None,
+        since: Optional[Tuple[datetime, str]] = None
+    ) -> List[Message]:
+        """Get the newest messages of a conversation that fit in a token budget."""
+        return await db.run_sync(
+            ConversationService.get_recent_history,
+            conversation_id,
+            token_budget,
+            page_size,
+            since,
+        )
+    
+    @staticmethod
+    async def get_context(
+        db: AsyncSession,
+        conversation_id: str,
+        token_budget: int
+    ) -> Tuple[Optional[str], List[Message]]:
+        """Get the rolling summary and the recent messages it does not cover."""
+        return await db.run_sync(ConversationService.get_context, conversation_id, token_budget)
+    
+    @staticmethod
+    async def update_summary(
+        db: AsyncSession,
+        conversation_id: str,
+        summary: str,
+        until_message: Message
+    ) -> None:
+        """Store a new rolling summary for a conversation."""
+        await db.run_sync(ConversationService.update_summary, conversation_id, summary, until_message)
+    
+    @staticmethod
+    async def delete_conversation(db: AsyncSession, conversation_id: str) -> bool:
+        """Soft delete a conversation (mark as deleted)."""
+        return await db.run_sync(ConversationService.delete_conversation, conversation_id)
+    
+    @staticmethod
+    async def archive_conversation(db: AsyncSession, conversation_id: str) -> bool:
+        """Archive a conversation."""
+        return await db.run_sync(ConversationService.archive_conversation, conversation_id)
+    
+    @staticmethod
+    async def get_usage_report(
+        db: AsyncSession,
+        since: datetime,
+        until: Optional[datetime] = None,
+        by_day: bool = True,
+        by_model: bool = True
+    ) -> List[Dict[str, Any]]:
+        """Aggregate token usage and upstream latency of assistant replies."""
+        return await db.run_sync(ConversationService.get_usage_report, since, until, by_day, by_model)
+
+
+class AsyncResumeService:
+    """Async counterpart of ResumeService."""
+    
+    @staticmethod
+    async def save_resume(db: AsyncSession, content: str) -> ResumeData:
+        """Save a new resume version."""
+        return await db.run_sync(ResumeService.save_resume, content)
+    
+    @staticmethod
+    async def get_active_resume(db: AsyncSession) -> Optional[ResumeData]:
+        """Get the current active resume."""
+        return await db.run_sync(ResumeService.get_active_resume)
+    
+    @staticmethod
+    async def get_resume_history(db: AsyncSession, limit: int = 10) -> List[ResumeData]:
+        """Get resume history."""
+        return await db.run_sync(ResumeService.get_resume_history, limit)
@@ -0,0 +1,127 @@
+"""Circuit breaker that fails fast while the upstream is unhealthy."""
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Track recent upstream outcomes and stop calling while too many fail.
+    
+    The breaker opens when the failure rate over the last ``window_size``
+    calls reaches ``failure_rate_threshold`` (after at least ``min_calls``).
+    While open, calls are rejected without touching the upstream. After
+    ``open_seconds`` one probe call is let through: success closes the
+    breaker, failure opens it again.
+    """
+    
+    def __init__(
+        self,
+        name: str,
+        failure_rate_threshold: float = 0.5,
+        window_size: int = 20,
+        min_calls: int = 5,
+        open_seconds: float = 30.0,
+        enabled: bool = True
+    ):
+        self.name = name
+        self.failure_rate_threshold = failure_rate_threshold
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.enabled = enabled
+        self.state = CLOSED
+        self._outcomes: Deque[bool] = deque(maxlen=window_size)
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self.times_opened = 0
+        self.rejected = 0
+    
+    def allow_request(self) -> bool:
+        """
+        Check whether a call may go to the upstream.
+        
+        Returns:
+            True if the call may proceed (it must then report its outcome)
+        """
+        if not self.enabled or self.state == CLOSED:
+            return True
+        
+        if self.state == OPEN and time.monotonic() >= self._opened_at + self.open_seconds:
+            self.state = HALF_OPEN
+            self._probe_in_flight = False
+            logger.info(f"Circuit {self.name} half-open, sending a probe request")
+        
+        if self.state == HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        
+        self.rejected += 1
+        return False
+    
+    def record_success(self) -> None:
+        """Report a call that the upstream handled."""
+        if self.state == HALF_OPEN:
+            self.state = CLOSED
+            self._outcomes.clear()
+            self._probe_in_flight = False
+            logger.info(f"Circuit {self.name} closed")
+        self._outcomes.append(True)
+    
+    def record_failure(self) -> None:
+        """Report a call that failed because of the upstream (timeout, 429, 5xx)."""
+        if self.state == HALF_OPEN:
+            self._open()
+            return
+        
+        self._outcomes.append(False)
+        if self.state == CLOSED and len(self._outcomes) >= self.min_calls:
+            if self.failure_rate() >= self.failure_rate_threshold:
+                self._open()
+    
+    def release(self) -> None:
+        """Report a call abandoned before it finished (counts as neither outcome)."""
+        if self.state == HALF_OPEN:
+            self._probe_in_flight = False
+    
+    def failure_rate(self) -> float:
+        """Get the failure rate over the current window."""
+        if not self._outcomes:
+            return 0.0
+        return self._outcomes.count(False) / len(self._outcomes)
+    
+    def retry_after(self) -> Optional[float]:
+        """Get the seconds until the next probe, or None if not open."""
+        if self.state != OPEN:
+            return None
+        return max(0.0, self._opened_at + self.open_seconds - time.monotonic())
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get breaker state and counters."""
+        retry_after = self.retry_after()
+        return {
+            "enabled": self.enabled,
+            "state": self.state,
+            "failure_rate": round(self.failure_rate(), 4),
+            "window_calls": len(self._outcomes),
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+            "retry_after_seconds": round(retry_after, 1) if retry_after is not None else None,
+        }
+    
+    def _open(self) -> None:
+        """Start rejecting calls for open_seconds."""
+        self.state = OPEN
+        self._opened_at = time.monotonic()
+        self._probe_in_flight = False
+        self.times_opened += 1
+        logger.warning(
+            f"Circuit {self.name} opened (failure rate {self.failure_rate():.0%}), "
+            f"failing fast for {self.open_seconds:g}s"
+        )
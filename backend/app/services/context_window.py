@@ -0,0 +1,133 @@
+"""Token-budgeted prompt context assembly."""
+from typing import Any, Dict, List, Union
+import logging
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+# Rough English average for GPT-style tokenizers
+CHARS_PER_TOKEN = 4
+
+# Role markers and separators each message adds on top of its content
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the token count of a piece of text.
+    
+    Args:
+        text: Text to estimate
+    
+    Returns:
+        Approximate number of tokens
+    """
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def estimate_message_tokens(message: Union[Dict[str, Any], Any]) -> int:
+    """
+    Estimate the tokens a chat message costs in a prompt.
+    
+    Args:
+        message: Message dict or object with a ``content`` attribute (e.g. a DB Message)
+    
+    Returns:
+        Approximate number of tokens including per-message overhead
+    """
+    content = message["content"] if isinstance(message, dict) else message.content
+    return estimate_tokens(content or "") + MESSAGE_OVERHEAD_TOKENS
+
+
+class ContextWindowManager:
+    """Keep prompts within a per-model token budget."""
+    
+    def budget_for(self, model: str) -> int:
+        """
+        Get the input token budget for a model.
+        
+        Args:
+            model: OpenRouter model name
+        
+        Returns:
+            Token budget from CONTEXT_MODEL_BUDGETS, or CONTEXT_TOKEN_BUDGET
+        """
+        return settings.context_model_budgets.get(model, settings.context_token_budget)
+    
+    def history_budget(self, system_message: Dict[str, str], user_content: str, model: str) -> int:
+        """
+        Get the tokens left for history after the system prompt and new message.
+        
+        Args:
+            system_message: The system message dict
+            user_content: The new user message
+            model: OpenRouter model name
+        
+        Returns:
+            Remaining token budget (never negative)
+        """
+        used = (
+            estimate_message_tokens(system_message)
+            + estimate_tokens(user_content)
+            + MESSAGE_OVERHEAD_TOKENS
+        )
+        return max(0, self.budget_for(model) - used)
+    
+    def fit_history(self, history: List[Dict[str, str]], budget: int) -> List[Dict[str, str]]:
+        """
+        Keep the most recent messages that fit within a token budget.
+        
+        Args:
+            history: Messages in chronological order
+            budget: Token budget for the history
+        
+        Returns:
+            Chronological tail of the history within the budget, starting at a
+            user message so a turn is never cut in half
+        """
+        kept = 0
+        used = 0
+        for message in reversed(history):
+            cost = estimate_message_tokens(message)
+            if used + cost > budget:
+                break
+            used += cost
+            kept += 1
+        
+        tail = history[len(history) - kept:] if kept else []
+        while tail and tail[0]["role"] == "assistant":
+            tail = tail[1:]
+        
+        if len(tail) < len(history):
+            logger.info(f"Context trimmed to {len(tail)} of {len(history)} history messages (~{used} tokens)")
+        return tail
+    
+    def build_messages(
+        self,
+        system_message: Dict[str, str],
+        history: List[Dict[str, str]],
+        user_content: str,
+        model: str
+    ) -> List[Dict[str, str]]:
+        """
+        Assemble the prompt: system message, budgeted history, new user message.
+        
+        Args:
+            system_message: The system message dict
+            history: Previous messages in chronological order
+            user_content: The new user message
+            model: OpenRouter model name
+        
+        Returns:
+            Messages ready for OpenRouter
+        """
+        budget = self.history_budget(system_message, user_content, model)
+        return [
+            system_message,
+            *self.fit_history(history, budget),
+            {"role": "user", "content": user_content},
+        ]
+
+
+# Create a global instance
+context_window = ContextWindowManager()
@@ -1,14 +1,57 @@
 """Service for managing conversations in the database."""
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
-from typing import List, Optional
+from sqlalchemy import desc, func, insert, select, tuple_, update
+from typing import Any, Dict, List, Optional, Tuple
 from datetime import datetime
+import base64
 import logging
+import uuid
 from ..models.db.models import Conversation, Message, ResumeData
 from ..models.chat import Message as MessageSchema
+from ..config import settings
+from .context_window import estimate_message_tokens
+from .prompt_cache import prompt_cache
 
 logger = logging.getLogger(__name__)
 
+# Upper bound on messages returned by one history page
+MAX_HISTORY_PAGE_SIZE = 200
+
+
+def encode_cursor(message: Message) -> str:
+    """
+    Encode a message position as an opaque pagination cursor.
+    
+    Args:
+        message: Message the next page should continue from
+        
+    Returns:
+        URL-safe cursor string
+    """
+    raw = f"{message.created_at.isoformat()}|{message.id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """
+    Decode a pagination cursor.
+    
+    Args:
+        cursor: Cursor produced by encode_cursor
+        
+    Returns:
+        Tuple of (created_at, message_id)
+        
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, message_id = base64.urlsafe_b64decode(padded).decode("utf-8").split("|", 1)
+        return datetime.fromisoformat(created_at), message_id
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
 
 class ConversationService:
     """Service to handle conversation database operations."""
@@ -134,6 +177,133 @@ class ConversationService:
             logger.error(f"Error adding message: {str(e)}")
             raise
     
+    @staticmethod
+    def add_turn(
+        db: Session,
+        conversation_id: str,
+        user_content: str,
+        assistant_content: str,
+        user_created_at: Optional[datetime] = None,
+        tokens_used: Optional[int] = None,
+        model_used: Optional[str] = None,
+        create_conversation: bool = False,
+        user_name: str = "User",
+        prompt_tokens: Optional[int] = None,
+        completion_tokens: Optional[int] = None,
+        latency_ms: Optional[int] = None,
+        finish_reason: Optional[str] = None,
+    ) -> Tuple[Message, Message]:
+        """
+        Persist a full chat turn (user message + assistant reply) in one transaction.
+        
+        Unlike two add_message calls this issues no SELECT or refresh: both rows
+        and the conversation timestamp bump are flushed together with a single
+        commit. With ``create_conversation`` the conversation row is inserted in
+        the same transaction instead of being bumped.
+        
+        Args:
+            db: Database session
+            conversation_id: ID of the conversation
+            user_content: The user's message
+            assistant_content: The assistant's reply
+            user_created_at: When the user message was received (defaults to now)
+            tokens_used: Tokens used by the API for the reply (optional)
+            model_used: Model used to generate the reply (optional)
+            create_conversation: Insert the conversation row as part of the turn
+            user_name: Name of the user for a newly created conversation
+            prompt_tokens: Prompt tokens reported for the reply (optional)
+            completion_tokens: Completion tokens reported for the reply (optional)
+            latency_ms: Upstream call time for the reply (optional)
+            finish_reason: Why the model stopped, e.g. "stop" or "length" (optional)
+            
+        Returns:
+            Tuple of the created (user, assistant) Message objects
+        """
+        try:
+            now = datetime.utcnow()
+            user_created_at = user_created_at or now
+            
+            if create_conversation:
+                db.add(Conversation(
+                    id=conversation_id,
+                    user_name=user_name,
+                    title=f"Conversation with {user_name}",
+                    created_at=user_created_at,
+                    updated_at=now,
+                ))
+            else:
+                # Update conversation timestamp without loading the row
+                db.execute(
+                    update(Conversation)
+                    .where(Conversation.id == conversation_id)
+                    .values(updated_at=now)
+                )
+            
+            user_message = Message(
+                id=str(uuid.uuid4()),
+                conversation_id=conversation_id,
+                role="user",
+                content=user_content,
+                created_at=user_created_at,
+                updated_at=user_created_at,
+            )
+            assistant_message = Message(
+                id=str(uuid.uuid4()),
+                conversation_id=conversation_id,
+                role="assistant",
+                content=assistant_content,
+                tokens_used=tokens_used,
+                model_used=model_used,
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+                latency_ms=latency_ms,
+                finish_reason=finish_reason,
+                created_at=now,
+                updated_at=now,
+            )
+            db.add_all([user_message, assistant_message])
+            
+            db.commit()
+            logger.info(f"Turn saved to conversation: {conversation_id}")
+            return user_message, assistant_message
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Error saving turn: {str(e)}")
+            raise
+    
+    @staticmethod
+    def save_batch(
+        db: Session,
+        conversations: List[Dict[str, Any]],
+        messages: List[Dict[str, Any]],
+        touched: Dict[str, datetime],
+    ) -> None:
+        """
+        Persist queued turns with multi-row INSERTs and a single commit.
+        
+        Args:
+            db: Database session
+            conversations: Column values of new conversation rows
+            messages: Column values of new message rows
+            touched: New updated_at per existing conversation ID
+        """
+        try:
+            if conversations:
+                db.execute(insert(Conversation), conversations)
+            if messages:
+                db.execute(insert(Message), messages)
+            if touched:
+                # Bulk UPDATE by primary key (one executemany)
+                db.execute(
+                    update(Conversation),
+                    [{"id": cid, "updated_at": updated_at} for cid, updated_at in touched.items()],
+                )
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Error saving message batch: {str(e)}")
+            raise
+    
     @staticmethod
     def get_conversation_history(db: Session, conversation_id: str) -> List[Message]:
         """
@@ -155,6 +325,184 @@ class ConversationService:
             logger.error(f"Error getting conversation history: {str(e)}")
             return []
     
+    @staticmethod
+    def get_history_page(
+        db: Session,
+        conversation_id: str,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        latest: bool = False,
+        since: Optional[Tuple[datetime, str]] = None
+    ) -> Tuple[List[Message], Optional[str]]:
+        """
+        Get one page of a conversation's messages using keyset pagination.
+        
+        Pages are keyed on (created_at, id), so each page is an index range
+        scan regardless of how deep into the conversation it is.
+        
+        Args:
+            db: Database session
+            conversation_id: ID of the conversation
+            limit: Page size (capped at MAX_HISTORY_PAGE_SIZE)
+            cursor: Cursor from the previous page's next_cursor (optional)
+            latest: Start from the newest messages and page backwards in time
+            since: Only include messages after this (created_at, id) position
+            
+        Returns:
+            Tuple of (messages in chronological order, next_cursor or None if
+            there are no more messages in that direction)
+            
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        limit = max(1, min(limit, MAX_HISTORY_PAGE_SIZE))
+        position = decode_cursor(cursor) if cursor else None
+        
+        key = tuple_(Message.created_at, Message.id)
+        query = db.query(Message).filter(
+            Message.conversation_id == conversation_id,
+            Message.is_deleted == "false"
+        )
+        if since:
+            query = query.filter(key > tuple(since))
+        
+        if latest:
+            if position:
+                query = query.filter(key < position)
+            query = query.order_by(desc(Message.created_at), desc(Message.id))
+        else:
+            if position:
+                query = query.filter(key > position)
+            query = query.order_by(Message.created_at, Message.id)
+        
+        # Fetch one extra row to know whether another page exists
+        rows = query.limit(limit + 1).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]) if has_more else None
+        
+        if latest:
+            rows.reverse()
+        
+        return rows, next_cursor
+    
+    @staticmethod
+    def get_recent_history(
+        db: Session,
+        conversation_id: str,
+        token_budget: int,
+        page_size: Optional[int] = None,
+        since: Optional[Tuple[datetime, str]] = None
+    ) -> List[Message]:
+        """
+        Get the newest messages of a conversation that fit in a token budget.
+        
+        Walks backwards from the latest message one keyset page at a time, so
+        only the tail needed for the prompt is read from the database.
+        
+        Args:
+            db: Database session
+            conversation_id: ID of the conversation
+            token_budget: Estimated tokens available for history
+            page_size: Messages per round-trip (defaults to CONTEXT_HISTORY_PAGE_SIZE)
+            since: Only include messages after this (created_at, id) position
+            
+        Returns:
+            List of Message objects in chronological order, starting at a user message
+        """
+        page_size = page_size or settings.context_history_page_size
+        tail: List[Message] = []
+        used = 0
+        cursor = None
+        
+        while True:
+            page, cursor = ConversationService.get_history_page(
+                db, conversation_id, limit=page_size, cursor=cursor, latest=True, since=since
+            )
+            for message in reversed(page):
+                cost = estimate_message_tokens(message)
+                if used + cost > token_budget:
+                    cursor = None
+                    break
+                used += cost
+                tail.append(message)
+            if cursor is None:
+                break
+        
+        tail.reverse()
+        while tail and tail[0].role == "assistant":
+            tail.pop(0)
+        return tail
+    
+    @staticmethod
+    def get_context(
+        db: Session,
+        conversation_id: str,
+        token_budget: int
+    ) -> Tuple[Optional[str], List[Message]]:
+        """
+        Get the rolling summary and the recent messages it does not cover.
+        
+        Args:
+            db: Database session
+            conversation_id: ID of the conversation
+            token_budget: Estimated tokens available for summary + history
+            
+        Returns:
+            Tuple of (summary or None, recent Message objects in chronological order)
+        """
+        row = db.query(
+            Conversation.summary,
+            Conversation.summary_until_at,
+            Conversation.summary_until_id
+        ).filter(Conversation.id == conversation_id).first()
+        
+        summary, since = None, None
+        if row and row.summary:
+            summary = row.summary
+            since = (row.summary_until_at, row.summary_until_id)
+            token_budget = max(0, token_budget - estimate_message_tokens({"content": summary}))
+        
+        messages = ConversationService.get_recent_history(
+            db, conversation_id, token_budget, since=since
+        )
+        return summary, messages
+    
+    @staticmethod
+    def update_summary(
+        db: Session,
+        conversation_id: str,
+        summary: str,
+        until_message: Message
+    ) -> None:
+        """
+        Store a new rolling summary covering messages up to ``until_message``.
+        
+        Args:
+            db: Database session
+            conversation_id: ID of the conversation
+            summary: Summary text
+            until_message: Last message included in the summary
+        """
+        try:
+            db.execute(
+                update(Conversation)
+                .where(Conversation.id == conversation_id)
+                .values(
+                    summary=summary,
+                    summary_until_at=until_message.created_at,
+                    summary_until_id=until_message.id,
+                    # Summaries are bookkeeping, not activity
+                    updated_at=Conversation.updated_at,
+                )
+            )
+            db.commit()
+            logger.info(f"Summary updated for conversation: {conversation_id}")
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Error updating summary: {str(e)}")
+            raise
+    
     @staticmethod
     def delete_conversation(db: Session, conversation_id: str) -> bool:
         """
@@ -212,6 +560,73 @@ class ConversationService:
             db.rollback()
             logger.error(f"Error archiving conversation: {str(e)}")
             return False
+    
+    @staticmethod
+    def get_usage_report(
+        db: Session,
+        since: datetime,
+        until: Optional[datetime] = None,
+        by_day: bool = True,
+        by_model: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Aggregate token usage and upstream latency of assistant replies.
+        
+        One GROUP BY query over the replies in the range, served by
+        ix_messages_role_created_at. Replies answered from a cache have no
+        model, tokens or latency, so ``upstream_calls`` counts only the
+        replies that reached OpenRouter.
+        
+        Args:
+            db: Database session
+            since: Start of the range (inclusive)
+            until: End of the range (exclusive, defaults to now)
+            by_day: Group by UTC day
+            by_model: Group by model
+            
+        Returns:
+            One dict per group with day and/or model, replies, upstream_calls,
+            prompt/completion/total tokens and average/max latency in ms
+        """
+        until = until or datetime.utcnow()
+        groups = []
+        if by_day:
+            groups.append(func.date(Message.created_at).label("day"))
+        if by_model:
+            groups.append(Message.model_used.label("model"))
+        
+        query = (
+            select(
+                *groups,
+                func.count().label("replies"),
+                func.count(Message.latency_ms).label("upstream_calls"),
+                func.sum(Message.prompt_tokens).label("prompt_tokens"),
+                func.sum(Message.completion_tokens).label("completion_tokens"),
+                func.sum(Message.tokens_used).label("total_tokens"),
+                func.avg(Message.latency_ms).label("avg_latency_ms"),
+                func.max(Message.latency_ms).label("max_latency_ms"),
+            )
+            .where(
+                Message.role == "assistant",
+                Message.created_at >= since,
+                Message.created_at < until,
+            )
+            .group_by(*groups)
+            .order_by(*groups)
+        )
+        
+        report = []
+        for row in db.execute(query).mappings():
+            entry = dict(row)
+            if "day" in entry:
+                # date() returns a string on SQLite and a date on PostgreSQL
+                entry["day"] = str(entry["day"])
+            for key in ("prompt_tokens", "completion_tokens", "total_tokens"):
+                entry[key] = int(entry[key] or 0)
+            if entry["avg_latency_ms"] is not None:
+                entry["avg_latency_ms"] = round(float(entry["avg_latency_ms"]), 1)
+            report.append(entry)
+        return report
 
 
 class ResumeService:
@@ -249,6 +664,7 @@ class ResumeService:
             db.add(resume)
             db.commit()
             db.refresh(resume)
+            prompt_cache.invalidate()
             logger.info(f"Resume saved: version {version}")
             return resume
         except Exception as e:
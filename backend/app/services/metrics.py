@@ -0,0 +1,339 @@
+"""In-process metrics exposed in the Prometheus text format."""
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+import logging
+import math
+import time
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Request latencies, from cache hits to slow upstream completions
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    """Escape a label value for the text format."""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    """Render a label set, e.g. ``{method="GET",route="/health"}``."""
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    """Render a sample value (integers without a trailing .0)."""
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric(ABC):
+    """Base class for a named metric with a fixed set of label names."""
+    
+    kind = "untyped"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+    
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        """Get the label values in label name order."""
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+    
+    def render(self) -> List[str]:
+        """Render the metric's HELP, TYPE and sample lines."""
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+            *self._samples(),
+        ]
+    
+    @abstractmethod
+    def _samples(self) -> List[str]:
+        """Render the metric's sample lines."""
+
+
+class Counter(_Metric):
+    """Monotonically increasing count per label set."""
+    
+    kind = "counter"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+    
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        """Add to the count of a label set."""
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+    
+    def value(self, **labels: str) -> float:
+        """Get the current count of a label set."""
+        return self._values.get(self._key(labels), 0.0)
+    
+    def _samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in list(self._values.items())
+        ]
+
+
+class Gauge(_Metric):
+    """Value per label set that can go up and down."""
+    
+    kind = "gauge"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+    
+    def set(self, value: float, **labels: str) -> None:
+        self._values[self._key(labels)] = value
+    
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+    
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+    
+    def _samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in list(self._values.items())
+        ]
+
+
+class _HistogramSeries:
+    """Bucket counts, sum and count of one label set."""
+    
+    __slots__ = ("counts", "sum", "count")
+    
+    def __init__(self, buckets: int):
+        # One slot per bucket plus the +Inf overflow, not cumulative
+        self.counts = [0] * (buckets + 1)
+        self.sum = 0.0
+        self.count = 0
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in fixed buckets per label set."""
+    
+    kind = "histogram"
+    
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[LabelValues, _HistogramSeries] = {}
+    
+    def observe(self, value: float, **labels: str) -> None:
+        """Record one observation for a label set."""
+        key = self._key(labels)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series.setdefault(key, _HistogramSeries(len(self.buckets)))
+        series.counts[bisect_left(self.buckets, value)] += 1
+        series.sum += value
+        series.count += 1
+    
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Observe the seconds spent in the block (also when it raises)."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+    
+    def count(self, **labels: str) -> int:
+        """Get the number of observations of a label set."""
+        series = self._series.get(self._key(labels))
+        return series.count if series else 0
+    
+    def _samples(self) -> List[str]:
+        lines = []
+        for key, series in list(self._series.items()):
+            # Copy first so a concurrent observe can't make the buckets inconsistent
+            counts, total, count = list(series.counts), series.sum, series.count
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, math.inf), counts):
+                cumulative += bucket_count
+                le = 'le="' + _format_value(bound) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class CallbackMetric(_Metric):
+    """Metric whose samples are read from the app's own state at scrape time."""
+    
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        kind: str,
+        labelnames: Sequence[str],
+        collect: Callable[[], Dict[LabelValues, float]]
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.kind = kind
+        self.collect = collect
+    
+    def _samples(self) -> List[str]:
+        try:
+            values = self.collect()
+        except Exception as e:
+            logger.warning(f"Could not collect metric {self.name}: {str(e)}")
+            return []
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in values.items()
+        ]
+
+
+class MetricsRegistry:
+    """
+    Set of metrics rendered together for the /metrics endpoint.
+    
+    Updates take no locks: they run on the event loop thread, where a
+    dictionary read-modify-write is never interleaved with another one.
+    Rendering copies each series before formatting it, so a scrape does not
+    hold up requests either.
+    """
+    
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._metrics: Dict[str, _Metric] = {}
+    
+    def _register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+    
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+    
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+    
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+    
+    def callback(
+        self,
+        name: str,
+        documentation: str,
+        collect: Callable[[], Dict[LabelValues, float]],
+        labelnames: Sequence[str] = (),
+        kind: str = "gauge"
+    ) -> CallbackMetric:
+        """
+        Register a metric read from existing state when scraped.
+        
+        Args:
+            name: Metric name
+            documentation: HELP text
+            collect: Returns {label values tuple: value}
+            labelnames: Label names matching the tuples returned by collect
+            kind: "gauge" or "counter"
+        
+        Returns:
+            The registered metric
+        """
+        return self._register(CallbackMetric(name, documentation, kind, labelnames, collect))
+    
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+    
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Create a global instance
+metrics = MetricsRegistry(enabled=settings.metrics_enabled)
+
+# HTTP requests, labelled by route template so path parameters don't explode cardinality
+http_requests_total = metrics.counter(
+    "http_requests_total", "HTTP requests handled", ("method", "route", "status")
+)
+http_request_duration_seconds = metrics.histogram(
+    "http_request_duration_seconds", "Time until the response finished", ("method", "route")
+)
+http_requests_in_flight = metrics.gauge(
+    "http_requests_in_flight", "HTTP requests currently being handled"
+)
+
+# Stages of a chat turn (history_load, prompt_build, cache_lookup, upstream, persist)
+chat_stage_duration_seconds = metrics.histogram(
+    "chat_stage_duration_seconds", "Time spent in each stage of a chat turn", ("stage",)
+)
+
+# Upstream (OpenRouter) calls, one per attempted model
+upstream_requests_total = metrics.counter(
+    "openrouter_requests_total", "OpenRouter calls by model and outcome", ("model", "outcome")
+)
+upstream_request_duration_seconds = metrics.histogram(
+    "openrouter_request_duration_seconds", "OpenRouter call latency (including retries)", ("model",)
+)
+upstream_tokens_total = metrics.counter(
+    "openrouter_tokens_total", "Tokens reported by OpenRouter usage blocks", ("model", "kind")
+)
+
+
+def _pool_stats() -> Dict[LabelValues, float]:
+    """Read connection pool usage of the sync and async engines."""
+    from ..database import async_engine, engine
+    
+    values: Dict[LabelValues, float] = {}
+    pools = [("sync", engine.pool)]
+    if async_engine is not None:
+        pools.append(("async", async_engine.sync_engine.pool))
+    for name, pool in pools:
+        # StaticPool and NullPool don't track checkouts
+        for state in ("size", "checkedout", "checkedin", "overflow"):
+            reader = getattr(pool, state, None)
+            if callable(reader):
+                # overflow() counts up from -size until the pool is full
+                values[(name, state)] = max(0, reader()) if state == "overflow" else reader()
+    return values
+
+
+metrics.callback(
+    "db_pool_connections",
+    "SQLAlchemy pool state (size, checkedout, checkedin, overflow)",
+    _pool_stats,
+    labelnames=("engine", "state"),
+)
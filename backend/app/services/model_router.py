@@ -0,0 +1,150 @@
+"""Latency-aware ordering of the configured chat models."""
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+import math
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """
+    Get a percentile of a list of values (nearest rank).
+    
+    Args:
+        values: Sample values
+        pct: Percentile between 0 and 100
+    
+    Returns:
+        The percentile, or None if there are no values
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class ModelStats:
+    """Rolling latency and error window for one model."""
+    
+    def __init__(self, window: int):
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self.outcomes: Deque[bool] = deque(maxlen=window)
+        self.requests = 0
+        self.errors = 0
+    
+    def record(self, latency: float, ok: bool) -> None:
+        """Record one finished request (only successful latencies are kept)."""
+        self.requests += 1
+        self.outcomes.append(ok)
+        if ok:
+            self.latencies.append(latency)
+        else:
+            self.errors += 1
+    
+    def error_rate(self) -> float:
+        """Get the error rate over the window."""
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+    
+    def p50(self) -> Optional[float]:
+        """Get the median latency in seconds."""
+        return percentile(list(self.latencies), 50)
+    
+    def p95(self) -> Optional[float]:
+        """Get the 95th percentile latency in seconds."""
+        return percentile(list(self.latencies), 95)
+
+
+class ModelRouter:
+    """
+    Rank models by health and recent latency.
+    
+    Healthy models come first, fastest p50 first. Models with too few samples
+    follow in their configured order, so the primary model is used until a
+    fallback has proven faster while serving fallback or hedged requests.
+    Models whose recent error rate reaches ``max_error_rate`` are moved to the
+    end and only used as a last resort.
+    """
+    
+    def __init__(
+        self,
+        models: List[str],
+        window: int = 100,
+        min_samples: int = 5,
+        max_error_rate: float = 0.5
+    ):
+        self.models = list(dict.fromkeys(models))
+        self.window = window
+        self.min_samples = min_samples
+        self.max_error_rate = max_error_rate
+        self._stats: Dict[str, ModelStats] = {model: ModelStats(window) for model in self.models}
+    
+    def _stats_for(self, model: str) -> ModelStats:
+        """Get the stats for a model, including ones requested explicitly."""
+        if model not in self._stats:
+            self._stats[model] = ModelStats(self.window)
+        return self._stats[model]
+    
+    def is_healthy(self, model: str) -> bool:
+        """Check whether a model's recent error rate is below the limit."""
+        stats = self._stats_for(model)
+        return len(stats.outcomes) < self.min_samples or stats.error_rate() < self.max_error_rate
+    
+    def order(self) -> List[str]:
+        """
+        Get the models in the order they should be tried.
+        
+        Returns:
+            Model names, best candidate first
+        """
+        def rank(item):
+            position, model = item
+            stats = self._stats_for(model)
+            measured = len(stats.latencies) >= self.min_samples
+            return (not self.is_healthy(model), not measured, stats.p50() if measured else 0.0, position)
+        
+        return [model for _, model in sorted(enumerate(self.models), key=rank)]
+    
+    def record(self, model: str, latency: float, ok: bool) -> None:
+        """
+        Record the outcome of a request.
+        
+        Args:
+            model: Model that served the request
+            latency: Seconds the request took
+            ok: Whether the model returned a usable reply
+        """
+        self._stats_for(model).record(latency, ok)
+    
+    def hedge_delay(self, model: str, default: float) -> float:
+        """
+        Get how long to wait on a model before hedging to the next one.
+        
+        Args:
+            model: Model the first request went to
+            default: Delay to use until the model has enough samples
+        
+        Returns:
+            The model's p95 latency, or the default
+        """
+        stats = self._stats_for(model)
+        if len(stats.latencies) < self.min_samples:
+            return default
+        return stats.p95()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get per-model latency percentiles and error rates."""
+        def ms(value: Optional[float]) -> Optional[float]:
+            return round(value * 1000, 1) if value is not None else None
+        
+        return {
+            model: {
+                "requests": stats.requests,
+                "errors": stats.errors,
+                "error_rate": round(stats.error_rate(), 4),
+                "p50_ms": ms(stats.p50()),
+                "p95_ms": ms(stats.p95()),
+                "healthy": self.is_healthy(model),
+            }
+            for model, stats in self._stats.items()
+        }
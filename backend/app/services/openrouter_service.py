@@ -1,13 +1,63 @@
 """Service for interacting with OpenRouter API."""
 import httpx
-from typing import List, Dict, Optional
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncIterator, List, Dict, NamedTuple, Optional
+import asyncio
+import importlib.util
+import json
 import logging
+import random
+import time
 from ..config import settings
+from .admission import ConcurrencyLimiter, OverloadedError
+from .circuit_breaker import CircuitBreaker
+from .metrics import upstream_request_duration_seconds, upstream_requests_total, upstream_tokens_total
+from .model_router import ModelRouter
+from .single_flight import SingleFlight, request_key
+from .tracing import SPAN_KIND_CLIENT, tracer
 
 logger = logging.getLogger(__name__)
 
 OPENROUTER_API_URL = "https://openrouter.ai/api/v1/chat/completions"
 
+# Upstream statuses worth retrying (rate limited or temporarily unavailable)
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Failures before the request reached the model; read timeouts are not retried
+# since they already took the full read timeout
+RETRYABLE_EXCEPTIONS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout, httpx.RemoteProtocolError)
+
+CIRCUIT_OPEN_MESSAGE = "Error: AI service is temporarily unavailable, please try again shortly"
+
+# Errors another model would hit just the same, so no fallback is attempted
+NO_FALLBACK_ERRORS = {"Error: API key not configured", "Error: Invalid API key", CIRCUIT_OPEN_MESSAGE}
+
+
+class OpenRouterError(Exception):
+    """Raised when a streamed OpenRouter completion fails."""
+
+
+class ChatCompletion(NamedTuple):
+    """A chat completion reply with its token usage and timing."""
+    content: Optional[str]  # Reply text, or an "Error: ..." message if the call failed
+    model: Optional[str] = None  # Model the reply was requested from
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+    latency_ms: Optional[int] = None  # Upstream call time, including retries
+    finish_reason: Optional[str] = None
+    
+    @property
+    def ok(self) -> bool:
+        """Whether the call produced a reply."""
+        return bool(self.content) and not self.content.startswith("Error:")
+    
+    @property
+    def total_tokens(self) -> Optional[int]:
+        if self.prompt_tokens is None and self.completion_tokens is None:
+            return None
+        return (self.prompt_tokens or 0) + (self.completion_tokens or 0)
+
 
 class OpenRouterService:
     """Service to handle OpenRouter API interactions."""
@@ -15,95 +65,614 @@ class OpenRouterService:
     def __init__(self):
         self.api_key = settings.openrouter_api_key
         self.model = settings.openrouter_model
-        self.base_url = OPENROUTER_API_URL
+        self.base_url = settings.openrouter_api_url or OPENROUTER_API_URL
+        
+        self._client: Optional[httpx.AsyncClient] = None
+        
+        # Primary model first, then fallbacks; reordered by observed latency and errors
+        self.router = ModelRouter(
+            [self.model, *settings.openrouter_fallback_models],
+            window=settings.model_router_window,
+        )
+        self.hedged_requests = 0
+        
+        # Identical concurrent completions share one upstream call
+        self.single_flight = SingleFlight(enabled=settings.openrouter_coalesce_requests)
+        
+        # Bound concurrent upstream calls; excess requests queue briefly, then get a 503
+        self.limiter = ConcurrencyLimiter(
+            max_concurrency=settings.openrouter_max_concurrency,
+            max_queue=settings.openrouter_max_queue,
+            queue_timeout=settings.openrouter_queue_timeout,
+            enabled=settings.openrouter_admission_control,
+        )
+        
+        # Fail fast while OpenRouter keeps timing out or returning 429/5xx
+        self.circuit_breaker = CircuitBreaker(
+            "openrouter",
+            failure_rate_threshold=settings.circuit_breaker_failure_rate,
+            window_size=settings.circuit_breaker_window,
+            min_calls=settings.circuit_breaker_min_calls,
+            open_seconds=settings.circuit_breaker_open_seconds,
+            enabled=settings.circuit_breaker_enabled,
+        )
         
         if not self.api_key:
             logger.warning("OpenRouter API key not configured")
     
+    def _create_client(self) -> httpx.AsyncClient:
+        """
+        Create the pooled HTTP client shared by all OpenRouter calls.
+        
+        Returns:
+            httpx.AsyncClient with keep-alive pool limits from settings
+        """
+        http2 = settings.openrouter_http2
+        if http2 and importlib.util.find_spec("h2") is None:
+            logger.warning("OPENROUTER_HTTP2 is enabled but 'h2' is not installed, using HTTP/1.1")
+            http2 = False
+        
+        limits = httpx.Limits(
+            max_connections=settings.openrouter_max_connections,
+            max_keepalive_connections=settings.openrouter_max_keepalive_connections,
+            keepalive_expiry=settings.openrouter_keepalive_expiry,
+        )
+        
+        logger.info(f"Creating OpenRouter HTTP client (http2={http2})")
+        return httpx.AsyncClient(
+            timeout=httpx.Timeout(settings.openrouter_timeout, connect=settings.openrouter_connect_timeout),
+            limits=limits,
+            http2=http2,
+        )
+    
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Get the shared HTTP client, creating it on first use."""
+        if self._client is None or self._client.is_closed:
+            self._client = self._create_client()
+        return self._client
+    
+    async def startup(self) -> None:
+        """Open the shared HTTP client (called from the app lifespan)."""
+        _ = self.client
+    
+    async def shutdown(self) -> None:
+        """Close the shared HTTP client and release pooled connections."""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+            logger.info("OpenRouter HTTP client closed")
+        self._client = None
+    
     async def chat_completion(
         self,
         messages: List[Dict[str, str]],
         temperature: float = 0.7,
         max_tokens: int = 512,
-    ) -> Optional[str]:
+        model: Optional[str] = None,
+    ) -> ChatCompletion:
         """
         Get a chat completion from OpenRouter.
         
+        Without an explicit model, the request goes to the fastest healthy
+        configured model and falls back to the next one on a timeout or error
+        (optionally hedging to the second model after the first one's p95).
+        
         Args:
             messages: List of messages in the conversation
             temperature: Creativity level (0-1)
             max_tokens: Maximum tokens in response
+            model: Model to use instead of the configured ones (optional, no fallback)
             
         Returns:
-            The assistant's response or None if error
+            ChatCompletion with the reply (or an "Error: ..." message in
+            ``content``), token usage, latency and finish reason
+            
+        Raises:
+            OverloadedError: If no upstream slot frees up in time
         """
         if not self.api_key:
             logger.error("OpenRouter API key is not configured")
-            return "Error: API key not configured"
+            return ChatCompletion("Error: API key not configured")
         
+        key = request_key(model or "routed", messages, temperature, max_tokens)
+        return await self.single_flight.do(
+            key, lambda: self._admitted_completion(messages, temperature, max_tokens, model)
+        )
+    
+    async def _admitted_completion(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+        model: Optional[str],
+    ) -> ChatCompletion:
+        """Run a routed completion while holding a concurrency slot."""
+        async with self.limiter.slot():
+            return await self._routed_completion(messages, temperature, max_tokens, model)
+    
+    async def _routed_completion(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+        model: Optional[str],
+    ) -> ChatCompletion:
+        """Try the routed models in order until one returns a reply."""
+        models = [model] if model else self.router.order()
+        result: Optional[ChatCompletion] = None
+        
+        start = 0
+        if settings.openrouter_hedge_requests and len(models) > 1:
+            result = await self._hedged_completion(models[0], models[1], messages, temperature, max_tokens)
+            start = 2
+        
+        for candidate in models[start:]:
+            if result is not None and not self._should_fall_back(result):
+                break
+            if result is not None:
+                logger.warning(f"Falling back to model {candidate} ({result.content})")
+            result = await self._timed_completion(candidate, messages, temperature, max_tokens)
+        return result
+    
+    async def _hedged_completion(
+        self,
+        primary: str,
+        secondary: str,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+    ) -> ChatCompletion:
+        """
+        Race two models, starting the second only if the first is slow.
+        
+        The second request is sent once the first has run longer than its
+        model's p95 latency; the first usable reply wins and the other request
+        is cancelled.
+        """
+        delay = self.router.hedge_delay(primary, settings.openrouter_hedge_delay)
+        first = asyncio.create_task(self._timed_completion(primary, messages, temperature, max_tokens))
+        done, _ = await asyncio.wait({first}, timeout=delay)
+        if done:
+            result = first.result()
+            if not self._should_fall_back(result):
+                return result
+            logger.warning(f"Falling back to model {secondary} ({result.content})")
+            return await self._timed_completion(secondary, messages, temperature, max_tokens)
+        
+        logger.info(f"Hedging {primary} with {secondary} after {delay:.2f}s")
+        self.hedged_requests += 1
+        second = asyncio.create_task(self._timed_completion(secondary, messages, temperature, max_tokens))
+        pending = {first, second}
+        result = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    result = task.result()
+                    if not self._should_fall_back(result):
+                        return result
+            return result
+        finally:
+            for task in pending:
+                task.cancel()
+    
+    async def _timed_completion(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+    ) -> ChatCompletion:
+        """Request a completion from one model and record its latency."""
+        started = time.perf_counter()
+        # Groups the model's HTTP attempts (and retry waits) in a trace
+        with tracer.span(f"chat_completion {model}", attributes={"gen_ai.request.model": model}) as span:
+            result = await self._chat_completion(messages, temperature, max_tokens, model)
+            if not result.ok:
+                span.set_error(result.content or "No reply")
+        if result.content not in NO_FALLBACK_ERRORS:
+            self.router.record(model, time.perf_counter() - started, result.ok)
+        return result
+    
+    def _should_fall_back(self, result: ChatCompletion) -> bool:
+        """Check whether a reply is an error another model might not hit."""
+        return not result.ok and result.content not in NO_FALLBACK_ERRORS
+    
+    async def _chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+        model: str,
+    ) -> ChatCompletion:
+        """Make one chat completion request to one model."""
+        if not self.circuit_breaker.allow_request():
+            logger.warning("OpenRouter circuit open, failing fast")
+            upstream_requests_total.inc(model=model, outcome="circuit_open")
+            return ChatCompletion(CIRCUIT_OPEN_MESSAGE, model=model)
+        
+        response: Optional[httpx.Response] = None
+        cancelled = False
+        outcome = "error"
+        started = time.perf_counter()
         try:
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json",
-                "HTTP-Referer": "http://localhost:3000",
-            }
-            
             payload = {
-                "model": self.model,
+                "model": model,
                 "messages": messages,
                 "temperature": temperature,
                 "max_tokens": max_tokens,
             }
             
-            logger.info(f"Calling OpenRouter with model: {self.model}")
+            logger.info(f"Calling OpenRouter with model: {model}")
             
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(self.base_url, json=payload, headers=headers)
-                
-                logger.info(f"OpenRouter response status: {response.status_code}")
-                
-                response.raise_for_status()
-                
-                result = response.json()
+            response = await self._send_with_retry(payload, timeout=self._timeout_for(model))
+            
+            logger.info(f"OpenRouter response status: {response.status_code}")
+            
+            response.raise_for_status()
+            
+            result = response.json()
+            usage = result.get("usage") or {}
+            self._record_usage(model, usage)
+            
+            if "choices" in result and len(result["choices"]) > 0:
+                outcome = "ok"
+                choice = result["choices"][0]
+                return ChatCompletion(
+                    content=choice["message"]["content"],
+                    model=model,
+                    prompt_tokens=usage.get("prompt_tokens"),
+                    completion_tokens=usage.get("completion_tokens"),
+                    latency_ms=round((time.perf_counter() - started) * 1000),
+                    finish_reason=choice.get("finish_reason"),
+                )
+            else:
+                logger.error(f"Unexpected response format: {result}")
+                outcome = "bad_response"
+                return ChatCompletion("Error: Unexpected response format", model=model)
                 
-                if "choices" in result and len(result["choices"]) > 0:
-                    return result["choices"][0]["message"]["content"]
-                else:
-                    logger.error(f"Unexpected response format: {result}")
-                    return "Error: Unexpected response format"
-                    
         except httpx.TimeoutException:
             logger.error("OpenRouter API request timed out")
-            return "Error: Request timed out"
+            outcome = "timeout"
+            return ChatCompletion("Error: Request timed out", model=model)
         except httpx.HTTPStatusError as e:
             status_code = e.response.status_code
             response_text = e.response.text
             logger.error(f"OpenRouter API error: {status_code} - {response_text}")
-            
-            if status_code == 401:
-                return "Error: Invalid API key"
-            elif status_code == 404:
-                return f"Error: Model '{self.model}' not found or endpoint unavailable"
-            else:
-                return f"Error: API returned status {status_code}"
+            outcome = self._status_outcome(status_code)
+            return ChatCompletion(self._status_error_message(status_code, model), model=model)
+        except asyncio.CancelledError:
+            # Abandoned (e.g. the losing side of a hedge), not an upstream failure
+            cancelled = True
+            outcome = "cancelled"
+            raise
         except Exception as e:
             logger.error(f"Unexpected error in chat_completion: {str(e)}", exc_info=True)
-            return f"Error: {str(e)}"
+            if isinstance(e, httpx.TransportError):
+                outcome = "connection_error"
+            return ChatCompletion(f"Error: {str(e)}", model=model)
+        finally:
+            if cancelled:
+                self.circuit_breaker.release()
+            else:
+                # Only upstream trouble counts against the circuit, not bad keys or models
+                self._record_outcome(response)
+            upstream_requests_total.inc(model=model, outcome=outcome)
+            upstream_request_duration_seconds.observe(time.perf_counter() - started, model=model)
+    
+    async def chat_completion_stream(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: int = 512,
+        completion: Optional[Dict[str, Any]] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Stream a chat completion from OpenRouter token by token.
+        
+        Args:
+            messages: List of messages in the conversation
+            temperature: Creativity level (0-1)
+            max_tokens: Maximum tokens in response
+            completion: Dict filled in as the stream ends with the other
+                ChatCompletion fields (model, prompt_tokens, completion_tokens,
+                latency_ms, finish_reason)
+            
+        Yields:
+            Content deltas as they arrive from the model
+            
+        Raises:
+            OpenRouterError: If the request fails or the stream reports an error
+        """
+        if not self.api_key:
+            logger.error("OpenRouter API key is not configured")
+            raise OpenRouterError("Error: API key not configured")
+        
+        try:
+            # The slot is held until the stream ends
+            async with self.limiter.slot():
+                models = self.router.order()
+                for i, model in enumerate(models):
+                    started = False
+                    try:
+                        async for delta in self._stream_model(model, messages, temperature, max_tokens, completion):
+                            started = True
+                            yield delta
+                        return
+                    except OpenRouterError as e:
+                        # Once text has been sent the reply can't switch models
+                        if started or i == len(models) - 1 or not self._should_fall_back(ChatCompletion(str(e))):
+                            raise
+                        logger.warning(f"Falling back to model {models[i + 1]} ({e})")
+        except OverloadedError as e:
+            raise OpenRouterError(f"Error: {e}")
+    
+    async def _stream_model(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+        completion: Optional[Dict[str, Any]] = None,
+    ) -> AsyncIterator[str]:
+        """Stream a chat completion from one model (see chat_completion_stream)."""
+        payload = {
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "stream": True,
+            # Ask for the usage block in the final chunk
+            "usage": {"include": True},
+        }
+        if completion is None:
+            completion = {}
+        completion["model"] = model
+        
+        if not self.circuit_breaker.allow_request():
+            logger.warning("OpenRouter circuit open, failing fast")
+            upstream_requests_total.inc(model=model, outcome="circuit_open")
+            raise OpenRouterError(CIRCUIT_OPEN_MESSAGE)
+        
+        logger.info(f"Streaming from OpenRouter with model: {model}")
+        
+        response: Optional[httpx.Response] = None
+        # A stream that is abandoned by the client (generator closed) counts as cancelled
+        outcome = "cancelled"
+        started = time.perf_counter()
+        try:
+            # Retries only happen before the first byte is streamed
+            try:
+                response = await self._send_with_retry(payload, stream=True, timeout=self._timeout_for(model))
+            finally:
+                self._record_outcome(response)
+            
+            try:
+                logger.info(f"OpenRouter stream status: {response.status_code}")
+                
+                if response.status_code >= 400:
+                    body = await response.aread()
+                    logger.error(f"OpenRouter API error: {response.status_code} - {body[:500]!r}")
+                    outcome = self._status_outcome(response.status_code)
+                    raise OpenRouterError(self._status_error_message(response.status_code, model))
+                
+                async for line in response.aiter_lines():
+                    # Skip blank separators and SSE comments (keep-alive pings)
+                    if not line or line.startswith(":") or not line.startswith("data:"):
+                        continue
+                    
+                    data = line[len("data:"):].strip()
+                    if data == "[DONE]":
+                        break
+                    
+                    chunk = json.loads(data)
+                    if "error" in chunk:
+                        logger.error(f"OpenRouter stream error: {chunk['error']}")
+                        outcome = "stream_error"
+                        message = chunk["error"].get("message", "Stream interrupted")
+                        raise OpenRouterError(f"Error: {message}")
+                    
+                    # The final chunk may carry the usage block
+                    usage = chunk.get("usage")
+                    if usage:
+                        self._record_usage(model, usage)
+                        completion["prompt_tokens"] = usage.get("prompt_tokens")
+                        completion["completion_tokens"] = usage.get("completion_tokens")
+                    
+                    choices = chunk.get("choices") or []
+                    if choices:
+                        if choices[0].get("finish_reason"):
+                            completion["finish_reason"] = choices[0]["finish_reason"]
+                        delta = (choices[0].get("delta") or {}).get("content")
+                        if delta:
+                            yield delta
+                outcome = "ok"
+                completion["latency_ms"] = round((time.perf_counter() - started) * 1000)
+            finally:
+                await response.aclose()
+        except OpenRouterError:
+            raise
+        except httpx.TimeoutException:
+            logger.error("OpenRouter API stream timed out")
+            outcome = "timeout"
+            raise OpenRouterError("Error: Request timed out")
+        except Exception as e:
+            logger.error(f"Unexpected error in chat_completion_stream: {str(e)}", exc_info=True)
+            outcome = "connection_error" if isinstance(e, httpx.TransportError) else "error"
+            raise OpenRouterError(f"Error: {str(e)}")
+        finally:
+            upstream_requests_total.inc(model=model, outcome=outcome)
+            upstream_request_duration_seconds.observe(time.perf_counter() - started, model=model)
+    
+    async def _send_with_retry(
+        self,
+        payload: Dict[str, Any],
+        stream: bool = False,
+        timeout: Optional[httpx.Timeout] = None,
+    ) -> httpx.Response:
+        """
+        POST a completion request, retrying transient failures.
+        
+        Connection failures and 429/5xx responses are retried up to
+        OPENROUTER_MAX_RETRIES times with jittered exponential backoff,
+        waiting at least as long as the upstream's ``Retry-After`` asks.
+        
+        Args:
+            payload: Request JSON body
+            stream: Return before reading the body (caller must close the response)
+            timeout: Timeout for this request instead of the client default
+        
+        Returns:
+            The final response, which may still carry an error status
+        
+        Raises:
+            httpx.HTTPError: If the last attempt failed without a response
+        """
+        attempt = 0
+        while True:
+            request = self.client.build_request(
+                "POST", self.base_url, json=payload, headers=self._headers(),
+                timeout=timeout or httpx.USE_CLIENT_DEFAULT,
+            )
+            try:
+                with tracer.span(
+                    f"POST {request.url.host}",
+                    kind=SPAN_KIND_CLIENT,
+                    attributes={
+                        "http.request.method": "POST",
+                        "url.full": str(request.url),
+                        "server.address": request.url.host,
+                        "http.request.resend_count": attempt or None,
+                        "gen_ai.request.model": payload.get("model"),
+                        "openrouter.stream": stream,
+                    },
+                ) as span:
+                    response = await self.client.send(request, stream=stream)
+                    span.set_attribute("http.response.status_code", response.status_code)
+                    if response.status_code >= 400:
+                        span.set_error(f"HTTP {response.status_code}")
+            except RETRYABLE_EXCEPTIONS as e:
+                if attempt >= settings.openrouter_max_retries:
+                    raise
+                delay = self._retry_delay(attempt)
+                logger.warning(f"OpenRouter request failed ({type(e).__name__}), retrying in {delay:.2f}s")
+            else:
+                if response.status_code not in RETRYABLE_STATUS_CODES or attempt >= settings.openrouter_max_retries:
+                    return response
+                delay = self._retry_delay(attempt, response.headers.get("Retry-After"))
+                if delay is None:
+                    logger.warning(f"OpenRouter Retry-After too long, not retrying status {response.status_code}")
+                    return response
+                await response.aclose()
+                logger.warning(f"OpenRouter returned {response.status_code}, retrying in {delay:.2f}s")
+            
+            await asyncio.sleep(delay)
+            attempt += 1
+    
+    def _retry_delay(self, attempt: int, retry_after: Optional[str] = None) -> Optional[float]:
+        """
+        Compute the wait before a retry.
+        
+        Args:
+            attempt: Zero-based number of the attempt that failed
+            retry_after: Value of the upstream's Retry-After header (seconds or HTTP date)
+        
+        Returns:
+            Seconds to wait, or None if Retry-After exceeds OPENROUTER_RETRY_MAX_DELAY
+        """
+        cap = settings.openrouter_retry_max_delay
+        # Full jitter keeps retries from a burst of failures from arriving together
+        delay = random.uniform(0, min(cap, settings.openrouter_retry_backoff * 2 ** attempt))
+        
+        if retry_after:
+            try:
+                wait = float(retry_after)
+            except ValueError:
+                try:
+                    wait = (parsedate_to_datetime(retry_after) - datetime.now(timezone.utc)).total_seconds()
+                except (TypeError, ValueError):
+                    wait = 0.0
+            if wait > cap:
+                return None
+            delay = max(delay, wait)
+        return delay
+    
+    def _timeout_for(self, model: str) -> Optional[httpx.Timeout]:
+        """Get the per-model timeout from OPENROUTER_MODEL_TIMEOUTS, if any."""
+        read_timeout = settings.openrouter_model_timeouts.get(model)
+        if read_timeout is None:
+            return None
+        return httpx.Timeout(read_timeout, connect=settings.openrouter_connect_timeout)
+    
+    def routing_stats(self) -> Dict[str, Any]:
+        """Get the current model order and per-model latency stats."""
+        return {
+            "order": self.router.order(),
+            "hedging": settings.openrouter_hedge_requests,
+            "hedged_requests": self.hedged_requests,
+            "models": self.router.stats(),
+        }
+    
+    def _record_outcome(self, response: Optional[httpx.Response]) -> None:
+        """Report a finished upstream call to the circuit breaker."""
+        if response is None or response.status_code in RETRYABLE_STATUS_CODES:
+            self.circuit_breaker.record_failure()
+        else:
+            self.circuit_breaker.record_success()
+    
+    def _record_usage(self, model: str, usage: Optional[Dict[str, Any]]) -> None:
+        """Count the prompt and completion tokens of an upstream usage block."""
+        if not usage:
+            return
+        for kind in ("prompt", "completion"):
+            tokens = usage.get(f"{kind}_tokens")
+            if isinstance(tokens, int):
+                upstream_tokens_total.inc(tokens, model=model, kind=kind)
+    
+    @staticmethod
+    def _status_outcome(status_code: int) -> str:
+        """Classify an upstream HTTP error status for metrics."""
+        if status_code == 429:
+            return "rate_limited"
+        if status_code in (401, 403):
+            return "auth_error"
+        if status_code >= 500:
+            return "server_error"
+        return "client_error"
+    
+    def _headers(self) -> Dict[str, str]:
+        """Build request headers for OpenRouter."""
+        return {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+            "HTTP-Referer": "http://localhost:3000",
+        }
+    
+    def _status_error_message(self, status_code: int, model: Optional[str] = None) -> str:
+        """Map an upstream HTTP status to the error string returned to callers."""
+        if status_code == 401:
+            return "Error: Invalid API key"
+        elif status_code == 404:
+            return f"Error: Model '{model or self.model}' not found or endpoint unavailable"
+        else:
+            return f"Error: API returned status {status_code}"
     
-    def build_system_prompt(self, resume_context: str) -> str:
+    def build_system_prompt(self, resume_context: str, excerpt: bool = False) -> str:
         """
         Build a system prompt for the chat model.
         
         Args:
             resume_context: The user's resume information
+            excerpt: Whether resume_context holds only the sections relevant to the question
             
         Returns:
             System prompt string
         """
+        heading = "RESUME INFORMATION (sections relevant to this question)" if excerpt else "RESUME INFORMATION"
         return f"""You are an AI assistant acting as a professional representative for a software developer. 
 You MUST use ONLY the resume information provided below to answer questions. 
 
-RESUME INFORMATION:
+{heading}:
 ================
 {resume_context}
 ================
@@ -0,0 +1,151 @@
+"""Cache for the resume-based system prompt."""
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+import hashlib
+import logging
+from ..config import settings
+from .context_window import estimate_tokens
+from .openrouter_service import openrouter_service
+from .resume_retriever import ResumeIndex
+
+logger = logging.getLogger(__name__)
+
+
+class PromptEntry(NamedTuple):
+    """A prebuilt system prompt for one resume version."""
+    resume_context: str
+    version: str
+    prompt: str
+    system_message: Dict[str, str]
+    index: Optional[ResumeIndex] = None
+    excerpts: Optional[Dict[Tuple[int, ...], Dict[str, str]]] = None
+
+
+# Excerpt system messages kept per resume version
+MAX_EXCERPT_PROMPTS = 256
+
+
+def resume_version(resume_context: str) -> str:
+    """
+    Compute a short content hash identifying a resume version.
+    
+    Args:
+        resume_context: The resume text
+    
+    Returns:
+        Hex digest prefix of the resume content
+    """
+    return hashlib.sha256(resume_context.encode("utf-8")).hexdigest()[:16]
+
+
+class SystemPromptCache:
+    """
+    Build the system prompt once per resume version and reuse it.
+    
+    The hot path is an identity check against the resume string the entry was
+    built from, so requests never re-hash or re-format the resume. The entry is
+    rebuilt when the resume string changes or ``invalidate()`` is called.
+    
+    Long resumes also get a BM25 index of their sections when the entry is
+    built, so each question can be answered from a short excerpt instead.
+    """
+    
+    def __init__(self):
+        self._entry: Optional[PromptEntry] = None
+        self._listeners: List[Callable[[], None]] = []
+    
+    def on_invalidate(self, callback: Callable[[], None]) -> None:
+        """
+        Register a callback to run whenever the resume changes.
+        
+        Args:
+            callback: Function with no arguments (e.g. a cache's clear method)
+        """
+        self._listeners.append(callback)
+    
+    def get(self, resume_context: str) -> PromptEntry:
+        """
+        Get the prebuilt prompt entry for a resume.
+        
+        Args:
+            resume_context: The active resume text
+        
+        Returns:
+            PromptEntry for that resume (shared, do not mutate)
+        """
+        entry = self._entry
+        if entry is not None and entry.resume_context is resume_context:
+            return entry
+        
+        version = resume_version(resume_context)
+        if entry is not None and entry.version == version:
+            # Same content in a new string object, keep the built prompt
+            entry = entry._replace(resume_context=resume_context)
+        else:
+            prompt = openrouter_service.build_system_prompt(resume_context)
+            index = None
+            if (
+                settings.resume_retrieval_enabled
+                and estimate_tokens(resume_context) >= settings.resume_retrieval_min_tokens
+            ):
+                index = ResumeIndex(resume_context)
+                logger.info(f"Resume index built with {len(index.chunks)} chunks")
+            entry = PromptEntry(
+                resume_context=resume_context,
+                version=version,
+                prompt=prompt,
+                system_message={"role": "system", "content": prompt},
+                index=index,
+                excerpts={},
+            )
+            logger.info(f"System prompt built for resume version {version}")
+        
+        self._entry = entry
+        return entry
+    
+    def system_message(self, resume_context: str, question: Optional[str] = None) -> Dict[str, str]:
+        """
+        Get the system message dict for a resume.
+        
+        Args:
+            resume_context: The active resume text
+            question: The user's question; when the resume is indexed, only
+                the sections relevant to it are included
+        
+        Returns:
+            System message with the full resume, or with a resume excerpt if
+            the question matched any indexed sections
+        """
+        entry = self.get(resume_context)
+        if entry.index is None or not question:
+            return entry.system_message
+        
+        chunk_ids = tuple(entry.index.search(question, settings.resume_retrieval_top_k))
+        if not chunk_ids:
+            # Vague questions ("what can you do?") get the whole resume
+            return entry.system_message
+        
+        message = entry.excerpts.get(chunk_ids)
+        if message is None:
+            prompt = openrouter_service.build_system_prompt(
+                entry.index.render(list(chunk_ids)), excerpt=True
+            )
+            message = {"role": "system", "content": prompt}
+            if len(entry.excerpts) >= MAX_EXCERPT_PROMPTS:
+                entry.excerpts.clear()
+            entry.excerpts[chunk_ids] = message
+        return message
+    
+    def version(self, resume_context: str) -> str:
+        """Get the version hash of a resume."""
+        return self.get(resume_context).version
+    
+    def invalidate(self) -> None:
+        """Drop the cached prompt so the next request rebuilds it."""
+        self._entry = None
+        for callback in self._listeners:
+            callback()
+        logger.info("System prompt cache invalidated")
+
+
+# Create a global instance
+prompt_cache = SystemPromptCache()
@@ -0,0 +1,212 @@
+"""Token bucket rate limiting with pluggable storage backends."""
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional, Tuple
+import importlib.util
+import logging
+import math
+import time
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitBackend(ABC):
+    """
+    Storage for token buckets.
+    
+    Implementations must refill and take tokens atomically per key, so the
+    same backend can be shared by several workers.
+    """
+    
+    @abstractmethod
+    async def take(self, key: str, rate: float, burst: int) -> Tuple[bool, float]:
+        """
+        Take one token from a bucket.
+        
+        Args:
+            key: Bucket key (e.g. "ip:1.2.3.4")
+            rate: Tokens added per second
+            burst: Bucket capacity
+        
+        Returns:
+            Tuple of (allowed, seconds until a token is available)
+        """
+    
+    async def close(self) -> None:
+        """Release any connections held by the backend."""
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get backend details for health output."""
+        return {"backend": type(self).__name__}
+
+
+class InMemoryBackend(RateLimitBackend):
+    """
+    Buckets in a dict of ``key -> (tokens, updated_at)`` tuples.
+    
+    Buckets idle long enough to have refilled completely are equivalent to
+    missing ones, so a sweep every ``sweep_interval`` seconds drops them.
+    ``max_keys`` caps memory if a flood of distinct keys arrives between
+    sweeps, evicting the oldest buckets first. Only correct within a single
+    worker process.
+    """
+    
+    def __init__(self, max_keys: int = 100_000, sweep_interval: float = 60.0):
+        self.max_keys = max_keys
+        self.sweep_interval = sweep_interval
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        # Longest refill time seen, which bounds how long a bucket stays useful
+        self._max_idle = 0.0
+        self._next_sweep = time.monotonic() + sweep_interval
+        self.evicted = 0
+    
+    async def take(self, key: str, rate: float, burst: int) -> Tuple[bool, float]:
+        now = time.monotonic()
+        if now >= self._next_sweep:
+            self._sweep(now)
+        
+        self._max_idle = max(self._max_idle, burst / rate)
+        tokens, updated_at = self._buckets.pop(key, (float(burst), now))
+        tokens = min(float(burst), tokens + (now - updated_at) * rate)
+        
+        allowed = tokens >= 1.0
+        if allowed:
+            tokens -= 1.0
+        # Re-inserting keeps the dict ordered by last use for eviction
+        self._buckets[key] = (tokens, now)
+        
+        if len(self._buckets) > self.max_keys:
+            self._evict_oldest(len(self._buckets) - self.max_keys)
+        
+        return allowed, 0.0 if allowed else (1.0 - tokens) / rate
+    
+    def _sweep(self, now: float) -> None:
+        """Drop buckets that have been idle long enough to be full again."""
+        cutoff = now - self._max_idle
+        idle = [key for key, (_, updated_at) in self._buckets.items() if updated_at <= cutoff]
+        for key in idle:
+            del self._buckets[key]
+        self.evicted += len(idle)
+        self._next_sweep = now + self.sweep_interval
+        if idle:
+            logger.info(f"Rate limiter evicted {len(idle)} idle buckets")
+    
+    def _evict_oldest(self, count: int) -> None:
+        """Drop the least recently used buckets."""
+        for key in list(self._buckets)[:count]:
+            del self._buckets[key]
+        self.evicted += count
+    
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "memory", "keys": len(self._buckets), "evicted": self.evicted}
+
+
+# Refill and take atomically in Redis; returns {allowed, tokens left}
+_REDIS_TOKEN_BUCKET = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or burst
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return {allowed, tostring(tokens)}
+"""
+
+
+class RedisBackend(RateLimitBackend):
+    """Buckets shared across workers in Redis (requires the ``redis`` package)."""
+    
+    def __init__(self, url: str, prefix: str = "ratelimit:"):
+        import redis.asyncio as redis
+        
+        self.prefix = prefix
+        self._redis = redis.from_url(url)
+        self._script = self._redis.register_script(_REDIS_TOKEN_BUCKET)
+    
+    async def take(self, key: str, rate: float, burst: int) -> Tuple[bool, float]:
+        allowed, tokens = await self._script(keys=[self.prefix + key], args=[rate, burst, time.time()])
+        tokens = float(tokens)
+        return bool(allowed), 0.0 if allowed else (1.0 - tokens) / rate
+    
+    async def close(self) -> None:
+        await self._redis.aclose()
+    
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "redis"}
+
+
+class RateLimiter:
+    """Per-IP and per-user token buckets on top of a backend."""
+    
+    def __init__(self, backend: RateLimitBackend, enabled: bool = True):
+        self.backend = backend
+        self.enabled = enabled
+        self.allowed = 0
+        self.limited = 0
+    
+    async def check(self, ip: str, user_name: Optional[str] = None) -> Optional[int]:
+        """
+        Take a token for a client from each applicable bucket.
+        
+        Args:
+            ip: Client IP address
+            user_name: User name from the request, if any
+        
+        Returns:
+            None if the request may proceed, otherwise seconds to wait (Retry-After)
+        """
+        if not self.enabled:
+            return None
+        
+        buckets = [(f"ip:{ip}", settings.rate_limit_ip_rate, settings.rate_limit_ip_burst)]
+        if user_name:
+            buckets.append((f"user:{user_name}", settings.rate_limit_user_rate, settings.rate_limit_user_burst))
+        
+        wait = 0.0
+        for key, rate, burst in buckets:
+            try:
+                allowed, retry_after = await self.backend.take(key, rate, burst)
+            except Exception as e:
+                # Never turn a broken shared store into an outage
+                logger.error(f"Rate limit backend error: {str(e)}")
+                return None
+            if not allowed:
+                wait = max(wait, retry_after)
+        
+        if wait:
+            self.limited += 1
+            return max(1, math.ceil(wait))
+        self.allowed += 1
+        return None
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get limiter counters and backend details."""
+        return {
+            "enabled": self.enabled,
+            "allowed": self.allowed,
+            "limited": self.limited,
+            **self.backend.stats(),
+        }
+
+
+def create_backend() -> RateLimitBackend:
+    """Create the backend selected by RATE_LIMIT_REDIS_URL."""
+    if settings.rate_limit_redis_url:
+        if importlib.util.find_spec("redis") is None:
+            logger.warning("RATE_LIMIT_REDIS_URL is set but 'redis' is not installed, using in-memory rate limits")
+        else:
+            logger.info("Using Redis for rate limits")
+            return RedisBackend(settings.rate_limit_redis_url)
+    return InMemoryBackend()
+
+
+# Create a global instance
+rate_limiter = RateLimiter(create_backend(), enabled=settings.rate_limit_enabled)
@@ -0,0 +1,184 @@
+"""In-memory LRU/TTL cache for assistant replies."""
+from collections import OrderedDict
+from typing import Any, Dict, List, NamedTuple, Optional
+import hashlib
+import json
+import logging
+import re
+import time
+from ..config import settings
+from .prompt_cache import prompt_cache
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+_TRAILING_PUNCTUATION = re.compile(r"[\s?!.,;:]+$")
+
+
+def normalize_question(text: str) -> str:
+    """
+    Normalize a question so trivial variations share a cache entry.
+    
+    Args:
+        text: Raw user message
+    
+    Returns:
+        Lowercased message with collapsed whitespace and no trailing punctuation
+    """
+    text = _WHITESPACE.sub(" ", text.strip().lower())
+    return _TRAILING_PUNCTUATION.sub("", text)
+
+
+class CacheEntry(NamedTuple):
+    """A cached reply and its bookkeeping."""
+    value: str
+    size: int
+    expires_at: float
+
+
+class ResponseCache:
+    """
+    LRU cache of assistant replies with a TTL and a total size bound.
+    
+    Keys combine the model, resume version, normalized question, a hash of the
+    (already trimmed) history and the sampling parameters, so a hit is only
+    served for an equivalent prompt. Entries are evicted least recently used
+    first once either the entry count or the byte budget is exceeded.
+    """
+    
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        max_bytes: int = 8 * 1024 * 1024,
+        ttl_seconds: float = 3600.0,
+        enabled: bool = True
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def make_key(
+        self,
+        model: str,
+        resume_version: str,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int
+    ) -> str:
+        """
+        Build the cache key for a prompt.
+        
+        Args:
+            model: Model the reply would come from
+            resume_version: Version hash of the active resume
+            messages: Conversation after the resume system prompt, ending with the user message
+            temperature: Sampling temperature
+            max_tokens: Maximum tokens in the reply
+        
+        Returns:
+            Cache key string
+        """
+        question = normalize_question(messages[-1]["content"]) if messages else ""
+        history = messages[:-1]
+        history_hash = (
+            hashlib.sha1(
+                json.dumps(history, separators=(",", ":"), sort_keys=True).encode("utf-8")
+            ).hexdigest()
+            if history
+            else "-"
+        )
+        return f"{model}|{resume_version}|{temperature}|{max_tokens}|{history_hash}|{question}"
+    
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached reply.
+        
+        Args:
+            key: Key from make_key
+        
+        Returns:
+            Cached reply, or None on a miss or expired entry
+        """
+        if not self.enabled:
+            return None
+        
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        
+        if entry.expires_at <= time.monotonic():
+            self._remove(key)
+            self.misses += 1
+            return None
+        
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry.value
+    
+    def set(self, key: str, value: str) -> None:
+        """
+        Store a reply (error replies are never cached).
+        
+        Args:
+            key: Key from make_key
+            value: Assistant reply
+        """
+        if not self.enabled or not value or value.startswith("Error:"):
+            return
+        
+        size = len(key) + len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        
+        if key in self._entries:
+            self._remove(key)
+        
+        self._entries[key] = CacheEntry(value, size, time.monotonic() + self.ttl_seconds)
+        self._bytes += size
+        
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+    
+    def clear(self) -> None:
+        """Drop all entries (e.g. when the resume changes)."""
+        if self._entries:
+            logger.info(f"Response cache cleared ({len(self._entries)} entries)")
+        self._entries.clear()
+        self._bytes = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get cache size and hit/miss counters."""
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+    
+    def _remove(self, key: str) -> None:
+        """Remove an entry and release its bytes."""
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+
+# Create a global instance
+response_cache = ResponseCache(
+    max_entries=settings.response_cache_max_entries,
+    max_bytes=settings.response_cache_max_bytes,
+    ttl_seconds=settings.response_cache_ttl_seconds,
+    enabled=settings.response_cache_enabled,
+)
+prompt_cache.on_invalidate(response_cache.clear)
@@ -0,0 +1,198 @@
+"""BM25 retrieval over resume sections for question-specific prompts."""
+from collections import Counter
+from typing import Dict, List, NamedTuple, Tuple
+import math
+import re
+
+_TOKEN = re.compile(r"[a-z0-9+#]+")
+_BULLET = re.compile(r"^(?:[-*•]|\d+[.)])\s")
+# Words of a heading: capitalized letters, or a joiner such as "&" in "LANGUAGES & SOFT SKILLS"
+_HEADING_WORD = re.compile(r"^(?:[A-Z][A-Z'’.-]*|&|/)$")
+MAX_HEADING_WORDS = 5
+_STOPWORDS = frozenset(
+    "a about an and are as at be can could did do does for from have how i in is it "
+    "me my of on or so tell that the this to was what when where which who with you your".split()
+)
+
+# Extra terms for standard section headings, so questions phrased without the
+# resume's own wording (e.g. "what languages do you know") still match
+SECTION_KEYWORDS: Dict[str, str] = {
+    "summary": "about yourself background overview introduce who",
+    "skill": "languages technologies stack tools frameworks know proficient expertise",
+    "experience": "work job jobs career roles role worked employment company years",
+    "project": "built build portfolio apps applications side made",
+    "education": "degree study studied university college school certifications",
+    "interest": "hobbies passionate enjoy free time",
+}
+
+# BM25 parameters
+K1 = 1.5
+B = 0.75
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lowercase terms without stopwords or a plural "s".
+    
+    Args:
+        text: Text to tokenize
+    
+    Returns:
+        List of terms
+    """
+    terms = []
+    for word in _TOKEN.findall(text.lower()):
+        if word in _STOPWORDS:
+            continue
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        terms.append(word)
+    return terms
+
+
+class ResumeChunk(NamedTuple):
+    """One retrievable piece of a resume."""
+    section: str
+    text: str
+
+
+def _is_heading(line: str) -> bool:
+    """
+    Check for a section heading line such as ``TECHNICAL SKILLS``.
+    
+    Only a few all-caps words count, so entry lines that happen to have no
+    lowercase letters (``CGPA: 7.53/10.0``, ``B.TECH CSE (2021-2025)``) are not
+    mistaken for headings.
+    """
+    words = line.split()
+    return (
+        0 < len(words) <= MAX_HEADING_WORDS
+        and not _BULLET.match(line)
+        and sum(c.isalpha() for c in line) >= 3
+        and all(_HEADING_WORD.match(word) for word in words)
+    )
+
+
+def split_sections(resume_text: str) -> List[ResumeChunk]:
+    """
+    Split a resume into chunks along its headings and entries.
+    
+    Sections start at all-caps heading lines. Inside a section, an entry (a
+    job title, project, sub-heading or paragraph) starts a new chunk when it
+    follows a blank line, a bullet or a heading, or is numbered. The lines
+    right below it (dates, grades) and its bullets belong to the same chunk.
+    
+    Args:
+        resume_text: The resume text
+    
+    Returns:
+        Chunks in resume order
+    """
+    chunks: List[ResumeChunk] = []
+    section = ""
+    lines: List[str] = []
+    entry_ended = True
+    
+    def flush():
+        if lines:
+            chunks.append(ResumeChunk(section, "\n".join(lines)))
+            lines.clear()
+    
+    for raw in resume_text.splitlines():
+        line = raw.strip()
+        if not line:
+            entry_ended = True
+            continue
+        if _is_heading(line):
+            flush()
+            section = line
+            entry_ended = True
+        elif line.startswith(("-", "*", "•")):
+            lines.append(line)
+            entry_ended = True
+        else:
+            if entry_ended or _BULLET.match(line):
+                flush()
+            lines.append(line)
+            entry_ended = False
+    flush()
+    return chunks
+
+
+class ResumeIndex:
+    """
+    BM25 index over the chunks of one resume version.
+    
+    Term statistics are computed once when the index is built, so a query
+    only touches the postings of its own terms.
+    """
+    
+    def __init__(self, resume_text: str):
+        self.chunks = split_sections(resume_text)
+        self._postings: Dict[str, List[Tuple[int, int]]] = {}
+        self._idf: Dict[str, float] = {}
+        self._norms: List[float] = []
+        
+        lengths = []
+        for i, chunk in enumerate(self.chunks):
+            terms = tokenize(f"{chunk.section} {chunk.text} {self._section_keywords(chunk.section)}")
+            lengths.append(len(terms))
+            for term, count in Counter(terms).items():
+                self._postings.setdefault(term, []).append((i, count))
+        
+        total = len(self.chunks)
+        avg_length = sum(lengths) / total if total else 0.0
+        self._norms = [K1 * (1 - B + B * length / avg_length) if avg_length else K1 for length in lengths]
+        self._idf = {
+            term: math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+            for term, postings in self._postings.items()
+        }
+    
+    @staticmethod
+    def _section_keywords(section: str) -> str:
+        """Get the extra match terms for a section heading."""
+        heading = section.lower()
+        return " ".join(words for key, words in SECTION_KEYWORDS.items() if key in heading)
+    
+    def search(self, query: str, top_k: int) -> List[int]:
+        """
+        Find the chunks most relevant to a question.
+        
+        Args:
+            query: The user's question
+            top_k: Maximum number of chunks to return
+        
+        Returns:
+            Indexes of matching chunks in resume order (empty if nothing matches)
+        """
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query)):
+            idf = self._idf.get(term)
+            if idf is None:
+                continue
+            for i, count in self._postings[term]:
+                scores[i] = scores.get(i, 0.0) + idf * count * (K1 + 1) / (count + self._norms[i])
+        
+        best = sorted(scores, key=scores.get, reverse=True)[:top_k]
+        return sorted(best)
+    
+    def render(self, chunk_ids: List[int]) -> str:
+        """
+        Format selected chunks under their section headings.
+        
+        Args:
+            chunk_ids: Chunk indexes in resume order
+        
+        Returns:
+            Resume excerpt text
+        """
+        parts = []
+        section = None
+        for i in chunk_ids:
+            chunk = self.chunks[i]
+            if chunk.section != section:
+                section = chunk.section
+                if section:
+                    parts.append(f"\n{section}")
+            parts.append(chunk.text)
+        return "\n".join(parts).strip()
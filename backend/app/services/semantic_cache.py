@@ -0,0 +1,253 @@
+"""Embedding-based answer cache for paraphrased resume questions.
+
+Questions are embedded on the CPU and matched against previous questions
+for the active resume version by cosine similarity. A stored answer is
+reused when the best match is above SEMANTIC_CACHE_THRESHOLD.
+
+Optional dependencies:
+- numpy (required for the cache to run at all)
+- sentence-transformers for a real embedding model; without it a hashed
+  word/character n-gram embedder is used, which only catches close rewordings
+- hnswlib for an approximate nearest neighbour index on large caches
+"""
+from starlette.concurrency import run_in_threadpool
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+import asyncio
+import importlib.util
+import logging
+import re
+import time
+import zlib
+from ..config import settings
+from .prompt_cache import prompt_cache
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+logger = logging.getLogger(__name__)
+
+_TOKEN = re.compile(r"[a-z0-9+#]+")
+_STOPWORDS = frozenset(
+    "a an and are can could do does for have how i in is it me of on or the to "
+    "what which who with you your".split()
+)
+
+
+class HashingEmbedder:
+    """Dependency-free embedder using hashed word and character n-grams."""
+    
+    def __init__(self, dim: int = 512):
+        self.dim = dim
+    
+    def encode(self, text: str) -> "np.ndarray":
+        """Embed text into a unit-length vector."""
+        vector = np.zeros(self.dim, dtype=np.float32)
+        words = [w for w in _TOKEN.findall(text.lower()) if w not in _STOPWORDS]
+        features: List[str] = list(words)
+        features += [f"{a} {b}" for a, b in zip(words, words[1:])]
+        for word in words:
+            padded = f"#{word}#"
+            features += [padded[i:i + 3] for i in range(len(padded) - 2)]
+        for feature in features:
+            vector[zlib.crc32(feature.encode("utf-8")) % self.dim] += 1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+
+class SentenceTransformerEmbedder:
+    """Embedder backed by a local sentence-transformers model on the CPU."""
+    
+    def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer
+        
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self.dim = self.model.get_sentence_embedding_dimension()
+    
+    def encode(self, text: str) -> "np.ndarray":
+        """Embed text into a unit-length vector."""
+        return self.model.encode(text, normalize_embeddings=True).astype(np.float32)
+
+
+class VectorIndex:
+    """
+    Fixed-capacity inner-product index over unit vectors.
+    
+    Vectors live in one preallocated matrix used as a ring buffer, so memory
+    is bounded by ``capacity * dim`` floats and the oldest entry is replaced
+    once full. Search is a brute-force matrix-vector product, or an HNSW graph
+    when ``use_ann`` is set and hnswlib is installed.
+    """
+    
+    def __init__(self, dim: int, capacity: int, use_ann: bool = False):
+        self.dim = dim
+        self.capacity = capacity
+        self.vectors = np.zeros((capacity, dim), dtype=np.float32)
+        self.answers: List[Optional[str]] = [None] * capacity
+        self.size = 0
+        self._next = 0
+        self._ann = None
+        
+        if use_ann:
+            import hnswlib
+            
+            self._ann = hnswlib.Index(space="ip", dim=dim)
+            self._ann.init_index(max_elements=capacity, ef_construction=100, M=16)
+            self._ann.set_ef(64)
+    
+    def add(self, vector: "np.ndarray", answer: str) -> None:
+        """Insert a vector, replacing the oldest one when full."""
+        slot = self._next
+        self.vectors[slot] = vector
+        self.answers[slot] = answer
+        if self._ann is not None:
+            # Re-adding an existing label replaces its vector
+            self._ann.add_items(vector.reshape(1, -1), np.array([slot]))
+        self._next = (slot + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+    
+    def search(self, vector: "np.ndarray") -> Tuple[Optional[str], float]:
+        """
+        Find the most similar stored vector.
+        
+        Returns:
+            Tuple of (answer, cosine similarity), or (None, 0.0) when empty
+        """
+        if self.size == 0:
+            return None, 0.0
+        
+        if self._ann is not None:
+            labels, distances = self._ann.knn_query(vector.reshape(1, -1), k=1)
+            slot = int(labels[0][0])
+            return self.answers[slot], 1.0 - float(distances[0][0])
+        
+        scores = self.vectors[:self.size] @ vector
+        slot = int(np.argmax(scores))
+        return self.answers[slot], float(scores[slot])
+
+
+class SemanticLookup(NamedTuple):
+    """Result of a semantic cache lookup."""
+    answer: Optional[str]
+    score: float
+    vector: Any
+
+
+class SemanticCache:
+    """Answer cache matching questions by embedding similarity."""
+    
+    def __init__(self):
+        self.enabled = settings.semantic_cache_enabled and np is not None
+        self.threshold = settings.semantic_cache_threshold
+        self._embedder = None
+        self._load_lock = asyncio.Lock()
+        self._index: Optional[VectorIndex] = None
+        self._version: Optional[str] = None
+        self.hits = 0
+        self.misses = 0
+        self._lookup_seconds_total = 0.0
+        self._lookup_seconds_max = 0.0
+        
+        if settings.semantic_cache_enabled and np is None:
+            logger.warning("SEMANTIC_CACHE_ENABLED is set but numpy is not installed, semantic cache disabled")
+    
+    def _load_embedder(self):
+        """Load the configured embedding model (blocking, run in a thread)."""
+        if importlib.util.find_spec("sentence_transformers") is not None:
+            try:
+                embedder = SentenceTransformerEmbedder(settings.semantic_cache_model)
+                logger.info(f"Semantic cache using embedding model: {settings.semantic_cache_model}")
+                return embedder
+            except Exception as e:
+                logger.error(f"Could not load embedding model {settings.semantic_cache_model}: {e}")
+        logger.warning("Semantic cache using hashed n-gram embeddings (install sentence-transformers for paraphrase matching)")
+        return HashingEmbedder()
+    
+    async def startup(self) -> None:
+        """Load the embedding model ahead of the first request."""
+        if not self.enabled or self._embedder is not None:
+            return
+        async with self._load_lock:
+            if self._embedder is None:
+                self._embedder = await run_in_threadpool(self._load_embedder)
+    
+    def _index_for(self, resume_version: str) -> VectorIndex:
+        """Get the index for a resume version, starting a fresh one if it changed."""
+        if self._index is None or self._version != resume_version:
+            capacity = settings.semantic_cache_max_entries
+            use_ann = (
+                capacity >= settings.semantic_cache_ann_min_entries
+                and importlib.util.find_spec("hnswlib") is not None
+            )
+            self._index = VectorIndex(self._embedder.dim, capacity, use_ann=use_ann)
+            self._version = resume_version
+        return self._index
+    
+    async def lookup(self, question: str, resume_version: str) -> SemanticLookup:
+        """
+        Find a stored answer for a similar question.
+        
+        Args:
+            question: The user's question
+            resume_version: Version hash of the active resume
+        
+        Returns:
+            SemanticLookup with the answer (None on a miss) and the question
+            vector, which should be passed back to store() after a miss
+        """
+        if not self.enabled:
+            return SemanticLookup(None, 0.0, None)
+        
+        await self.startup()
+        started = time.perf_counter()
+        vector = await run_in_threadpool(self._embedder.encode, question)
+        answer, score = self._index_for(resume_version).search(vector)
+        elapsed = time.perf_counter() - started
+        
+        self._lookup_seconds_total += elapsed
+        self._lookup_seconds_max = max(self._lookup_seconds_max, elapsed)
+        
+        if answer is not None and score >= self.threshold:
+            self.hits += 1
+            logger.info(f"Semantic cache hit (similarity {score:.3f})")
+            return SemanticLookup(answer, score, vector)
+        
+        self.misses += 1
+        return SemanticLookup(None, score, vector)
+    
+    def store(self, lookup: SemanticLookup, resume_version: str, answer: str) -> None:
+        """
+        Store an answer for the question embedded during lookup().
+        
+        Args:
+            lookup: Result of the preceding lookup() miss
+            resume_version: Version hash of the active resume
+            answer: Assistant reply (error replies are not stored)
+        """
+        if not self.enabled or lookup.vector is None or not answer or answer.startswith("Error:"):
+            return
+        self._index_for(resume_version).add(lookup.vector, answer)
+    
+    def clear(self) -> None:
+        """Drop all stored answers (e.g. when the resume changes)."""
+        self._index = None
+        self._version = None
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get hit rate, size and lookup latency."""
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": self._index.size if self._index is not None else 0,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "lookup_ms_avg": round(self._lookup_seconds_total / lookups * 1000, 3) if lookups else 0.0,
+            "lookup_ms_max": round(self._lookup_seconds_max * 1000, 3),
+        }
+
+
+# Create a global instance
+semantic_cache = SemanticCache()
+prompt_cache.on_invalidate(semantic_cache.clear)
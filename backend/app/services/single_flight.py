@@ -0,0 +1,83 @@
+"""Coalesce identical concurrent async calls into one."""
+from typing import Any, Awaitable, Callable, Dict
+import asyncio
+import hashlib
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def request_key(*parts: Any) -> str:
+    """
+    Hash request parameters into a coalescing key.
+    
+    Args:
+        parts: JSON-serializable request parameters (model, messages, ...)
+    
+    Returns:
+        Hex digest identifying the request
+    """
+    payload = json.dumps(parts, separators=(",", ":"), sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SingleFlight:
+    """
+    Run at most one call per key at a time and share its result.
+    
+    The first caller for a key starts the call as a task; callers arriving
+    while it runs await the same task. Waiters are shielded from each other,
+    so one client disconnecting does not cancel the call for the rest.
+    """
+    
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._calls: Dict[str, asyncio.Task] = {}
+        self.calls = 0
+        self.executed = 0
+        self.deduplicated = 0
+    
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run fn, or join the call already in flight for the same key.
+        
+        Args:
+            key: Request key (see request_key)
+            fn: Coroutine function making the call
+        
+        Returns:
+            Result of the shared call
+        """
+        self.calls += 1
+        if not self.enabled:
+            self.executed += 1
+            return await fn()
+        
+        task = self._calls.get(key)
+        if task is None:
+            self.executed += 1
+            task = asyncio.create_task(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self.deduplicated += 1
+            logger.info(f"Joined in-flight request ({len(self._calls)} in flight)")
+        
+        return await asyncio.shield(task)
+    
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        """Remove a finished call so the next caller starts a new one."""
+        if self._calls.get(key) is task:
+            del self._calls[key]
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get call counters and the number of calls in flight."""
+        return {
+            "enabled": self.enabled,
+            "calls": self.calls,
+            "executed": self.executed,
+            "deduplicated": self.deduplicated,
+            "in_flight": len(self._calls),
+            "dedup_rate": round(self.deduplicated / self.calls, 4) if self.calls else 0.0,
+        }
@@ -0,0 +1,111 @@
+"""Rolling conversation summaries that replace old turns in the prompt."""
+from typing import Dict, Optional, Set, Tuple
+import logging
+from ..config import settings
+from ..database import AsyncSessionLocal
+from ..models.db.models import Conversation
+from .async_database_service import AsyncConversationService
+from .database_service import MAX_HISTORY_PAGE_SIZE
+from .openrouter_service import openrouter_service
+from .write_behind import message_writer
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_INSTRUCTIONS = """You maintain a running summary of a chat between a visitor and an AI assistant that answers questions about a software developer's resume.
+Update the current summary with the new messages. Keep what the visitor asked or told about themselves, the topics covered and the key facts given in answers.
+Reply with the updated summary only, in under 200 words."""
+
+
+class SummaryService:
+    """Incrementally summarize older conversation turns in the background."""
+    
+    def __init__(self):
+        # Conversations with a summary in progress, so bursts don't summarize twice
+        self._in_progress: Set[str] = set()
+    
+    def summary_message(self, summary: str) -> Dict[str, str]:
+        """
+        Build the system message that carries a conversation summary.
+        
+        Args:
+            summary: Stored summary text
+        
+        Returns:
+            System message dict to place before the recent history
+        """
+        return {
+            "role": "system",
+            "content": f"Summary of the earlier conversation:\n{summary}",
+        }
+    
+    async def maybe_summarize(self, conversation_id: str) -> None:
+        """
+        Fold older unsummarized messages into the conversation summary.
+        
+        Runs as a background task after the reply has been sent. Only messages
+        since the last summary are read and sent to the summary model; the
+        newest SUMMARY_KEEP_RECENT messages are left verbatim.
+        
+        Args:
+            conversation_id: ID of the conversation
+        """
+        if not settings.summary_enabled or AsyncSessionLocal is None:
+            return
+        if conversation_id in self._in_progress:
+            return
+        
+        self._in_progress.add(conversation_id)
+        try:
+            await message_writer.flush_for(conversation_id)
+            async with AsyncSessionLocal() as db:
+                conversation = await db.get(Conversation, conversation_id)
+                if conversation is None:
+                    return
+                
+                since: Optional[Tuple] = None
+                if conversation.summary_until_at is not None:
+                    since = (conversation.summary_until_at, conversation.summary_until_id)
+                
+                messages, _ = await AsyncConversationService.get_history_page(
+                    db, conversation_id, limit=MAX_HISTORY_PAGE_SIZE, since=since
+                )
+                keep = settings.summary_keep_recent
+                if len(messages) <= keep + settings.summary_trigger_messages:
+                    return
+                
+                to_summarize = messages[:len(messages) - keep]
+                previous = conversation.summary
+                await db.commit()
+                
+                transcript = "\n".join(
+                    f"{'Visitor' if msg.role == 'user' else 'Assistant'}: {msg.content}"
+                    for msg in to_summarize
+                )
+                completion = await openrouter_service.chat_completion(
+                    messages=[
+                        {"role": "system", "content": SUMMARY_INSTRUCTIONS},
+                        {
+                            "role": "user",
+                            "content": f"Current summary:\n{previous or '(none)'}\n\nNew messages:\n{transcript}",
+                        },
+                    ],
+                    temperature=0.2,
+                    max_tokens=settings.summary_max_tokens,
+                    model=settings.summary_model,
+                )
+                if not completion.ok:
+                    logger.warning(f"Skipping summary for {conversation_id}: {completion.content}")
+                    return
+                
+                await AsyncConversationService.update_summary(
+                    db, conversation_id, completion.content.strip(), to_summarize[-1]
+                )
+                logger.info(f"Summarized {len(to_summarize)} messages in conversation: {conversation_id}")
+        except Exception as e:
+            logger.error(f"Error summarizing conversation {conversation_id}: {str(e)}")
+        finally:
+            self._in_progress.discard(conversation_id)
+
+
+# Create a global instance
+summary_service = SummaryService()
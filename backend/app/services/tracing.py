@@ -0,0 +1,425 @@
+"""Request tracing with OpenTelemetry-compatible (OTLP/JSON) span export."""
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+import asyncio
+import json
+import logging
+import random
+import re
+import time
+import httpx
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+# OTLP span kinds and status codes
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+STATUS_UNSET = 0
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+# Spans sent per export request
+EXPORT_BATCH_SIZE = 512
+
+# Longer statements are cut in db.statement
+MAX_STATEMENT_LENGTH = 2000
+
+TRACEPARENT_PATTERN = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+STATEMENT_TABLE_PATTERN = re.compile(r'\b(?:FROM|INTO|UPDATE|TABLE)\s+"?(\w+)', re.IGNORECASE)
+
+
+class Span:
+    """A timed operation within a trace."""
+    
+    __slots__ = (
+        "tracer", "name", "trace_id", "span_id", "parent_id", "kind",
+        "attributes", "start_ns", "end_ns", "status", "status_message",
+    )
+    
+    def __init__(
+        self,
+        tracer: "Tracer",
+        name: str,
+        trace_id: str,
+        parent_id: Optional[str],
+        kind: int,
+        attributes: Optional[Dict[str, Any]] = None
+    ):
+        self.tracer = tracer
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.kind = kind
+        self.attributes = dict(attributes or {})
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.status = STATUS_UNSET
+        self.status_message = ""
+    
+    @property
+    def traceparent(self) -> str:
+        """W3C traceparent header value pointing at this span."""
+        return f"00-{self.trace_id}-{self.span_id}-01"
+    
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+    
+    def set_error(self, message: str) -> None:
+        self.status = STATUS_ERROR
+        self.status_message = message[:500]
+    
+    def end(self) -> None:
+        """Finish the span and queue it for export (only the first call counts)."""
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+            self.tracer._finish(self)
+    
+    def to_otlp(self) -> Dict[str, Any]:
+        """Encode the span as an OTLP/JSON span."""
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or self.start_ns),
+            "attributes": _otlp_attributes(self.attributes),
+            "status": {"code": self.status},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        if self.status_message:
+            span["status"]["message"] = self.status_message
+        return span
+
+
+class _NoopSpan:
+    """Stand-in for spans of unsampled requests; every call does nothing."""
+    
+    traceparent = None
+    
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+    
+    def set_error(self, message: str) -> None:
+        pass
+    
+    def end(self) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+# Span of the current request (or of the DB/HTTP call inside it), None when not sampled
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    """Encode an attribute value as an OTLP AnyValue."""
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items() if value is not None]
+
+
+def parse_traceparent(header: Optional[str]) -> Optional[Tuple[str, str, bool]]:
+    """
+    Parse a W3C traceparent header.
+    
+    Returns:
+        Tuple of (trace ID, parent span ID, sampled flag), or None if absent or invalid
+    """
+    if not header:
+        return None
+    match = TRACEPARENT_PATTERN.match(header.strip().lower())
+    if not match or match.group(1) == "0" * 32 or match.group(2) == "0" * 16:
+        return None
+    return match.group(1), match.group(2), bool(int(match.group(3), 16) & 1)
+
+
+class Tracer:
+    """
+    Create spans for sampled requests and export them in batches.
+    
+    The request middleware decides once per request whether it is traced
+    (following the caller's traceparent sampled flag, otherwise with
+    probability ``sample_rate``). DB and HTTP spans are only created inside a
+    traced request, so unsampled requests cost a context variable lookup per
+    query. Finished spans are buffered (at most ``max_queue``; more are
+    dropped and counted) and written by a background task every
+    ``export_interval`` seconds as OTLP/JSON: appended to ``export_file``
+    one request per line, and/or POSTed to an OTLP/HTTP ``otlp_endpoint``.
+    """
+    
+    def __init__(
+        self,
+        enabled: bool = False,
+        sample_rate: float = 0.05,
+        service_name: str = "portfolio-api",
+        export_file: Optional[str] = None,
+        otlp_endpoint: Optional[str] = None,
+        export_interval: float = 5.0,
+        max_queue: int = 4096
+    ):
+        if enabled and not (export_file or otlp_endpoint):
+            logger.warning("TRACING_ENABLED is set without TRACING_EXPORT_FILE or TRACING_OTLP_ENDPOINT, tracing is off")
+            enabled = False
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+        self.service_name = service_name
+        self.export_file = export_file
+        self.otlp_endpoint = otlp_endpoint
+        self.export_interval = export_interval
+        self.max_queue = max_queue
+        # deque appends are atomic, so spans may finish on threadpool threads too
+        self._queue: Deque[Span] = deque()
+        self._task: Optional[asyncio.Task] = None
+        self.traces_started = 0
+        self.spans_exported = 0
+        self.spans_dropped = 0
+        self.export_errors = 0
+    
+    def start_trace(
+        self,
+        name: str,
+        traceparent: Optional[str] = None,
+        kind: int = SPAN_KIND_SERVER,
+        attributes: Optional[Dict[str, Any]] = None
+    ) -> Optional[Span]:
+        """
+        Start the root span of a request, if the request is sampled.
+        
+        Args:
+            name: Span name
+            traceparent: Incoming W3C traceparent header, continued if valid
+            kind: OTLP span kind
+            attributes: Initial span attributes
+        
+        Returns:
+            The span, or None if the request is not traced
+        """
+        if not self.enabled:
+            return None
+        parent = parse_traceparent(traceparent)
+        if parent is not None:
+            trace_id, parent_id, sampled = parent
+        else:
+            trace_id, parent_id = f"{random.getrandbits(128):032x}", None
+            sampled = random.random() < self.sample_rate
+        if not sampled:
+            return None
+        self.traces_started += 1
+        return Span(self, name, trace_id, parent_id, kind, attributes)
+    
+    def start_span(
+        self,
+        name: str,
+        kind: int = SPAN_KIND_INTERNAL,
+        attributes: Optional[Dict[str, Any]] = None
+    ) -> Optional[Span]:
+        """Start a child of the current span (None outside a traced request)."""
+        parent = _current_span.get()
+        if parent is None:
+            return None
+        return Span(self, name, parent.trace_id, parent.span_id, kind, attributes)
+    
+    @contextmanager
+    def span(
+        self,
+        name: str,
+        kind: int = SPAN_KIND_INTERNAL,
+        attributes: Optional[Dict[str, Any]] = None
+    ) -> Iterator[Any]:
+        """
+        Run the block in a child span of the current span.
+        
+        Yields the span (a no-op stand-in outside a traced request). An
+        exception leaving the block marks the span as failed.
+        """
+        span = self.start_span(name, kind, attributes)
+        if span is None:
+            yield NOOP_SPAN
+            return
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.set_error(f"{type(e).__name__}: {str(e)}")
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end()
+    
+    @staticmethod
+    def activate(span: Span):
+        """Make a span current; returns a token for deactivate()."""
+        return _current_span.set(span)
+    
+    @staticmethod
+    def deactivate(token) -> None:
+        _current_span.reset(token)
+    
+    @staticmethod
+    def current_span() -> Optional[Span]:
+        return _current_span.get()
+    
+    def instrument_engine(self, engine) -> None:
+        """
+        Trace every statement a SQLAlchemy engine runs inside a traced request.
+        
+        Args:
+            engine: Sync Engine (for an AsyncEngine pass ``async_engine.sync_engine``)
+        """
+        from sqlalchemy import event
+        
+        system = engine.dialect.name
+        
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            if _current_span.get() is None:
+                return
+            operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "SQL"
+            table = STATEMENT_TABLE_PATTERN.search(statement)
+            context._trace_span = self.start_span(
+                f"{operation} {table.group(1)}" if table else operation,
+                kind=SPAN_KIND_CLIENT,
+                attributes={
+                    "db.system": system,
+                    "db.operation": operation,
+                    "db.statement": statement[:MAX_STATEMENT_LENGTH],
+                    "db.executemany": executemany or None,
+                },
+            )
+        
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            span = getattr(context, "_trace_span", None)
+            if span is not None:
+                if cursor.rowcount is not None and cursor.rowcount >= 0:
+                    span.set_attribute("db.rows_affected", cursor.rowcount)
+                span.end()
+        
+        def handle_error(exception_context):
+            span = getattr(exception_context.execution_context, "_trace_span", None)
+            if span is not None:
+                span.set_error(str(exception_context.original_exception))
+                span.end()
+        
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", after_cursor_execute)
+        event.listen(engine, "handle_error", handle_error)
+    
+    def _finish(self, span: Span) -> None:
+        if len(self._queue) >= self.max_queue:
+            self.spans_dropped += 1
+            return
+        self._queue.append(span)
+    
+    async def start(self) -> None:
+        """Start the background exporter (called from the app lifespan)."""
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"Tracing started (sample rate {self.sample_rate})")
+    
+    async def stop(self) -> None:
+        """Stop the exporter and export every finished span."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+    
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.export_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Error exporting spans: {str(e)}")
+    
+    async def flush(self) -> None:
+        """Export the buffered spans (file and network I/O run in a thread)."""
+        while self._queue:
+            batch = []
+            while self._queue and len(batch) < EXPORT_BATCH_SIZE:
+                batch.append(self._queue.popleft())
+            payload = self._payload(batch)
+            if await asyncio.to_thread(self._export, payload):
+                self.spans_exported += len(batch)
+            else:
+                self.export_errors += 1
+                self.spans_dropped += len(batch)
+    
+    def _payload(self, spans: List[Span]) -> Dict[str, Any]:
+        """Build an OTLP ExportTraceServiceRequest (JSON encoding)."""
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": _otlp_attributes({"service.name": self.service_name})},
+                "scopeSpans": [{
+                    "scope": {"name": "app.services.tracing"},
+                    "spans": [span.to_otlp() for span in spans],
+                }],
+            }]
+        }
+    
+    def _export(self, payload: Dict[str, Any]) -> bool:
+        """Write one export request to the configured file and/or endpoint."""
+        ok = True
+        body = json.dumps(payload, separators=(",", ":"))
+        if self.export_file:
+            try:
+                with open(self.export_file, "a", encoding="utf-8") as f:
+                    f.write(body + "\n")
+            except OSError as e:
+                logger.error(f"Could not write spans to {self.export_file}: {str(e)}")
+                ok = False
+        if self.otlp_endpoint:
+            try:
+                response = httpx.post(
+                    self.otlp_endpoint,
+                    content=body,
+                    headers={"Content-Type": "application/json"},
+                    timeout=10.0,
+                )
+                response.raise_for_status()
+            except httpx.HTTPError as e:
+                logger.error(f"Could not export spans to {self.otlp_endpoint}: {str(e)}")
+                ok = False
+        return ok
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get sampling and export counters."""
+        return {
+            "enabled": self.enabled,
+            "sample_rate": self.sample_rate,
+            "traces_started": self.traces_started,
+            "queued_spans": len(self._queue),
+            "spans_exported": self.spans_exported,
+            "spans_dropped": self.spans_dropped,
+            "export_errors": self.export_errors,
+        }
+
+
+# Create a global instance
+tracer = Tracer(
+    enabled=settings.tracing_enabled,
+    sample_rate=settings.tracing_sample_rate,
+    service_name=settings.tracing_service_name,
+    export_file=settings.tracing_export_file,
+    otlp_endpoint=settings.tracing_otlp_endpoint,
+    export_interval=settings.tracing_export_interval,
+    max_queue=settings.tracing_max_queue,
+)
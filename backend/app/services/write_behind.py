@@ -0,0 +1,263 @@
+"""Write-behind queue that persists chat turns in batches."""
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+import asyncio
+import logging
+import time
+import uuid
+from ..config import settings
+from ..database import AsyncSessionLocal
+from ..models.db.models import Message
+from .async_database_service import AsyncConversationService
+
+logger = logging.getLogger(__name__)
+
+
+class PendingTurn(NamedTuple):
+    """A chat turn waiting to be written."""
+    conversation_id: str
+    conversation: Optional[Dict[str, Any]]
+    messages: List[Dict[str, Any]]
+    touched_at: datetime
+
+
+class MessageWriter:
+    """
+    Queue chat turns in memory and write them in batches.
+    
+    Turns are written by a background worker every ``flush_interval`` seconds
+    (or as soon as ``batch_size`` turns are waiting), each batch as multi-row
+    INSERTs with one commit. The queue holds at most ``max_queue`` turns;
+    once full, enqueue_turn waits for the worker, so a slow database slows
+    requests down instead of growing memory.
+    
+    Readers call flush_for() first, so a conversation's history always
+    includes its queued turns. Remaining turns are written on shutdown.
+    """
+    
+    def __init__(
+        self,
+        enabled: bool = False,
+        max_queue: int = 1000,
+        batch_size: int = 100,
+        flush_interval: float = 0.05
+    ):
+        self.enabled = enabled and AsyncSessionLocal is not None
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: Optional[asyncio.Queue] = None
+        self._pending: Counter = Counter()
+        self._lock = asyncio.Lock()
+        self._not_empty = asyncio.Event()
+        self._batch_ready = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.batches_written = 0
+        self.turns_written = 0
+        self.turns_dropped = 0
+        self.backpressure_waits = 0
+        self._write_seconds_total = 0.0
+    
+    @property
+    def queue(self) -> asyncio.Queue:
+        """Get the turn queue, created inside the running event loop."""
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+        return self._queue
+    
+    async def start(self) -> None:
+        """Start the background flush worker (called from the app lifespan)."""
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run())
+            logger.info("Write-behind message queue started")
+    
+    async def stop(self) -> None:
+        """Stop the worker and write every queued turn."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._queue is not None and not self._queue.empty():
+            logger.info(f"Draining {self._queue.qsize()} queued turns")
+        await self.flush()
+    
+    async def enqueue_turn(
+        self,
+        conversation_id: str,
+        user_content: str,
+        assistant_content: str,
+        user_created_at: Optional[datetime] = None,
+        tokens_used: Optional[int] = None,
+        model_used: Optional[str] = None,
+        create_conversation: bool = False,
+        user_name: str = "User",
+        prompt_tokens: Optional[int] = None,
+        completion_tokens: Optional[int] = None,
+        latency_ms: Optional[int] = None,
+        finish_reason: Optional[str] = None,
+    ) -> Tuple[Message, Message]:
+        """
+        Queue a turn for writing (same arguments as ConversationService.add_turn).
+        
+        Returns:
+            Tuple of (user, assistant) Message objects with their final IDs;
+            they are not attached to a session
+        """
+        now = datetime.utcnow()
+        user_created_at = user_created_at or now
+        
+        conversation = None
+        if create_conversation:
+            conversation = {
+                "id": conversation_id,
+                "user_name": user_name,
+                "title": f"Conversation with {user_name}",
+                "created_at": user_created_at,
+                "updated_at": now,
+                "is_active": "active",
+            }
+        
+        rows = [
+            {
+                "id": str(uuid.uuid4()),
+                "conversation_id": conversation_id,
+                "role": "user",
+                "content": user_content,
+                "tokens_used": None,
+                "model_used": None,
+                "prompt_tokens": None,
+                "completion_tokens": None,
+                "latency_ms": None,
+                "finish_reason": None,
+                "created_at": user_created_at,
+                "updated_at": user_created_at,
+                "is_deleted": "false",
+            },
+            {
+                "id": str(uuid.uuid4()),
+                "conversation_id": conversation_id,
+                "role": "assistant",
+                "content": assistant_content,
+                "tokens_used": tokens_used,
+                "model_used": model_used,
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "latency_ms": latency_ms,
+                "finish_reason": finish_reason,
+                "created_at": now,
+                "updated_at": now,
+                "is_deleted": "false",
+            },
+        ]
+        
+        queue = self.queue
+        if queue.full():
+            self.backpressure_waits += 1
+            self._batch_ready.set()
+        self._pending[conversation_id] += 1
+        try:
+            await queue.put(PendingTurn(conversation_id, conversation, rows, now))
+        except BaseException:
+            self._release([conversation_id])
+            raise
+        
+        self._not_empty.set()
+        if queue.qsize() >= self.batch_size:
+            self._batch_ready.set()
+        
+        return Message(**rows[0]), Message(**rows[1])
+    
+    async def flush_for(self, conversation_id: str) -> None:
+        """Write queued turns first if any belong to this conversation."""
+        if self._pending.get(conversation_id):
+            await self.flush()
+    
+    async def flush(self) -> None:
+        """Write every queued turn now."""
+        if self._queue is None:
+            return
+        async with self._lock:
+            while not self._queue.empty():
+                count = min(self.batch_size, self._queue.qsize())
+                batch = [self._queue.get_nowait() for _ in range(count)]
+                started = time.perf_counter()
+                try:
+                    await self._write(batch)
+                finally:
+                    self._write_seconds_total += time.perf_counter() - started
+                    self._release([turn.conversation_id for turn in batch])
+            self._not_empty.clear()
+            self._batch_ready.clear()
+    
+    async def _run(self) -> None:
+        """Flush whenever turns are waiting, batching those that arrive together."""
+        while True:
+            await self._not_empty.wait()
+            try:
+                await asyncio.wait_for(self._batch_ready.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Write-behind flush failed: {str(e)}")
+    
+    async def _write(self, batch: List[PendingTurn]) -> None:
+        """Write a batch in one transaction, falling back to one turn at a time."""
+        try:
+            await self._save(batch)
+            self.batches_written += 1
+            self.turns_written += len(batch)
+        except Exception as e:
+            if len(batch) == 1:
+                self.turns_dropped += 1
+                logger.error(f"Dropped queued turn for conversation {batch[0].conversation_id}: {str(e)}")
+                return
+            logger.warning(f"Batch of {len(batch)} turns failed, writing them one by one: {str(e)}")
+            for turn in batch:
+                await self._write([turn])
+    
+    async def _save(self, batch: List[PendingTurn]) -> None:
+        """Insert the rows of a batch with a single commit."""
+        conversations = [turn.conversation for turn in batch if turn.conversation]
+        messages = [row for turn in batch for row in turn.messages]
+        touched: Dict[str, datetime] = {}
+        for turn in batch:
+            touched[turn.conversation_id] = max(turn.touched_at, touched.get(turn.conversation_id, turn.touched_at))
+        
+        async with AsyncSessionLocal() as db:
+            await AsyncConversationService.save_batch(db, conversations, messages, touched)
+    
+    def _release(self, conversation_ids: List[str]) -> None:
+        """Mark turns as no longer pending."""
+        for conversation_id in conversation_ids:
+            self._pending[conversation_id] -= 1
+            if self._pending[conversation_id] <= 0:
+                del self._pending[conversation_id]
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get queue depth and write counters."""
+        return {
+            "enabled": self.enabled,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "max_queue": self.max_queue,
+            "batches_written": self.batches_written,
+            "turns_written": self.turns_written,
+            "turns_dropped": self.turns_dropped,
+            "backpressure_waits": self.backpressure_waits,
+            "avg_batch_size": round(self.turns_written / self.batches_written, 2) if self.batches_written else 0.0,
+            "write_ms_total": round(self._write_seconds_total * 1000, 3),
+        }
+
+
+# Create a global instance
+message_writer = MessageWriter(
+    enabled=settings.message_write_behind,
+    max_queue=settings.write_behind_max_queue,
+    batch_size=settings.write_behind_batch_size,
+    flush_interval=settings.write_behind_flush_interval,
+)
@@ -0,0 +1,181 @@
+"""
+Local stand-in for the OpenRouter chat completions API.
+
+Serves POST /chat/completions (streaming and non-streaming) with configurable
+latency, token rate and error injection, so the backend can be benchmarked
+without network access or API costs. Point the backend at it with
+OPENROUTER_API_URL=http://127.0.0.1:<port>/chat/completions.
+
+Usage:
+    python benchmarks/fake_openrouter.py --port 9000 --latency 0.3 --tokens-per-second 80
+"""
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import AsyncIterator, Dict, Optional
+import asyncio
+import hashlib
+import json
+import random
+
+
+class FakeOpenRouterStats:
+    """Counters for requests served by the stand-in."""
+    
+    def __init__(self):
+        self.requests = 0
+        self.streamed = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+    
+    def as_dict(self) -> Dict[str, int]:
+        return {
+            "requests": self.requests,
+            "streamed": self.streamed,
+            "errors": self.errors,
+            "peak_in_flight": self.peak_in_flight,
+        }
+
+
+def create_fake_openrouter(
+    latency: float = 0.2,
+    jitter: float = 0.05,
+    tokens_per_second: float = 200.0,
+    reply_tokens: int = 60,
+    error_rate: float = 0.0,
+    error_status: int = 500,
+    seed: Optional[int] = None
+) -> FastAPI:
+    """
+    Create the stand-in app.
+    
+    Args:
+        latency: Seconds before the first token
+        jitter: Uniform random +/- seconds added to the latency
+        tokens_per_second: Generation speed after the first token
+        reply_tokens: Tokens (words) per reply
+        error_rate: Share of requests answered with error_status
+        error_status: Status code of injected errors (e.g. 429, 500, 503)
+        seed: Random seed for reproducible runs
+    
+    Returns:
+        FastAPI app; its counters are on ``app.state.stats``
+    """
+    app = FastAPI(title="Fake OpenRouter")
+    app.state.stats = FakeOpenRouterStats()
+    rng = random.Random(seed)
+    
+    def first_token_delay() -> float:
+        return max(0.0, latency + rng.uniform(-jitter, jitter))
+    
+    def reply_words(messages) -> list:
+        # Vary the reply with the question so response caches behave as in production
+        question = messages[-1]["content"] if messages else ""
+        tag = hashlib.sha1(question.encode("utf-8")).hexdigest()[:8]
+        return [f"{tag}-{i}" for i in range(reply_tokens)]
+    
+    def usage(messages) -> Dict[str, int]:
+        prompt_tokens = sum(len(m.get("content", "")) for m in messages) // 4
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": reply_tokens,
+            "total_tokens": prompt_tokens + reply_tokens,
+        }
+    
+    @app.get("/stats")
+    async def stats():
+        return app.state.stats.as_dict()
+    
+    @app.post("/chat/completions")
+    @app.post("/api/v1/chat/completions")
+    async def chat_completions(request: Request):
+        stats = app.state.stats
+        payload = await request.json()
+        messages = payload.get("messages", [])
+        model = payload.get("model", "fake/model")
+        stats.requests += 1
+        
+        if error_rate and rng.random() < error_rate:
+            stats.errors += 1
+            await asyncio.sleep(first_token_delay())
+            return JSONResponse(
+                {"error": {"message": "Injected error", "code": error_status}},
+                status_code=error_status,
+            )
+        
+        words = reply_words(messages)
+        
+        if payload.get("stream"):
+            stats.streamed += 1
+            
+            async def events() -> AsyncIterator[str]:
+                stats.in_flight += 1
+                stats.peak_in_flight = max(stats.peak_in_flight, stats.in_flight)
+                try:
+                    await asyncio.sleep(first_token_delay())
+                    for index, word in enumerate(words):
+                        if index:
+                            await asyncio.sleep(1 / tokens_per_second)
+                        chunk = {"model": model, "choices": [{"index": 0, "delta": {"content": word + " "}}]}
+                        yield f"data: {json.dumps(chunk)}\n\n"
+                    final = {
+                        "model": model,
+                        "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+                        "usage": usage(messages),
+                    }
+                    yield f"data: {json.dumps(final)}\n\n"
+                    yield "data: [DONE]\n\n"
+                finally:
+                    stats.in_flight -= 1
+            
+            return StreamingResponse(events(), media_type="text/event-stream")
+        
+        stats.in_flight += 1
+        stats.peak_in_flight = max(stats.peak_in_flight, stats.in_flight)
+        try:
+            await asyncio.sleep(first_token_delay() + len(words) / tokens_per_second)
+        finally:
+            stats.in_flight -= 1
+        
+        return {
+            "id": "fake-" + hashlib.sha1(json.dumps(messages).encode("utf-8")).hexdigest()[:12],
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": " ".join(words)},
+                "finish_reason": "stop",
+            }],
+            "usage": usage(messages),
+        }
+    
+    return app
+
+
+if __name__ == "__main__":
+    import argparse
+    import uvicorn
+    
+    parser = argparse.ArgumentParser(description="Local OpenRouter stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds before the first token")
+    parser.add_argument("--jitter", type=float, default=0.05)
+    parser.add_argument("--tokens-per-second", type=float, default=200.0)
+    parser.add_argument("--reply-tokens", type=int, default=60)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=500)
+    args = parser.parse_args()
+    
+    uvicorn.run(
+        create_fake_openrouter(
+            latency=args.latency,
+            jitter=args.jitter,
+            tokens_per_second=args.tokens_per_second,
+            reply_tokens=args.reply_tokens,
+            error_rate=args.error_rate,
+            error_status=args.error_status,
+        ),
+        host=args.host,
+        port=args.port,
+        log_level="warning",
+    )
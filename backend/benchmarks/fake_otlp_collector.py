@@ -0,0 +1,95 @@
+"""
+Local stand-in for an OpenTelemetry collector's OTLP/HTTP JSON receiver.
+
+Accepts POST /v1/traces as sent with TRACING_OTLP_ENDPOINT, optionally appends
+each export request to a file, and prints the slowest traces on GET /traces,
+so the spans of a load test can be inspected without running a collector.
+
+Usage:
+    python benchmarks/fake_otlp_collector.py --port 4318 --output spans.jsonl
+    TRACING_ENABLED=true TRACING_OTLP_ENDPOINT=http://127.0.0.1:4318/v1/traces uvicorn app.main:app
+"""
+from collections import defaultdict
+from fastapi import FastAPI, Request
+from typing import Any, Dict, List, Optional
+import json
+
+
+def create_fake_collector(output: Optional[str] = None, max_spans: int = 100_000) -> FastAPI:
+    """
+    Create the stand-in app.
+    
+    Args:
+        output: File to append each export request to (one JSON document per line)
+        max_spans: Spans kept in memory for /traces; older ones are discarded
+    
+    Returns:
+        FastAPI app; received spans are on ``app.state.spans``
+    """
+    app = FastAPI(title="Fake OTLP collector")
+    app.state.spans = []
+    app.state.requests = 0
+    
+    @app.post("/v1/traces")
+    async def receive_traces(request: Request):
+        body = await request.body()
+        payload = json.loads(body)
+        app.state.requests += 1
+        if output:
+            with open(output, "a", encoding="utf-8") as f:
+                f.write(body.decode("utf-8") + "\n")
+        for resource_spans in payload.get("resourceSpans", []):
+            for scope_spans in resource_spans.get("scopeSpans", []):
+                app.state.spans.extend(scope_spans.get("spans", []))
+        del app.state.spans[:-max_spans]
+        # OTLP ExportTraceServiceResponse; an empty object means everything was accepted
+        return {}
+    
+    @app.get("/traces")
+    async def traces(limit: int = 10) -> List[Dict[str, Any]]:
+        """Summarize the slowest traces: root span, duration and time per span name."""
+        by_trace = defaultdict(list)
+        for span in app.state.spans:
+            by_trace[span["traceId"]].append(span)
+        
+        summaries = []
+        for trace_id, spans in by_trace.items():
+            ids = {span["spanId"] for span in spans}
+            roots = [span for span in spans if span.get("parentSpanId") not in ids]
+            root = min(roots, key=lambda span: int(span["startTimeUnixNano"]))
+            breakdown = defaultdict(float)
+            for span in spans:
+                if span is not root:
+                    breakdown[span["name"]] += _duration_ms(span)
+            summaries.append({
+                "trace_id": trace_id,
+                "root": root["name"],
+                "duration_ms": round(_duration_ms(root), 3),
+                "spans": len(spans),
+                "breakdown_ms": {name: round(ms, 3) for name, ms in sorted(breakdown.items(), key=lambda x: -x[1])},
+            })
+        summaries.sort(key=lambda summary: -summary["duration_ms"])
+        return summaries[:limit]
+    
+    @app.get("/stats")
+    async def stats():
+        return {"requests": app.state.requests, "spans": len(app.state.spans)}
+    
+    return app
+
+
+def _duration_ms(span: Dict[str, Any]) -> float:
+    return (int(span["endTimeUnixNano"]) - int(span["startTimeUnixNano"])) / 1e6
+
+
+if __name__ == "__main__":
+    import argparse
+    import uvicorn
+    
+    parser = argparse.ArgumentParser(description="Local OTLP/HTTP JSON collector stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=4318)
+    parser.add_argument("--output", help="Append received export requests to this file")
+    args = parser.parse_args()
+    
+    uvicorn.run(create_fake_collector(output=args.output), host=args.host, port=args.port, log_level="warning")
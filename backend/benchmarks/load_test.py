@@ -0,0 +1,418 @@
+"""
+Load test and benchmark for the chat endpoints.
+
+Boots the backend from create_app() against a local OpenRouter stand-in
+(benchmarks/fake_openrouter.py), drives concurrent scripted conversations
+through the chat endpoints and reports throughput, p50/p95/p99 latency and
+where database time went. Results can be saved as a named baseline and later
+runs compared against it, so regressions show up as numbers.
+
+Usage (from backend/):
+    python benchmarks/load_test.py --users 50 --turns 5
+    python benchmarks/load_test.py --users 50 --turns 5 --save-baseline main
+    python benchmarks/load_test.py --users 50 --turns 5 --compare main
+
+Each virtual user runs one scenario:
+    chat     POST /api/v1/chat/message with client-side history
+    history  POST /api/v1/conversations/message-with-history
+    stream   POST /api/v1/conversations/message-with-history/stream
+"""
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import argparse
+import asyncio
+import json
+import logging
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+BASELINE_DIR = Path(__file__).parent / "baselines"
+
+SCENARIOS = ("chat", "history", "stream")
+
+QUESTIONS = [
+    "What are your main technical skills?",
+    "Tell me about a project you are proud of.",
+    "Which frontend frameworks have you used?",
+    "How do you approach testing?",
+    "What databases have you worked with?",
+    "Describe your experience with cloud deployments.",
+]
+
+
+def free_port() -> int:
+    """Get a free TCP port on localhost."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(app, port: int):
+    """
+    Run an ASGI app with uvicorn in a background thread.
+    
+    Returns:
+        The uvicorn Server (set ``should_exit`` to stop it)
+    """
+    import uvicorn
+    
+    config = uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", lifespan="on")
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise RuntimeError(f"Server on port {port} failed to start")
+        time.sleep(0.01)
+    server.thread = thread
+    return server
+
+
+class DatabaseTimer:
+    """Accumulate time spent executing SQL statements, by statement type."""
+    
+    def __init__(self, engine):
+        from sqlalchemy import event
+        
+        self._lock = threading.Lock()
+        self.statements: Dict[str, Dict[str, float]] = {}
+        event.listen(engine, "before_cursor_execute", self._before)
+        event.listen(engine, "after_cursor_execute", self._after)
+    
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("benchmark_started", []).append(time.perf_counter())
+    
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["benchmark_started"].pop()
+        verb = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "OTHER"
+        with self._lock:
+            stats = self.statements.setdefault(verb, {"count": 0, "seconds": 0.0})
+            stats["count"] += 1
+            stats["seconds"] += elapsed
+    
+    def summary(self, requests: int) -> Dict[str, Any]:
+        """Get statement counts and times, in total and per request."""
+        with self._lock:
+            statements = {verb: dict(stats) for verb, stats in self.statements.items()}
+        total = sum(stats["seconds"] for stats in statements.values())
+        return {
+            "total_ms": round(total * 1000, 1),
+            "per_request_ms": round(total * 1000 / requests, 3) if requests else 0.0,
+            "statements": {
+                verb: {"count": int(stats["count"]), "ms": round(stats["seconds"] * 1000, 1)}
+                for verb, stats in sorted(statements.items())
+            },
+        }
+
+
+class Recorder:
+    """Collect per-request results."""
+    
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.first_byte: Dict[str, List[float]] = {}
+        self.errors: Dict[str, Dict[str, int]] = {}
+    
+    def record(self, endpoint: str, latency: float, status: Optional[str] = None, first_byte: Optional[float] = None):
+        if status is None:
+            self.latencies.setdefault(endpoint, []).append(latency)
+            if first_byte is not None:
+                self.first_byte.setdefault(endpoint, []).append(first_byte)
+        else:
+            errors = self.errors.setdefault(endpoint, {})
+            errors[status] = errors.get(status, 0) + 1
+    
+    def summary(self, elapsed: float) -> Dict[str, Any]:
+        from app.services.model_router import percentile
+        
+        def ms(value: Optional[float]) -> Optional[float]:
+            return round(value * 1000, 1) if value is not None else None
+        
+        endpoints = {}
+        for endpoint in sorted(set(self.latencies) | set(self.errors)):
+            values = self.latencies.get(endpoint, [])
+            stats = {
+                "requests": len(values) + sum(self.errors.get(endpoint, {}).values()),
+                "ok": len(values),
+                "errors": self.errors.get(endpoint, {}),
+                "throughput_rps": round(len(values) / elapsed, 2) if elapsed else 0.0,
+                "mean_ms": ms(sum(values) / len(values)) if values else None,
+                "p50_ms": ms(percentile(values, 50)),
+                "p95_ms": ms(percentile(values, 95)),
+                "p99_ms": ms(percentile(values, 99)),
+            }
+            if endpoint in self.first_byte:
+                stats["first_token_p50_ms"] = ms(percentile(self.first_byte[endpoint], 50))
+                stats["first_token_p95_ms"] = ms(percentile(self.first_byte[endpoint], 95))
+            endpoints[endpoint] = stats
+        
+        ok = sum(len(values) for values in self.latencies.values())
+        failed = sum(sum(errors.values()) for errors in self.errors.values())
+        return {
+            "elapsed_s": round(elapsed, 3),
+            "requests": ok + failed,
+            "ok": ok,
+            "failed": failed,
+            "throughput_rps": round(ok / elapsed, 2) if elapsed else 0.0,
+            "endpoints": endpoints,
+        }
+
+
+async def run_user(client, recorder: Recorder, user: int, scenario: str, turns: int) -> None:
+    """Run one scripted conversation."""
+    user_name = f"bench-user-{user}"
+    conversation_id = None
+    history: List[Dict[str, str]] = []
+    
+    for turn in range(turns):
+        # Unique questions so response caches do not hide the upstream call
+        question = f"{QUESTIONS[(user + turn) % len(QUESTIONS)]} (user {user}, turn {turn})"
+        started = time.perf_counter()
+        try:
+            if scenario == "chat":
+                endpoint = "POST /api/v1/chat/message"
+                response = await client.post(
+                    "/api/v1/chat/message",
+                    json={"message": question, "user_name": user_name, "conversation_history": history},
+                )
+                if response.status_code != 200:
+                    recorder.record(endpoint, 0.0, str(response.status_code))
+                    continue
+                history += [
+                    {"role": "user", "content": question},
+                    {"role": "assistant", "content": response.json()["message"]},
+                ]
+                recorder.record(endpoint, time.perf_counter() - started)
+            
+            elif scenario == "history":
+                endpoint = "POST /api/v1/conversations/message-with-history"
+                response = await client.post(
+                    "/api/v1/conversations/message-with-history",
+                    json={"message": question, "user_name": user_name, "conversation_id": conversation_id},
+                )
+                if response.status_code != 200:
+                    recorder.record(endpoint, 0.0, str(response.status_code))
+                    continue
+                conversation_id = response.json()["conversation_id"]
+                recorder.record(endpoint, time.perf_counter() - started)
+            
+            else:
+                endpoint = "POST /api/v1/conversations/message-with-history/stream"
+                first_byte = None
+                event = None
+                done = None
+                async with client.stream(
+                    "POST",
+                    "/api/v1/conversations/message-with-history/stream",
+                    json={"message": question, "user_name": user_name, "conversation_id": conversation_id},
+                ) as response:
+                    if response.status_code != 200:
+                        recorder.record(endpoint, 0.0, str(response.status_code))
+                        continue
+                    async for line in response.aiter_lines():
+                        if line.startswith("event:"):
+                            event = line[len("event:"):].strip()
+                        elif line.startswith("data:"):
+                            if first_byte is None:
+                                first_byte = time.perf_counter() - started
+                            if event in ("done", "error"):
+                                done = (event, json.loads(line[len("data:"):]))
+                            event = None
+                if done is None or done[0] == "error":
+                    recorder.record(endpoint, 0.0, "stream_error")
+                    continue
+                conversation_id = done[1]["conversation_id"]
+                recorder.record(endpoint, time.perf_counter() - started, first_byte=first_byte)
+        
+        except Exception as e:
+            recorder.record(endpoint, 0.0, type(e).__name__)
+
+
+async def drive(base_url: str, users: int, turns: int, scenario: str, timeout: float) -> Dict[str, Any]:
+    """Run all virtual users concurrently and summarize the results."""
+    import httpx
+    
+    recorder = Recorder()
+    limits = httpx.Limits(max_connections=users, max_keepalive_connections=users)
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            run_user(client, recorder, user, SCENARIOS[user % len(SCENARIOS)] if scenario == "mixed" else scenario, turns)
+            for user in range(users)
+        ))
+        elapsed = time.perf_counter() - started
+    return recorder.summary(elapsed)
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """
+    Compare results with a baseline.
+    
+    Args:
+        results: Results of this run
+        baseline: Saved results
+        tolerance: Allowed relative change before a metric counts as regressed
+    
+    Returns:
+        Descriptions of the metrics that regressed
+    """
+    regressions = []
+    
+    def check(label: str, current, previous, higher_is_better: bool = False):
+        if current is None or not previous:
+            return
+        change = (current - previous) / previous
+        worse = -change if higher_is_better else change
+        flag = "REGRESSION" if worse > tolerance else ""
+        print(f"  {label:70} {previous:10.1f} -> {current:10.1f} ({change:+.1%}) {flag}")
+        if flag:
+            regressions.append(f"{label} {change:+.1%}")
+    
+    print(f"\nComparison with baseline (tolerance {tolerance:.0%}):")
+    check("throughput_rps", results["throughput_rps"], baseline["results"]["throughput_rps"], higher_is_better=True)
+    for endpoint, stats in results["endpoints"].items():
+        previous = baseline["results"]["endpoints"].get(endpoint)
+        if previous is None:
+            continue
+        for metric in ("p50_ms", "p95_ms", "p99_ms"):
+            check(f"{endpoint} {metric}", stats[metric], previous.get(metric))
+    check("db per_request_ms", results["db"]["per_request_ms"], baseline["results"]["db"]["per_request_ms"])
+    return regressions
+
+
+def print_report(results: Dict[str, Any]) -> None:
+    """Print a human-readable summary."""
+    print("\n=== Load Test Results ===\n")
+    print(
+        f"{results['requests']} requests in {results['elapsed_s']:.2f}s | "
+        f"{results['throughput_rps']:.1f} req/s | {results['failed']} failed\n"
+    )
+    for endpoint, stats in results["endpoints"].items():
+        print(endpoint)
+        print(
+            f"  ok={stats['ok']} errors={stats['errors'] or 0} rps={stats['throughput_rps']} | "
+            f"p50={stats['p50_ms']}ms p95={stats['p95_ms']}ms p99={stats['p99_ms']}ms mean={stats['mean_ms']}ms"
+        )
+        if "first_token_p50_ms" in stats:
+            print(f"  first token p50={stats['first_token_p50_ms']}ms p95={stats['first_token_p95_ms']}ms")
+    
+    db = results["db"]
+    print(f"\nDatabase: {db['total_ms']}ms total, {db['per_request_ms']}ms per request")
+    for verb, stats in db["statements"].items():
+        print(f"  {verb:10} {stats['count']:6} statements {stats['ms']:10.1f}ms")
+    print(f"\nUpstream (fake OpenRouter): {results['upstream']}")
+    print("\n" + "="*60)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Load test the chat endpoints against a local OpenRouter stand-in")
+    parser.add_argument("--users", type=int, default=20, help="Concurrent virtual users")
+    parser.add_argument("--turns", type=int, default=5, help="Messages per user")
+    parser.add_argument("--scenario", choices=("mixed", *SCENARIOS), default="mixed")
+    parser.add_argument("--latency", type=float, default=0.2, help="Fake upstream seconds before the first token")
+    parser.add_argument("--jitter", type=float, default=0.05)
+    parser.add_argument("--tokens-per-second", type=float, default=200.0)
+    parser.add_argument("--reply-tokens", type=int, default=60)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of upstream calls that fail")
+    parser.add_argument("--error-status", type=int, default=500)
+    parser.add_argument("--database-url", help="Database to use (default: a fresh temporary SQLite file)")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Client timeout per request")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--save-baseline", metavar="NAME", help="Save results to benchmarks/baselines/NAME.json")
+    parser.add_argument("--compare", metavar="NAME", help="Compare with a saved baseline (exit 1 on regression)")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed relative regression")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+    
+    from fake_openrouter import create_fake_openrouter
+    
+    fake_port = free_port()
+    fake_app = create_fake_openrouter(
+        latency=args.latency,
+        jitter=args.jitter,
+        tokens_per_second=args.tokens_per_second,
+        reply_tokens=args.reply_tokens,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        seed=args.seed,
+    )
+    fake_server = start_server(fake_app, fake_port)
+    
+    # Settings are read at import time, so configure the app before importing it
+    temp_dir = None
+    if not args.database_url:
+        temp_dir = tempfile.TemporaryDirectory()
+        args.database_url = f"sqlite:///{temp_dir.name}/benchmark.db"
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ["OPENROUTER_API_KEY"] = "benchmark"
+    os.environ["OPENROUTER_API_URL"] = f"http://127.0.0.1:{fake_port}/chat/completions"
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+    
+    from app.main import create_app
+    from app.database import async_engine
+    
+    app = create_app()
+    logging.getLogger().setLevel(logging.WARNING)
+    
+    db_timer = DatabaseTimer(async_engine.sync_engine)
+    app_port = free_port()
+    app_server = start_server(app, app_port)
+    
+    try:
+        results = asyncio.run(drive(f"http://127.0.0.1:{app_port}", args.users, args.turns, args.scenario, args.timeout))
+        results["db"] = db_timer.summary(results["ok"])
+        results["upstream"] = fake_app.state.stats.as_dict()
+    finally:
+        app_server.should_exit = True
+        fake_server.should_exit = True
+        app_server.thread.join(timeout=10)
+        fake_server.thread.join(timeout=10)
+        if temp_dir is not None:
+            temp_dir.cleanup()
+    
+    run = {
+        "config": {
+            key: getattr(args, key)
+            for key in ("users", "turns", "scenario", "latency", "jitter", "tokens_per_second",
+                        "reply_tokens", "error_rate", "error_status", "seed")
+        },
+        "database": async_engine.dialect.name,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results,
+    }
+    
+    if args.json:
+        print(json.dumps(run, indent=2))
+    else:
+        print_report(results)
+    
+    if args.save_baseline:
+        BASELINE_DIR.mkdir(exist_ok=True)
+        path = BASELINE_DIR / f"{args.save_baseline}.json"
+        path.write_text(json.dumps(run, indent=2))
+        print(f"✅ Baseline saved to {path}")
+    
+    if args.compare:
+        path = BASELINE_DIR / f"{args.compare}.json"
+        baseline = json.loads(path.read_text())
+        if baseline["config"] != run["config"]:
+            print(f"⚠️  Baseline was recorded with different options: {baseline['config']}")
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n❌ {len(regressions)} metrics regressed")
+            return 1
+        print("\n✅ No regressions")
+    
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""
+Regression check for resume retrieval against the real resume.
+
+Reads the resume from update_resume.py (at the repo root), splits it the way
+the prompt cache does and checks that the sections come out right, that
+retrieval is on for it at the default settings, and that typical questions
+get the chunks they should. Prints the prompt size per question.
+
+Usage (from backend/):
+    python benchmarks/resume_retrieval_check.py
+    python benchmarks/resume_retrieval_check.py --resume-script ../update_resume.py
+
+Exits with status 1 if a check fails.
+"""
+from pathlib import Path
+from typing import List, Tuple
+import argparse
+import ast
+import sys
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+RESUME_SCRIPT = Path(__file__).parent.parent.parent / "update_resume.py"
+
+EXPECTED_SECTIONS = [
+    "",
+    "PROFESSIONAL SUMMARY",
+    "EDUCATION",
+    "TECHNICAL SKILLS",
+    "WORK EXPERIENCE",
+    "PROJECTS",
+    "ACHIEVEMENTS",
+    "LANGUAGES & SOFT SKILLS",
+]
+
+# (question, section every retrieved chunk must be in, text that must be retrieved)
+QUESTIONS: List[Tuple[str, str, List[str]]] = [
+    ("Where did you study?", "EDUCATION", ["Shiv Nadar University", "Bansal Public School", "St. Mary’s Convent School"]),
+    ("What was your CGPA?", "EDUCATION", ["CGPA: 7.53/10.0"]),
+    ("Tell me about your internship", "WORK EXPERIENCE", ["Artigence Healthcare"]),
+    ("What did you build with Razorpay?", "PROJECTS", ["Razorpay"]),
+]
+
+
+def load_resume(script: Path) -> str:
+    """Get YOUR_RESUME from the update script without running it."""
+    tree = ast.parse(script.read_text(encoding="utf-8"))
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(getattr(t, "id", None) == "YOUR_RESUME" for t in node.targets):
+            # The script sends the stripped text
+            return ast.literal_eval(node.value).strip()
+    raise ValueError(f"No YOUR_RESUME in {script}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Check resume retrieval on the update_resume.py resume")
+    parser.add_argument("--resume-script", type=Path, default=RESUME_SCRIPT)
+    args = parser.parse_args()
+    
+    from app.config import settings
+    from app.services.context_window import estimate_tokens
+    from app.services.prompt_cache import SystemPromptCache
+    from app.services.resume_retriever import ResumeIndex
+    
+    resume = load_resume(args.resume_script)
+    failures: List[str] = []
+    
+    tokens = estimate_tokens(resume)
+    print(f"Resume: ~{tokens} tokens (retrieval from {settings.resume_retrieval_min_tokens})")
+    cache = SystemPromptCache()
+    if cache.get(resume).index is None:
+        failures.append("retrieval is off for this resume")
+    
+    index = ResumeIndex(resume)
+    sections = list(dict.fromkeys(chunk.section for chunk in index.chunks))
+    print(f"Chunks: {len(index.chunks)}, sections: {sections}")
+    if sections != EXPECTED_SECTIONS:
+        failures.append(f"sections {sections} != {EXPECTED_SECTIONS}")
+    
+    full_prompt = len(cache.get(resume).prompt)
+    for question, section, expected in QUESTIONS:
+        chunk_ids = index.search(question, settings.resume_retrieval_top_k)
+        excerpt = index.render(chunk_ids)
+        prompt = len(cache.system_message(resume, question)["content"])
+        print(f"{question!r}: chunks {chunk_ids}, prompt {prompt} of {full_prompt} chars")
+        wrong = [index.chunks[i].section for i in chunk_ids if index.chunks[i].section != section]
+        if wrong:
+            failures.append(f"{question!r} retrieved chunks from {wrong}")
+        missing = [text for text in expected if text not in excerpt]
+        if missing:
+            failures.append(f"{question!r} did not retrieve {missing}")
+    
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    print("OK" if not failures else f"{len(failures)} check(s) failed")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,286 @@
+"""
+Micro-benchmark for ConversationService and ResumeService at scale.
+
+For each dataset size the database is seeded (benchmarks/seed_data.py) and
+every service method is timed over repeated calls, each with a fresh session
+as in a request. The SQL each method runs is captured and its query plan
+(EXPLAIN QUERY PLAN on SQLite, EXPLAIN on PostgreSQL) printed under the
+timings, so the effect of index and query changes can be checked directly.
+
+Usage (from backend/):
+    python benchmarks/service_bench.py --sizes 1000x100000,10000x1000000
+    python benchmarks/service_bench.py --sizes 10000x10000000 --database-url postgresql://... --analyze
+
+SQLite databases are kept in benchmarks/data/ and only reseeded when their
+size does not match (or with --reseed); a PostgreSQL database is reseeded
+for every size.
+"""
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+DATA_DIR = Path(__file__).parent / "data"
+
+RESUME_TEXT = "PROFESSIONAL SUMMARY\nBenchmark resume.\n" * 20
+
+# Statements worth a query plan (inserts and transaction control are not)
+EXPLAINED_STATEMENTS = ("SELECT", "UPDATE", "DELETE")
+
+
+def parse_sizes(value: str) -> List[Tuple[int, int]]:
+    """Parse "CONVERSATIONSxMESSAGES,..." into (conversations, messages) tuples."""
+    sizes = []
+    for size in value.split(","):
+        conversations, messages = size.lower().split("x")
+        sizes.append((int(conversations), int(messages)))
+    return sizes
+
+
+class StatementCapture:
+    """Record the statements an engine executes while enabled."""
+    
+    def __init__(self, engine):
+        from sqlalchemy import event
+        
+        self.enabled = False
+        self.statements: List[Tuple[str, Any]] = []
+        event.listen(engine, "before_cursor_execute", self._record)
+    
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        if self.enabled and not executemany:
+            self.statements.append((statement, parameters))
+
+
+def explain(engine, statement: str, parameters, analyze: bool = False) -> List[str]:
+    """
+    Get the query plan of a captured statement.
+    
+    Args:
+        engine: Engine the statement ran on
+        statement: SQL in the driver's paramstyle
+        parameters: Parameters as passed to the driver
+        analyze: Run EXPLAIN (ANALYZE, BUFFERS) on PostgreSQL (rolled back)
+    
+    Returns:
+        Plan lines
+    """
+    dialect = engine.dialect.name
+    if dialect == "sqlite":
+        prefix = "EXPLAIN QUERY PLAN "
+    elif dialect == "postgresql":
+        prefix = "EXPLAIN (ANALYZE, BUFFERS) " if analyze else "EXPLAIN "
+    else:
+        return []
+    
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql(prefix + statement, parameters).fetchall()
+        conn.rollback()
+    
+    if dialect == "sqlite":
+        # Rows are (id, parent, notused, detail); indent children under parents
+        depth = {0: 0}
+        lines = []
+        for node_id, parent, _, detail in rows:
+            depth[node_id] = depth.get(parent, 0) + 1
+            lines.append("  " * (depth[node_id] - 1) + detail)
+        return lines
+    return [row[0] for row in rows]
+
+
+def time_case(
+    session_factory,
+    capture: StatementCapture,
+    call: Callable,
+    repeat: int
+) -> Tuple[Dict[str, float], List[Tuple[str, Any]]]:
+    """
+    Time repeated calls, each with its own session.
+    
+    Returns:
+        Tuple of (timing stats in ms, statements run by the first call)
+    """
+    from app.services.model_router import percentile
+    
+    timings = []
+    statements = []
+    for attempt in range(repeat):
+        capture.enabled = attempt == 0
+        capture.statements = []
+        with session_factory() as db:
+            started = time.perf_counter()
+            call(db)
+            timings.append(time.perf_counter() - started)
+        if attempt == 0:
+            statements = capture.statements
+    capture.enabled = False
+    
+    return {
+        "min_ms": round(min(timings) * 1000, 3),
+        "p50_ms": round(percentile(timings, 50) * 1000, 3),
+        "p95_ms": round(percentile(timings, 95) * 1000, 3),
+        "mean_ms": round(sum(timings) / len(timings) * 1000, 3),
+    }, statements
+
+
+def pick_targets(engine) -> Dict[str, Any]:
+    """Find the busiest and a median user, and the longest and a median conversation."""
+    from sqlalchemy import text
+    
+    with engine.connect() as conn:
+        users = conn.execute(text(
+            "SELECT user_name, COUNT(*) AS n FROM conversations "
+            "WHERE is_active = 'active' GROUP BY user_name ORDER BY n DESC, user_name"
+        )).fetchall()
+        conversations = conn.execute(text(
+            "SELECT conversation_id, COUNT(*) AS n FROM messages "
+            "GROUP BY conversation_id ORDER BY n DESC, conversation_id"
+        )).fetchall()
+    
+    return {
+        "busiest_user": users[0],
+        "median_user": users[len(users) // 2],
+        "longest_conversation": conversations[0],
+        "median_conversation": conversations[len(conversations) // 2],
+    }
+
+
+def run_size(
+    database_url: str,
+    conversations: int,
+    messages: int,
+    repeat: int,
+    reseed: bool,
+    show_plans: bool,
+    analyze: bool
+) -> Dict[str, Any]:
+    """Seed (if needed) and benchmark one dataset size."""
+    from sqlalchemy import create_engine, inspect, text
+    from sqlalchemy.orm import sessionmaker
+    from app.services.database_service import ConversationService, ResumeService
+    from seed_data import seed_database
+    
+    engine = create_engine(database_url)
+    counts = None
+    if not reseed and inspect(engine).has_table("messages"):
+        with engine.connect() as conn:
+            counts = (
+                conn.execute(text("SELECT COUNT(*) FROM conversations")).scalar(),
+                conn.execute(text("SELECT COUNT(*) FROM messages")).scalar(),
+            )
+        # Seeded message totals are approximate
+        if counts[0] != conversations or abs(counts[1] - messages) > messages * 0.05:
+            counts = None
+    if counts is None:
+        print(f"Seeding {conversations} conversations / ~{messages} messages ...")
+        seed_database(database_url, conversations=conversations, messages=messages)
+        engine.dispose()
+    
+    targets = pick_targets(engine)
+    busiest_user, median_user = targets["busiest_user"], targets["median_user"]
+    longest, median = targets["longest_conversation"], targets["median_conversation"]
+    
+    cases: List[Tuple[str, Callable]] = [
+        (
+            f"get_conversation_history (longest, {longest.n} messages)",
+            lambda db: ConversationService.get_conversation_history(db, longest.conversation_id),
+        ),
+        (
+            f"get_conversation_history (median, {median.n} messages)",
+            lambda db: ConversationService.get_conversation_history(db, median.conversation_id),
+        ),
+        (
+            "get_history_page (longest, latest 50)",
+            lambda db: ConversationService.get_history_page(db, longest.conversation_id, limit=50, latest=True),
+        ),
+        (
+            f"get_user_conversations (busiest user, {busiest_user.n} conversations)",
+            lambda db: ConversationService.get_user_conversations(db, busiest_user.user_name),
+        ),
+        (
+            f"get_user_conversations (median user, {median_user.n} conversations)",
+            lambda db: ConversationService.get_user_conversations(db, median_user.user_name),
+        ),
+        (
+            "add_message",
+            lambda db: ConversationService.add_message(db, median.conversation_id, "user", "Benchmark message"),
+        ),
+        (
+            "ResumeService.save_resume",
+            lambda db: ResumeService.save_resume(db, RESUME_TEXT),
+        ),
+    ]
+    
+    session_factory = sessionmaker(bind=engine, autoflush=False)
+    capture = StatementCapture(engine)
+    print(f"\n=== {conversations} conversations / {messages} messages ({engine.dialect.name}) ===\n")
+    
+    results = {}
+    for name, call in cases:
+        stats, statements = time_case(session_factory, capture, call, repeat)
+        results[name] = stats
+        print(
+            f"{name:60} min {stats['min_ms']:9.3f}ms  p50 {stats['p50_ms']:9.3f}ms  "
+            f"p95 {stats['p95_ms']:9.3f}ms  mean {stats['mean_ms']:9.3f}ms"
+        )
+        if not show_plans:
+            continue
+        for statement, parameters in statements:
+            if not statement.lstrip().upper().startswith(EXPLAINED_STATEMENTS):
+                continue
+            print("    " + " ".join(statement.split())[:150])
+            try:
+                for line in explain(engine, statement, parameters, analyze):
+                    print("        " + line)
+            except Exception as e:
+                print(f"        (no plan: {str(e)})")
+    
+    engine.dispose()
+    return {"conversations": conversations, "messages": messages, "dialect": engine.dialect.name, "cases": results}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark ConversationService methods across dataset sizes")
+    parser.add_argument("--sizes", default="1000x100000,10000x1000000", help="Comma-separated CONVERSATIONSxMESSAGES")
+    parser.add_argument("--database-url", help="Benchmark database (default: one SQLite file per size in benchmarks/data)")
+    parser.add_argument("--repeat", type=int, default=20, help="Calls per method")
+    parser.add_argument("--reseed", action="store_true", help="Reseed even if the data already matches")
+    parser.add_argument("--no-plans", action="store_true", help="Skip query plans")
+    parser.add_argument("--analyze", action="store_true", help="Use EXPLAIN (ANALYZE, BUFFERS) on PostgreSQL")
+    parser.add_argument("--json", metavar="FILE", help="Also write the timings to a JSON file")
+    args = parser.parse_args()
+    
+    sizes = parse_sizes(args.sizes)
+    if args.database_url:
+        urls = [args.database_url] * len(sizes)
+    else:
+        DATA_DIR.mkdir(exist_ok=True)
+        urls = [f"sqlite:///{DATA_DIR}/service_{c}x{m}.db" for c, m in sizes]
+    
+    # The app creates its own engine on import; keep it off the real database
+    os.environ["DATABASE_URL"] = urls[0]
+    logging.basicConfig(level=logging.WARNING)
+    logging.getLogger("seed_data").setLevel(logging.INFO)
+    
+    runs = []
+    for url, (conversations, messages) in zip(urls, sizes):
+        # A shared database has to be reseeded for every size
+        reseed = args.reseed or (args.database_url is not None and len(sizes) > 1)
+        runs.append(run_size(url, conversations, messages, args.repeat, reseed, not args.no_plans, args.analyze))
+    
+    if args.json:
+        Path(args.json).write_text(json.dumps(runs, indent=2))
+        print(f"\n✅ Timings written to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
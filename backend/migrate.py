@@ -10,58 +10,454 @@ from pathlib import Path
 # Add backend to path
 sys.path.insert(0, str(Path(__file__).parent))
 
-def migrate_sqlite_to_postgresql(source_db: str, target_connection_string: str):
+# Rows read and written per transaction when migrating
+MIGRATION_CHUNK_SIZE = 1000
+
+# Table in the target database recording how far each table has been copied
+CHECKPOINT_TABLE = "migration_checkpoints"
+
+
+def _checkpoint_table(metadata):
+    """Define the checkpoint table on a MetaData (one row per key range of a table)."""
+    from sqlalchemy import Column, DateTime, Integer, String, Table
+    
+    return Table(
+        CHECKPOINT_TABLE,
+        metadata,
+        Column("name", String(255), primary_key=True),
+        Column("lower_key", String(255), nullable=True),
+        Column("upper_key", String(255), nullable=True),
+        Column("last_key", String(255), nullable=True),
+        Column("rows_copied", Integer, nullable=False, default=0),
+        Column("updated_at", DateTime, nullable=False),
+    )
+
+
+def _copy_value(value) -> str:
+    """Encode a value for PostgreSQL COPY text format."""
+    from datetime import datetime
+    
+    if value is None:
+        return "\\N"
+    if isinstance(value, datetime):
+        value = value.isoformat(sep=" ")
+    elif isinstance(value, bool):
+        value = "t" if value else "f"
+    else:
+        value = str(value)
+    return (
+        value.replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def write_chunk(conn, table, columns, rows, use_copy: bool = True) -> None:
+    """
+    Insert a chunk of rows in the current transaction.
+    
+    On PostgreSQL the rows are streamed with COPY FROM STDIN (psycopg2 or
+    psycopg 3); elsewhere, or with use_copy=False, they go through a single
+    executemany (batched into multi-row INSERTs by SQLAlchemy).
+    
+    Args:
+        conn: Target connection inside a transaction
+        table: Target Table
+        columns: Column names, in the order of the row values
+        rows: Row tuples
+        use_copy: Use COPY on PostgreSQL
+    """
+    import io
+    
+    if use_copy and conn.dialect.name == "postgresql":
+        data = "".join(
+            "\t".join(_copy_value(value) for value in row) + "\n"
+            for row in rows
+        )
+        sql = f"COPY {table.name} ({', '.join(columns)}) FROM STDIN"
+        cursor = conn.connection.cursor()
+        try:
+            if hasattr(cursor, "copy_expert"):
+                cursor.copy_expert(sql, io.StringIO(data))
+            else:
+                with cursor.copy(sql) as copy:
+                    copy.write(data)
+        finally:
+            cursor.close()
+        return
+    
+    conn.execute(table.insert(), [dict(zip(columns, row)) for row in rows])
+
+
+def _load_checkpoint(conn, checkpoints, name: str):
+    """
+    Get how far a copy got.
+    
+    Returns:
+        Tuple of (last copied key or None, rows copied so far)
+    """
+    from sqlalchemy import select
+    
+    row = conn.execute(
+        select(checkpoints.c.last_key, checkpoints.c.rows_copied).where(checkpoints.c.name == name)
+    ).first()
+    return (row.last_key, row.rows_copied) if row else (None, 0)
+
+
+def _save_checkpoint(conn, checkpoints, name: str, last_key: str, rows_copied: int) -> None:
+    """Record progress in the same transaction as the rows it covers."""
+    from datetime import datetime
+    
+    conn.execute(
+        checkpoints.update()
+        .where(checkpoints.c.name == name)
+        .values(last_key=last_key, rows_copied=rows_copied, updated_at=datetime.utcnow())
+    )
+
+
+def _key_ranges(source_engine, table, parts: int, chunk_size: int = MIGRATION_CHUNK_SIZE):
+    """
+    Split a table into primary-key ranges of similar size.
+    
+    Tables smaller than a chunk per range get fewer ranges, down to one.
+    
+    Args:
+        source_engine: Engine of the source database
+        table: Table from the app models
+        parts: Maximum number of ranges
+        chunk_size: Rows per chunk
+    
+    Returns:
+        List of (lower, upper) keys, lower inclusive and upper exclusive;
+        None means unbounded
+    """
+    from sqlalchemy import func, select
+    import math
+    
+    key = table.primary_key.columns.values()[0]
+    with source_engine.connect() as conn:
+        count = conn.execute(select(func.count()).select_from(table)).scalar()
+        parts = max(1, min(parts, math.ceil(count / chunk_size)))
+        bounds = [
+            conn.execute(select(key).order_by(key).offset(count * i // parts).limit(1)).scalar()
+            for i in range(1, parts)
+        ]
+    return list(zip([None, *bounds], [*bounds, None]))
+
+
+def _plan_ranges(source_engine, target_engine, checkpoints, table, workers: int, chunk_size: int):
+    """
+    Get the key ranges a table is copied in, reusing those of an earlier run.
+    
+    A new layout is recorded in the checkpoint table before any row is
+    copied, so a resumed migration continues the same ranges even when it
+    runs with a different number of workers.
+    
+    Args:
+        source_engine: Engine of the source database
+        target_engine: Engine of the target database
+        checkpoints: Checkpoint table
+        table: Table from the app models
+        workers: Ranges to split a new layout into (at most)
+        chunk_size: Rows per chunk
+    
+    Returns:
+        List of (checkpoint name, lower, upper) in key order
+    """
+    from datetime import datetime
+    from sqlalchemy import or_, select
+    
+    with target_engine.connect() as conn:
+        stored = conn.execute(
+            select(checkpoints.c.name, checkpoints.c.lower_key, checkpoints.c.upper_key).where(
+                or_(checkpoints.c.name == table.name, checkpoints.c.name.like(f"{table.name}:%"))
+            )
+        ).all()
+    if stored:
+        stored.sort(key=lambda row: (row.lower_key is not None, row.lower_key or ""))
+        return [(row.name, row.lower_key, row.upper_key) for row in stored]
+    
+    ranges = _key_ranges(source_engine, table, workers, chunk_size)
+    planned = [
+        (table.name if len(ranges) == 1 else f"{table.name}:{index + 1}/{len(ranges)}", lower, upper)
+        for index, (lower, upper) in enumerate(ranges)
+    ]
+    with target_engine.begin() as conn:
+        conn.execute(checkpoints.insert(), [
+            {
+                "name": name,
+                "lower_key": lower,
+                "upper_key": upper,
+                "last_key": None,
+                "rows_copied": 0,
+                "updated_at": datetime.utcnow(),
+            }
+            for name, lower, upper in planned
+        ])
+    return planned
+
+
+def _check_checkpoint_table(target_engine) -> None:
+    """
+    Make sure the checkpoint table records range bounds.
+    
+    Raises:
+        ValueError: If it was created by an earlier version of this script
+    """
+    from sqlalchemy import inspect
+    
+    columns = {column["name"] for column in inspect(target_engine).get_columns(CHECKPOINT_TABLE)}
+    if "lower_key" not in columns:
+        raise ValueError(
+            f"{CHECKPOINT_TABLE} has no range bounds (written by an older migrate.py); "
+            f"empty the target tables and run again with --restart"
+        )
+
+
+def _copy_range(
+    source_engine,
+    target_engine,
+    table,
+    checkpoints,
+    name: str,
+    lower=None,
+    upper=None,
+    chunk_size: int = MIGRATION_CHUNK_SIZE,
+    use_copy: bool = True
+) -> int:
+    """
+    Stream a primary-key range of a table from source to target.
+    
+    Rows are read through a single streaming query in key order and written
+    in chunks of chunk_size; each chunk is committed together with its
+    checkpoint, so an interrupted copy resumes after the last committed key.
+    
+    Args:
+        source_engine: Engine of the source database
+        target_engine: Engine of the target database
+        table: Table from the app models
+        checkpoints: Checkpoint table
+        name: Checkpoint name of the range
+        lower: First key of the range (None for the start of the table)
+        upper: Key after the range (None for the end of the table)
+        chunk_size: Rows per chunk
+        use_copy: Use COPY on PostgreSQL targets
+    
+    Returns:
+        Number of rows copied by this call
+    """
+    from sqlalchemy import inspect, select
+    import logging
+    import time
+    
+    logger = logging.getLogger(__name__)
+    
+    source_columns = {column["name"] for column in inspect(source_engine).get_columns(table.name)}
+    columns = [column for column in table.columns if column.name in source_columns]
+    names = [column.name for column in columns]
+    key = table.primary_key.columns.values()[0]
+    key_index = names.index(key.name)
+    
+    with target_engine.connect() as target_conn:
+        last_key, copied = _load_checkpoint(target_conn, checkpoints, name)
+        target_conn.rollback()
+        if last_key is not None:
+            logger.info(f"Resuming {name} after {copied} rows (key > {last_key})")
+        
+        query = select(*columns).order_by(key)
+        if last_key is not None:
+            query = query.where(key > last_key)
+        elif lower is not None:
+            query = query.where(key >= lower)
+        if upper is not None:
+            query = query.where(key < upper)
+        
+        started = time.perf_counter()
+        copied_now = 0
+        with source_engine.connect() as source_conn:
+            result = source_conn.execution_options(stream_results=True, yield_per=chunk_size).execute(query)
+            for rows in result.partitions(chunk_size):
+                last_key = rows[-1][key_index]
+                with target_conn.begin():
+                    write_chunk(target_conn, table, names, rows, use_copy)
+                    _save_checkpoint(target_conn, checkpoints, name, last_key, copied + len(rows))
+                copied += len(rows)
+                copied_now += len(rows)
+                elapsed = time.perf_counter() - started
+                logger.info(
+                    f"{name}: {copied} rows copied "
+                    f"({copied_now / elapsed if elapsed else 0:.0f} rows/sec)"
+                )
+    
+    elapsed = time.perf_counter() - started
+    logger.info(
+        f"✅ Migrated {copied_now} rows from {name} in {elapsed:.2f}s "
+        f"({copied_now / elapsed if elapsed else 0:.0f} rows/sec)"
+    )
+    return copied_now
+
+
+def _check_target_table(conn, checkpoints, table) -> None:
+    """
+    Make sure a table is either empty or being resumed.
+    
+    Raises:
+        ValueError: If the table has rows but no checkpoints
+    """
+    from sqlalchemy import func, or_, select
+    
+    resumed = conn.execute(
+        select(checkpoints.c.name).where(
+            or_(checkpoints.c.name == table.name, checkpoints.c.name.like(f"{table.name}:%"))
+        ).limit(1)
+    ).first()
+    if resumed:
+        return
+    existing = conn.execute(select(func.count()).select_from(table)).scalar()
+    if existing:
+        raise ValueError(
+            f"Target table {table.name} already has {existing} rows and no checkpoint; "
+            f"empty it first"
+        )
+
+
+def _dependency_levels(tables):
+    """
+    Group tables so each group only references tables in earlier groups.
+    
+    Args:
+        tables: Tables in dependency order (parents first)
+    
+    Returns:
+        List of table lists; tables in the same list can be copied in parallel
+    """
+    level = {}
+    for table in tables:
+        parents = [fk.column.table for fk in table.foreign_keys if fk.column.table is not table]
+        level[table] = 1 + max((level.get(parent, -1) for parent in parents), default=-1)
+    return [
+        [table for table in tables if level[table] == depth]
+        for depth in range(max(level.values(), default=-1) + 1)
+    ]
+
+
+def _create_engine(url: str, workers: int = 1):
+    """Create an engine with a connection per worker (plus one for the coordinator)."""
+    from sqlalchemy import create_engine
+    
+    kwargs = {}
+    if url.startswith("sqlite"):
+        # Concurrent SQLite writers wait for the lock instead of failing
+        kwargs["connect_args"] = {"timeout": 60}
+    if ":memory:" not in url:
+        kwargs["pool_size"] = workers + 1
+    return create_engine(url, **kwargs)
+
+
+def migrate_sqlite_to_postgresql(
+    source_db: str,
+    target_connection_string: str,
+    chunk_size: int = MIGRATION_CHUNK_SIZE,
+    use_copy: bool = True,
+    restart: bool = False,
+    workers: int = 1,
+    verify: bool = True
+):
     """
     Migrate data from SQLite to PostgreSQL
     
+    Tables are copied in chunks, without loading a table into memory. With
+    several workers, tables that do not reference each other are copied at
+    the same time and large tables are split into primary-key ranges copied
+    concurrently; tables are only started once the tables they reference
+    (e.g. conversations for messages) are complete. Progress is checkpointed
+    per range in the target database, together with the range bounds, so
+    running the migration again after a failure continues where it stopped
+    (with the ranges of the first run, whatever the number of workers). The target
+    may also be another SQLite database, which is handy for testing.
+    
     Args:
-        source_db: Path to SQLite database file (e.g., "portfolio.db")
+        source_db: Path to SQLite database file (e.g., "portfolio.db") or a database URL
         target_connection_string: PostgreSQL connection string
+        chunk_size: Rows per chunk
+        use_copy: Use COPY FROM STDIN on PostgreSQL (executemany otherwise)
+        restart: Forget previous checkpoints (target tables must be empty)
+        workers: Ranges copied concurrently, each over its own connections
+        verify: Compare row counts and checksums once the copy is done
     """
-    from sqlalchemy import create_engine, inspect, text
+    from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+    from sqlalchemy import MetaData, inspect
+    from app.models.db.models import Base
     import logging
+    import time
     
     logging.basicConfig(level=logging.INFO)
     logger = logging.getLogger(__name__)
     
     try:
         # Create engines
-        source_engine = create_engine(f"sqlite:///{source_db}")
-        target_engine = create_engine(target_connection_string)
+        source_url = source_db if "://" in source_db else f"sqlite:///{source_db}"
+        source_engine = _create_engine(source_url, workers)
+        target_engine = _create_engine(target_connection_string, workers)
         
-        logger.info(f"Connecting to source SQLite: {source_db}")
-        logger.info(f"Connecting to target PostgreSQL: {target_connection_string}")
+        logger.info(f"Connecting to source: {source_engine.url.render_as_string(hide_password=True)}")
+        logger.info(f"Connecting to target: {target_engine.url.render_as_string(hide_password=True)}")
         
-        # Get source metadata
-        source_inspector = inspect(source_engine)
-        source_tables = source_inspector.get_table_names()
+        # Create missing tables and the checkpoint table on the target
+        Base.metadata.create_all(target_engine)
+        checkpoints = _checkpoint_table(MetaData())
+        if restart:
+            checkpoints.drop(target_engine, checkfirst=True)
+        checkpoints.create(target_engine, checkfirst=True)
+        _check_checkpoint_table(target_engine)
         
-        logger.info(f"Found {len(source_tables)} tables to migrate: {source_tables}")
+        # Parent tables first so foreign keys are satisfied
+        source_tables = set(inspect(source_engine).get_table_names())
+        tables = [table for table in Base.metadata.sorted_tables if table.name in source_tables]
+        skipped = source_tables - {table.name for table in tables}
+        if skipped:
+            logger.warning(f"Skipping tables without a model: {sorted(skipped)}")
         
-        # Migrate each table
-        with source_engine.connect() as source_conn:
-            with target_engine.connect() as target_conn:
-                for table_name in source_tables:
-                    logger.info(f"Migrating table: {table_name}")
-                    
-                    # Copy table structure and data
-                    source_data = source_conn.execute(text(f"SELECT * FROM {table_name}"))
-                    
-                    rows = source_data.fetchall()
-                    if rows:
-                        columns = [col[0] for col in source_data.keys()]
-                        
-                        for row in rows:
-                            placeholders = ','.join([f"${i+1}" for i in range(len(columns))])
-                            insert_sql = f"INSERT INTO {table_name} ({','.join(columns)}) VALUES ({placeholders})"
-                            target_conn.execute(text(insert_sql), dict(zip(columns, row)))
-                        
-                        target_conn.commit()
-                        logger.info(f"✅ Migrated {len(rows)} rows from {table_name}")
-                    else:
-                        logger.info(f"Table {table_name} is empty, skipping data migration")
+        logger.info(f"Found {len(tables)} tables to migrate: {[table.name for table in tables]}")
+        
+        with target_engine.connect() as conn:
+            for table in tables:
+                _check_target_table(conn, checkpoints, table)
         
-        logger.info("✅ Migration completed successfully!")
+        started = time.perf_counter()
+        total = 0
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for level in _dependency_levels(tables):
+                futures = []
+                for table in level:
+                    ranges = _plan_ranges(source_engine, target_engine, checkpoints, table, workers, chunk_size)
+                    logger.info(f"Migrating table: {table.name} ({len(ranges)} ranges)")
+                    for name, lower, upper in ranges:
+                        futures.append(pool.submit(
+                            _copy_range, source_engine, target_engine, table, checkpoints,
+                            name, lower, upper, chunk_size, use_copy
+                        ))
+                
+                done, pending = wait(futures, return_when=FIRST_EXCEPTION)
+                for future in pending:
+                    future.cancel()
+                for future in done:
+                    total += future.result()
+        
+        if target_engine.dialect.name == "postgresql":
+            with target_engine.begin() as conn:
+                for table in tables:
+                    conn.exec_driver_sql(f"ANALYZE {table.name}")
+        
+        elapsed = time.perf_counter() - started
+        logger.info(
+            f"✅ Migration completed successfully! {total} rows in {elapsed:.2f}s "
+            f"({total / elapsed if elapsed else 0:.0f} rows/sec)"
+        )
+        
+        if verify:
+            return verify_migration(source_url, target_connection_string)
         return True
         
     except Exception as e:
@@ -69,6 +465,72 @@ def migrate_sqlite_to_postgresql(source_db: str, target_connection_string: str):
         return False
 
 
+def create_indexes(connection_string: str = None):
+    """
+    Create the indexes declared on the models in an existing database.
+    
+    On PostgreSQL each index is built with CREATE INDEX CONCURRENTLY so the
+    tables stay writable while it runs. An index left INVALID by an earlier
+    interrupted build is dropped and rebuilt. On SQLite a plain
+    CREATE INDEX IF NOT EXISTS is used.
+    
+    Args:
+        connection_string: Database URL (defaults to DATABASE_URL)
+    """
+    from sqlalchemy import create_engine, text
+    from sqlalchemy.schema import CreateIndex
+    from app.models.db.models import Base
+    import logging
+    
+    logging.basicConfig(level=logging.INFO)
+    logger = logging.getLogger(__name__)
+    
+    connection_string = (
+        connection_string
+        or os.getenv("DATABASE_URL")
+        or "sqlite:///./portfolio.db"
+    )
+    
+    try:
+        # CONCURRENTLY cannot run inside a transaction block
+        engine = create_engine(connection_string, isolation_level="AUTOCOMMIT")
+        is_postgresql = engine.dialect.name == "postgresql"
+        
+        with engine.connect() as conn:
+            for table in Base.metadata.sorted_tables:
+                for index in sorted(table.indexes, key=lambda i: i.name):
+                    if is_postgresql:
+                        invalid = conn.execute(
+                            text(
+                                "SELECT 1 FROM pg_index i "
+                                "JOIN pg_class c ON c.oid = i.indexrelid "
+                                "WHERE c.relname = :name AND NOT i.indisvalid"
+                            ),
+                            {"name": index.name},
+                        ).first()
+                        if invalid:
+                            logger.warning(f"Dropping invalid index {index.name} before rebuild")
+                            conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {index.name}"))
+                    
+                    ddl = str(CreateIndex(index, if_not_exists=True).compile(dialect=engine.dialect))
+                    if is_postgresql:
+                        ddl = ddl.replace("CREATE INDEX", "CREATE INDEX CONCURRENTLY", 1)
+                    
+                    logger.info(f"Creating index {index.name} on {table.name}")
+                    conn.execute(text(ddl))
+            
+            if is_postgresql:
+                conn.execute(text("ANALYZE conversations"))
+                conn.execute(text("ANALYZE messages"))
+        
+        logger.info("✅ Indexes are up to date")
+        return True
+    
+    except Exception as e:
+        logger.error(f"❌ Index creation failed: {str(e)}")
+        return False
+
+
 def setup_postgresql_docker():
     """
     Quick setup for PostgreSQL using Docker
@@ -107,46 +569,84 @@ docker rm portfolio_db
     return setup_script
 
 
-def verify_migration():
+def _table_fingerprint(engine, table, column_names):
     """
-    Verify that migration was successful
+    Count a table's rows and checksum their values.
+    
+    The checksum is the sum of per-row hashes, so it does not depend on the
+    order rows come back in (which differs between databases).
+    
+    Returns:
+        Tuple of (row count, checksum)
     """
-    verification_script = """
-# Verification script
-
-from sqlalchemy import create_engine, text
-import os
-
-# Check source database
-source_db = "sqlite:///./portfolio.db"
-source_engine = create_engine(source_db)
-
-# Check target database
-target_db = os.getenv("DATABASE_URL", "sqlite:///./portfolio.db")
-target_engine = create_engine(target_db)
-
-def count_records(engine, table_name):
+    from sqlalchemy import select
+    import hashlib
+    
+    columns = [table.c[name] for name in column_names]
+    count = 0
+    checksum = 0
     with engine.connect() as conn:
-        result = conn.execute(text(f"SELECT COUNT(*) FROM {table_name}"))
-        return result.scalar()
-
-tables = ["conversations", "messages", "resume_data"]
+        result = conn.execution_options(stream_results=True, yield_per=MIGRATION_CHUNK_SIZE).execute(
+            select(*columns)
+        )
+        for row in result:
+            digest = hashlib.sha1(repr(tuple(row)).encode("utf-8")).digest()
+            checksum = (checksum + int.from_bytes(digest[:8], "big")) % (1 << 64)
+            count += 1
+    return count, checksum
 
-print("\\n=== Migration Verification ===\\n")
 
-for table in tables:
-    try:
-        source_count = count_records(source_engine, table)
-        target_count = count_records(target_engine, table)
-        
-        status = "✅" if source_count == target_count else "❌"
-        print(f"{status} {table:20} | Source: {source_count:5} | Target: {target_count:5}")
-    except Exception as e:
-        print(f"❌ {table:20} | Error: {str(e)}")
-
-print("\\n" + "="*60)
+def verify_migration(source_db: str = "portfolio.db", target_connection_string: str = None):
+    """
+    Verify that migration was successful
+    
+    Compares the row count and a checksum of every column the two databases
+    share, table by table.
+    
+    Args:
+        source_db: Path to SQLite database file or a database URL
+        target_connection_string: Target database URL (defaults to DATABASE_URL)
+    
+    Returns:
+        True if every table matches
     """
-    return verification_script
+    from sqlalchemy import create_engine, inspect
+    from app.models.db.models import Base
+    
+    source_url = source_db if "://" in source_db else f"sqlite:///{source_db}"
+    target_connection_string = (
+        target_connection_string
+        or os.getenv("DATABASE_URL")
+        or "sqlite:///./portfolio.db"
+    )
+    source_engine = create_engine(source_url)
+    target_engine = create_engine(target_connection_string)
+    source_inspector = inspect(source_engine)
+    source_tables = set(source_inspector.get_table_names())
+    
+    print("\n=== Migration Verification ===\n")
+    
+    matched = True
+    for table in Base.metadata.sorted_tables:
+        if table.name not in source_tables:
+            continue
+        try:
+            shared = {column["name"] for column in source_inspector.get_columns(table.name)}
+            column_names = [column.name for column in table.columns if column.name in shared]
+            source_count, source_sum = _table_fingerprint(source_engine, table, column_names)
+            target_count, target_sum = _table_fingerprint(target_engine, table, column_names)
+            
+            ok = source_count == target_count and source_sum == target_sum
+            matched = matched and ok
+            status = "✅" if ok else "❌"
+            checksum = "match" if source_sum == target_sum else "MISMATCH"
+            print(f"{status} {table.name:20} | Source: {source_count:5} | Target: {target_count:5} | Checksum: {checksum}")
+        except Exception as e:
+            matched = False
+            print(f"❌ {table.name:20} | Error: {str(e)}")
+    
+    print("\n" + "="*60)
+    return matched
 
 
 def backup_sqlite():
@@ -202,17 +702,25 @@ If you have important conversations to keep:
 4. Install PostgreSQL driver:
    pip install psycopg2-binary
 
-5. Run migration:
-   python -c "from migrate import migrate_sqlite_to_postgresql; \
-   migrate_sqlite_to_postgresql('portfolio.db', 'postgresql://...')"
+5. Run migration (streams rows in chunks; re-run to resume after a failure):
+   python migrate.py --migrate --source portfolio.db --target postgresql://... --workers 4
 
-6. Verify:
-   python -c "from migrate import verify_migration; verify_migration()"
+6. Verify (also run automatically after the migration):
+   python migrate.py --verify --source portfolio.db --target postgresql://...
 
 TIP: Safe, keeps all data
 
 ---
 
+## Adding Indexes to an Existing Database
+New tables get their indexes from init_db. For a database created before
+the indexes were added (safe to run on a live PostgreSQL database, indexes
+are built CONCURRENTLY):
+
+   python migrate.py --create-indexes
+
+---
+
 ## Production Switch Checklist
 
 - [ ] Backup SQLite database
@@ -231,19 +739,38 @@ if __name__ == "__main__":
     
     parser = argparse.ArgumentParser(description="Database migration tools")
     parser.add_argument("--backup", action="store_true", help="Backup SQLite database")
-    parser.add_argument("--migrate", action="store_true", help="Show migration instructions")
+    parser.add_argument("--migrate", action="store_true", help="Migrate --source to --target (shows instructions without --target)")
+    parser.add_argument("--source", default="portfolio.db", help="Source SQLite file or database URL")
+    parser.add_argument("--target", help="Target database URL")
+    parser.add_argument("--chunk-size", type=int, default=MIGRATION_CHUNK_SIZE, help="Rows per chunk")
+    parser.add_argument("--no-copy", action="store_true", help="Use executemany instead of COPY on PostgreSQL")
+    parser.add_argument("--restart", action="store_true", help="Ignore checkpoints from an earlier run")
+    parser.add_argument("--workers", type=int, default=1, help="Ranges copied concurrently")
     parser.add_argument("--docker", action="store_true", help="Show Docker setup")
-    parser.add_argument("--verify", action="store_true", help="Show verification script")
+    parser.add_argument("--verify", action="store_true", help="Compare row counts and checksums of --source and --target")
+    parser.add_argument("--create-indexes", action="store_true", help="Create model indexes on an existing database")
     
     args = parser.parse_args()
     
     if args.backup:
         backup_sqlite()
+    elif args.migrate and args.target:
+        success = migrate_sqlite_to_postgresql(
+            args.source,
+            args.target,
+            chunk_size=args.chunk_size,
+            use_copy=not args.no_copy,
+            restart=args.restart,
+            workers=args.workers
+        )
+        sys.exit(0 if success else 1)
     elif args.migrate:
         print(SWITCH_GUIDE)
     elif args.docker:
         print(setup_postgresql_docker())
     elif args.verify:
-        print(verify_migration())
+        sys.exit(0 if verify_migration(args.source, args.target) else 1)
+    elif args.create_indexes:
+        create_indexes()
     else:
         print(SWITCH_GUIDE)